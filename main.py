@@ -5,6 +5,7 @@
 
 import argparse
 import json
+import logging
 import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -226,7 +227,9 @@ class KnowledgeGraphBuilder:
             uri=config.get('uri', 'bolt://localhost:7687'),
             user=config.get('user', 'neo4j'),
             password=config.get('password', 'yuanxi98'),
-            clear_existing=clear_existing
+            clear_existing=clear_existing,
+            use_admin_import=config.get('use_admin_import', False),
+            write_workers=config.get('write_workers', 1)
         )
 
     def _load_triples_from_file(self, file_path: str) -> List[Dict]:
@@ -292,11 +295,17 @@ def main():
     # Neo4j选项
     parser.add_argument("--export-neo4j", action="store_true", help="导出到Neo4j")
     parser.add_argument("--neo4j-clear", action="store_true", help="清空Neo4j数据库")
+    parser.add_argument("--neo4j-admin-import", action="store_true", help="使用neo4j-admin离线全量导入（需先停止数据库）")
+    parser.add_argument("--neo4j-workers", type=int, default=1, help="Neo4j并行写入的会话数")
     parser.add_argument("--neo4j-uri", default="bolt://localhost:7687", help="Neo4j URI")
     parser.add_argument("--neo4j-user", default="neo4j", help="Neo4j用户名")
     parser.add_argument("--neo4j-password", default="yuanxi98", help="Neo4j密码")
+    parser.add_argument("--quiet", action="store_true", help="不逐项输出处理日志（失败项仍会输出）")
     
     args = parser.parse_args()
+    monitor.verbose = not args.quiet
+    # 各模块诊断信息通过logging输出，--quiet时只保留警告和错误
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format="%(message)s")
     
     # 加载配置
     config = None
@@ -336,7 +345,9 @@ def main():
                 clear_existing=args.neo4j_clear,
                 uri=args.neo4j_uri,
                 user=args.neo4j_user,
-                password=args.neo4j_password
+                password=args.neo4j_password,
+                use_admin_import=args.neo4j_admin_import,
+                write_workers=args.neo4j_workers
             )
             if success:
                 print(f"🌐 Neo4j浏览器: http://localhost:7474")
@@ -11,6 +11,10 @@ from datetime import datetime
 from pathlib import Path
 from collections import Counter, defaultdict
 import re
+import threading
+
+# 懒加载实体类型推断器时使用，避免并发抽取的多个线程各自创建一份推断器
+_ENTITY_INFERER_LOCK = threading.Lock()
 
 @dataclass
 class EntityTypeConfig:
@@ -40,7 +44,14 @@ class RelationTypeConfig:
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     usage_count: int = 0
 
-@dataclass
+def _restore_slots_state(obj, state):
+    """兼容启用__slots__之前生成的pickle备份（旧备份的state是__dict__字典）"""
+    if isinstance(state, tuple):
+        state = state[1]
+    for key, value in state.items():
+        object.__setattr__(obj, key, value)
+
+@dataclass(slots=True)
 class Entity:
     """实体实例"""
     name: str
@@ -49,7 +60,19 @@ class Entity:
     attributes: Optional[Dict[str, Any]] = field(default_factory=dict)
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（比dataclasses.asdict的递归遍历快，attributes做浅拷贝）"""
+        return {
+            "name": self.name,
+            "entity_type": self.entity_type,
+            "description": self.description,
+            "attributes": dict(self.attributes) if self.attributes is not None else None,
+            "created_at": self.created_at
+        }
+
+    __setstate__ = _restore_slots_state
+
+@dataclass(slots=True)
 class Relation:
     """关系实例"""
     subject: str
@@ -59,6 +82,19 @@ class Relation:
     source: Optional[str] = None
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
 
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "subject": self.subject,
+            "predicate": self.predicate,
+            "object": self.object,
+            "confidence": self.confidence,
+            "source": self.source,
+            "created_at": self.created_at
+        }
+
+    __setstate__ = _restore_slots_state
+
 class DynamicOntologyManager:
     """动态本体管理器 v2.0"""
     
@@ -78,6 +114,7 @@ class DynamicOntologyManager:
         # 版本和元数据
         self.metadata: Dict = {}
         self.current_version = "2.0.0"
+        self.schema_version = 0  # 每次加载/修改Schema后递增，供下游缓存判断是否失效
 
         # 统计信息
         self.processing_stats = {
@@ -121,6 +158,7 @@ class DynamicOntologyManager:
         
         # 加载LLM Prompt模板
         self.llm_prompts = config.get('llm_prompts', {})
+        self.schema_version += 1
         
         print(f"✅ 已加载Schema配置: {self.metadata.get('name', 'Unknown')} v{self.current_version}")
         print(f"   实体类型: {len(self.entity_types)}")
@@ -251,7 +289,9 @@ class DynamicOntologyManager:
         from pipeline.enhanced_entity_inferer import EnhancedEntityTypeInferer
 
         if not hasattr(self, '_entity_inferer'):
-            self._entity_inferer = EnhancedEntityTypeInferer()
+            with _ENTITY_INFERER_LOCK:
+                if not hasattr(self, '_entity_inferer'):
+                    self._entity_inferer = EnhancedEntityTypeInferer()
 
         result = self._entity_inferer.infer_entity_type(entity_name, context)
 
@@ -3,11 +3,22 @@
 基于分层匹配策略的实体类型推断系统
 """
 
+import heapq
 import re
+import sys
+import threading
 import time
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
-from collections import defaultdict
-from dataclasses import dataclass
+from collections import defaultdict, OrderedDict
+from dataclasses import dataclass, asdict
+
+from pipeline.entity_type_inferer import ALGORITHM, FRAMEWORK, TECHNIQUE, TASK, METRIC
+
+# 大小写字符对，如 [Aa]（名称已小写化后可折叠为单个字符）
+_CASE_PAIR_RE = re.compile(r'\[(\w)\1\]')
+# 正则元字符（折叠后仍含这些字符的模式不能当作字面后缀）
+_REGEX_META_RE = re.compile(r'[\\\[\](){}.*+?|^$]')
 
 @dataclass
 class InferenceResult:
@@ -17,54 +28,94 @@ class InferenceResult:
     method: str  # 'cache', 'pattern', 'keyword', 'context', 'unknown'
     inference_time: float
 
+@dataclass(slots=True)
+class _CacheEntry:
+    """缓存条目（使用__slots__，避免每条目一个dict的开销）"""
+    type: str
+    confidence: float
+    source: str
+    count: int = 1
+
 class EntityTypeCache:
-    """实体类型缓存"""
+    """实体类型缓存（LRU淘汰，容量有上限）
+    
+    get也会调整LRU顺序，多线程并发抽取时所有读写都需要持有锁。
+    """
     
-    def __init__(self):
-        self.verified_entities = {}
+    def __init__(self, max_size: int = 100_000):
+        # 按最近使用顺序排列，超出容量时淘汰最久未使用的条目
+        self.verified_entities: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self.max_size = max_size
         self.confidence_threshold = 0.9
+        self._lock = threading.Lock()
     
-    def get(self, entity_name: str) -> Optional[Dict]:
+    def get(self, entity_name: str) -> Optional[_CacheEntry]:
         """获取缓存的实体类型"""
-        return self.verified_entities.get(entity_name.lower())
+        key = entity_name.lower()
+        with self._lock:
+            entry = self.verified_entities.get(key)
+            if entry is not None:
+                self.verified_entities.move_to_end(key)
+        return entry
     
     def add_verified_entity(self, entity_name: str, entity_type: str, 
                           confidence: float, source: str):
         """添加已验证的实体类型"""
         key = entity_name.lower()
-        if key in self.verified_entities:
-            # 更新使用计数
-            self.verified_entities[key]['count'] += 1
-            self.verified_entities[key]['last_used'] = time.time()
-        else:
-            self.verified_entities[key] = {
-                'type': entity_type,
-                'confidence': confidence,
-                'source': source,
-                'count': 1,
-                'last_used': time.time()
-            }
+        with self._lock:
+            entry = self.verified_entities.get(key)
+            if entry is not None:
+                # 更新使用计数
+                entry.count += 1
+                self.verified_entities.move_to_end(key)
+            else:
+                self.verified_entities[key] = _CacheEntry(entity_type, confidence, source)
+                if len(self.verified_entities) > self.max_size:
+                    self.verified_entities.popitem(last=False)
     
-    def export_for_review(self) -> List[Dict]:
-        """导出高频实体供人工审核"""
-        high_freq_entities = []
-        for entity, info in self.verified_entities.items():
-            if info['count'] >= 3:  # 出现3次以上
-                high_freq_entities.append({
-                    'entity': entity,
-                    'type': info['type'],
-                    'confidence': info['confidence'],
-                    'frequency': info['count'],
-                    'source': info['source']
-                })
-        return sorted(high_freq_entities, key=lambda x: x['frequency'], reverse=True)
+    def to_dict(self) -> Dict[str, Dict]:
+        """导出为可JSON序列化的字典"""
+        with self._lock:
+            return {entity: asdict(entry) for entity, entry in self.verified_entities.items()}
+    
+    def load_dict(self, entities: Dict[str, Dict]):
+        """从to_dict()的输出恢复缓存"""
+        verified_entities = OrderedDict(
+            (entity, _CacheEntry(info['type'], info['confidence'], info['source'], info.get('count', 1)))
+            for entity, info in entities.items()
+        )
+        with self._lock:
+            self.verified_entities = verified_entities
+    
+    def frequency_stats(self) -> Tuple[int, int]:
+        """返回 (缓存实体数, 出现3次以上的实体数)"""
+        with self._lock:
+            return len(self.verified_entities), sum(1 for e in self.verified_entities.values() if e.count >= 3)
+    
+    def export_for_review(self, top_k: Optional[int] = None) -> List[Dict]:
+        """导出高频实体供人工审核（指定top_k时只返回频次最高的前K个）"""
+        # 出现3次以上
+        with self._lock:
+            candidates = [(entry.count, entity, entry) for entity, entry in self.verified_entities.items()
+                          if entry.count >= 3]
+        if top_k is not None:
+            ranked = heapq.nlargest(top_k, candidates, key=itemgetter(0))
+        else:
+            ranked = sorted(candidates, key=itemgetter(0), reverse=True)
+        return [{
+            'entity': entity,
+            'type': entry.type,
+            'confidence': entry.confidence,
+            'frequency': count,
+            'source': entry.source
+        } for count, entity, entry in ranked]
 
 class EnhancedEntityTypeInferer:
     """增强的分层实体类型推断器（支持多领域）"""
 
-    def __init__(self, domain_name: str = "graph_algorithms"):
+    def __init__(self, domain_name: str = "graph_algorithms", cache_size: int = 100_000):
         # 实体类型缓存
-        self.entity_cache = EntityTypeCache()
+        self.entity_cache = EntityTypeCache(max_size=cache_size)
 
         # 当前领域
         self.current_domain = domain_name
@@ -83,26 +134,26 @@ class EnhancedEntityTypeInferer:
         """初始化基础数据结构"""
         # 兼容性：保留原有的关键词结构
         self.type_keywords = {
-            'Algorithm': [
+            ALGORITHM: [
                 'algorithm', 'method', 'approach', 'technique', 'procedure',
                 'search', 'sort', 'optimization', 'learning', 'training',
                 'greedy', 'heuristic', 'recursive', 'iterative', 'dynamic'
             ],
-            'Framework': [
+            FRAMEWORK: [
                 'framework', 'library', 'platform', 'toolkit', 'system',
                 'network', 'model', 'architecture', 'neural', 'deep'
             ],
-            'Technique': [
+            TECHNIQUE: [
                 'technique', 'strategy', 'mechanism', 'process', 'procedure',
                 'pruning', 'compression', 'embedding', 'representation'
             ],
-            'Task': [
+            TASK: [
                 'task', 'problem', 'application', 'scenario', 'challenge',
                 'prediction', 'classification', 'reasoning', 'analysis',
                 # 中文关键词
                 '分析', '预测', '识别', '检测', '推荐', '系统', '任务'
             ],
-            'Metric': [
+            METRIC: [
                 'metric', 'measure', 'score', 'rate', 'accuracy', 'precision',
                 'recall', 'performance', 'quality', 'efficiency'
             ]
@@ -110,7 +161,7 @@ class EnhancedEntityTypeInferer:
         
         # 命名模式（正则表达式）
         self.type_patterns = {
-            'Algorithm': [
+            ALGORITHM: [
                 r'^Graph[A-Z][a-zA-Z]*$',      # GraphSAGE, GraphSAINT
                 r'^[A-Z]{2,}$',                # GAT, GCN, GNN
                 r'.*[Aa]lgorithm$',            # PageRankAlgorithm
@@ -118,13 +169,13 @@ class EnhancedEntityTypeInferer:
                 r'.*[Nn]et$',                  # ResNet, DenseNet
                 r'.*SAGE$',                    # GraphSAGE
             ],
-            'Framework': [
+            FRAMEWORK: [
                 r'.*[Ff]ramework$',            # TensorFlow
                 r'.*[Nn]etwork$',              # Neural Network
                 r'.*[Ss]ystem$',               # RecommendationSystem
                 r'.*[Ll]ibrary$',              # GraphLibrary
             ],
-            'Task': [
+            TASK: [
                 r'.*[Pp]rediction$',           # LinkPrediction
                 r'.*[Cc]lassification$',       # NodeClassification
                 r'.*[Aa]nalysis$',             # 社交网络分析
@@ -135,7 +186,7 @@ class EnhancedEntityTypeInferer:
                 r'.*系统$',                     # 推荐系统
                 r'.*图谱$',                     # 知识图谱
             ],
-            'Technique': [
+            TECHNIQUE: [
                 r'.*[Pp]runing$',              # NetworkPruning
                 r'.*[Cc]ompression$',          # ModelCompression
                 r'.*[Ee]mbedding$',            # GraphEmbedding
@@ -144,26 +195,52 @@ class EnhancedEntityTypeInferer:
         
         # 上下文指示词
         self.context_indicators = {
-            'Algorithm': [
+            ALGORITHM: [
                 'algorithm', 'method', 'approach', 'technique',
                 'implements', 'proposes', 'introduces', 'develops',
                 'solves', 'optimizes', 'searches', 'computes'
             ],
-            'Framework': [
+            FRAMEWORK: [
                 'framework', 'library', 'platform', 'toolkit',
                 'based on', 'built on', 'uses', 'leverages',
                 'powered by', 'implemented in'
             ],
-            'Task': [
+            TASK: [
                 'task', 'problem', 'application', 'scenario',
                 'used for', 'applied to', 'addresses', 'tackles',
                 'solves', 'handles', 'performs'
             ],
-            'Technique': [
+            TECHNIQUE: [
                 'technique', 'strategy', 'mechanism', 'process',
                 'applies', 'employs', 'utilizes', 'adopts'
             ]
         }
+        self._compile_context_indicators()
+
+    def _compile_context_indicators(self):
+        """把全部上下文指示词编译为一个多模式扫描器
+
+        一次 finditer 扫描上下文即可得到所有命中的指示词，取代逐个指示词的子串查找。
+        扫描用零宽前瞻在每个位置取最长命中，被更长命中词包含的指示词通过
+        预先计算的包含关系补齐，因此结果与逐个 `in` 判断一致。
+        """
+        self._context_types = list(self.context_indicators)
+        owners = defaultdict(list)
+        for type_index, indicators in enumerate(self.context_indicators.values()):
+            for indicator in indicators:
+                owners[indicator.lower()].append(type_index)
+        self._indicator_owners = dict(owners)
+
+        # 命中某指示词时，其包含的所有较短指示词也必然出现在上下文中
+        self._indicator_implies = {
+            indicator: [other for other in owners if other in indicator]
+            for indicator in owners
+        }
+
+        alternatives = sorted(owners, key=len, reverse=True)
+        self._indicator_scanner = re.compile(
+            '(?=(' + '|'.join(re.escape(indicator) for indicator in alternatives) + '))'
+        ) if alternatives else None
 
     def _load_domain_config(self):
         """从本体Schema加载配置"""
@@ -172,13 +249,39 @@ class EnhancedEntityTypeInferer:
 
         # 更新关键词和模式
         for entity_type, config in entity_types.items():
+            # Schema中读入的类型名同样驻留，与内置常量共享同一对象
+            entity_type = sys.intern(entity_type)
             if hasattr(config, 'keywords') and config.keywords:
                 self.type_keywords[entity_type] = config.keywords
             if hasattr(config, 'patterns') and config.patterns:
                 self.type_patterns[entity_type] = config.patterns
 
+        self._compile_type_patterns()
+
         print(f"✅ 从本体Schema加载配置: {len(entity_types)} 个实体类型")
 
+    def _compile_type_patterns(self):
+        """预编译命名模式
+
+        形如 `.*[Aa]lgorithm$` 的纯后缀模式转换为小写字面后缀，用 str.endswith 匹配，
+        避免前导 `.*` 的回溯和 IGNORECASE 的逐字符折叠；其余模式编译为正则。
+        """
+        self._compiled_type_patterns = []
+        for entity_type, patterns in self.type_patterns.items():
+            suffixes = []
+            regexes = []
+            for pattern in patterns:
+                if pattern.startswith('.*') and pattern.endswith('$'):
+                    suffix = _CASE_PAIR_RE.sub(r'\1', pattern[2:-1].lower())
+                    if suffix and not _REGEX_META_RE.search(suffix):
+                        suffixes.append(suffix)
+                        continue
+                try:
+                    regexes.append(re.compile(pattern, re.IGNORECASE))
+                except re.error:
+                    continue
+            self._compiled_type_patterns.append((entity_type, tuple(suffixes), regexes))
+
     def switch_domain(self, schema_file: str):
         """切换Schema配置"""
         from ontology.managers.dynamic_schema import DynamicOntologyManager
@@ -194,8 +297,8 @@ class EnhancedEntityTypeInferer:
         cached_result = self._cache_lookup(entity_name)
         if cached_result:
             return InferenceResult(
-                entity_type=cached_result['type'],
-                confidence=cached_result['confidence'],
+                entity_type=cached_result.type,
+                confidence=cached_result.confidence,
                 method='cache',
                 inference_time=time.time() - start_time
             )
@@ -249,10 +352,10 @@ class EnhancedEntityTypeInferer:
             inference_time=time.time() - start_time
         )
     
-    def _cache_lookup(self, entity_name: str) -> Optional[Dict]:
+    def _cache_lookup(self, entity_name: str) -> Optional[_CacheEntry]:
         """缓存查找"""
         cached = self.entity_cache.get(entity_name)
-        if cached and cached['confidence'] > self.entity_cache.confidence_threshold:
+        if cached and cached.confidence > self.entity_cache.confidence_threshold:
             return cached
         return None
 
@@ -281,9 +384,12 @@ class EnhancedEntityTypeInferer:
     
     def _pattern_match(self, entity_name: str) -> Optional[str]:
         """基于命名模式的类型推断"""
-        for entity_type, patterns in self.type_patterns.items():
-            for pattern in patterns:
-                if re.match(pattern, entity_name, re.IGNORECASE):
+        name_lower = entity_name.lower()
+        for entity_type, suffixes, regexes in self._compiled_type_patterns:
+            if suffixes and name_lower.endswith(suffixes):
+                return entity_type
+            for regex in regexes:
+                if regex.match(entity_name):
                     return entity_type
         return None
     
@@ -310,20 +416,26 @@ class EnhancedEntityTypeInferer:
     
     def _context_infer(self, entity_name: str, context: str) -> Optional[str]:
         """基于上下文的类型推断"""
-        context_lower = context.lower()
+        if self._indicator_scanner is None:
+            return None
         
-        # 计算上下文指示词匹配分数
-        type_scores = defaultdict(int)
+        # 单次扫描收集命中的指示词
+        found = set()
+        for match in self._indicator_scanner.finditer(context.lower()):
+            indicator = match.group(1)
+            if indicator not in found:
+                found.update(self._indicator_implies[indicator])
         
-        for entity_type, indicators in self.context_indicators.items():
-            for indicator in indicators:
-                if indicator in context_lower:
-                    type_scores[entity_type] += 1
+        # 计算上下文指示词匹配分数
+        type_scores = [0] * len(self._context_types)
+        for indicator in found:
+            for type_index in self._indicator_owners[indicator]:
+                type_scores[type_index] += 1
         
-        if type_scores:
+        best_score = max(type_scores, default=0)
+        if best_score > 0:
             # 返回得分最高的类型
-            best_type = max(type_scores.items(), key=lambda x: x[1])
-            return best_type[0]
+            return self._context_types[type_scores.index(best_score)]
         
         return None
     
@@ -334,8 +446,7 @@ class EnhancedEntityTypeInferer:
     
     def get_cache_stats(self) -> Dict:
         """获取缓存统计信息"""
-        total_entities = len(self.entity_cache.verified_entities)
-        high_freq_count = len([e for e in self.entity_cache.verified_entities.values() if e['count'] >= 3])
+        total_entities, high_freq_count = self.entity_cache.frequency_stats()
         
         return {
             'total_cached_entities': total_entities,
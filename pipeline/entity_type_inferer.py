@@ -3,107 +3,115 @@
 从三元组数据中推断实体类型
 """
 
+import sys
 from typing import Dict, List, Set, Optional
 from collections import defaultdict, Counter
 
+# 实体类型名常量（驻留字符串，字典键比较可走指针相等的快路径）
+_TYPES = tuple(sys.intern(t) for t in (
+    'Algorithm', 'Framework', 'Technique', 'Task', 'Metric', 'Paradigm', 'Boolean', 'Unknown'
+))
+ALGORITHM, FRAMEWORK, TECHNIQUE, TASK, METRIC, PARADIGM, BOOLEAN, UNKNOWN = _TYPES
+
 class EntityTypeInferer:
     """实体类型推断器"""
     
     def __init__(self):
         self.known_types = {
-            'Paradigm', 'Algorithm', 'Technique', 'Framework', 'Task', 'Metric', 'Boolean'
+            PARADIGM, ALGORITHM, TECHNIQUE, FRAMEWORK, TASK, METRIC, BOOLEAN
         }
         
         # 关键词映射
         self.type_keywords = {
-            'Algorithm': [
+            ALGORITHM: [
                 'algorithm', 'search', 'learning', 'neural', 'tree', 'walk', 'ranking',
                 'minerva', 'grail', 'gnn_rl', 'neuralp', 'ant_colony', 'greedy', 'monte_carlo'
             ],
-            'Paradigm': [
+            PARADIGM: [
                 'paradigm', 'decision', 'learning', 'inference', 'mechanism', 'search',
                 'sequential_decision', 'divide_and_conquer', 'probabilistic_inference',
                 'reinforcement_learning', 'attention_mechanism', 'representation_learning',
                 'heuristic_search', 'planning'
             ],
-            'Technique': [
+            TECHNIQUE: [
                 'technique', 'pruning', 'compression', 'computing', 'bottleneck',
                 'information_bottleneck', 'embedding_compression', 'approximate_computing',
                 'incremental_computing', 'rl_agent_pruning_strategy'
             ],
-            'Framework': [
+            FRAMEWORK: [
                 'framework', 'neural', 'network', 'reinforcement', 'contrastive',
                 'graph_neural_network', 'graph_reinforcement_learning', 
                 'graph_contrastive_learning'
             ],
-            'Task': [
+            TASK: [
                 'task', 'reasoning', 'prediction', 'classification', 'qa',
                 'graph_sparse_reasoning', 'relation_prediction', 'game_ai_reasoning',
                 'node_classification', 'complex_kg_qa', 'presampling_largckg'
             ],
-            'Metric': [
+            METRIC: [
                 'metric', 'reduction', 'accuracy', 'confidence', 'path', 'cost',
                 'explainability', 'exploration', 'reward', 'quality',
                 'compute_reduction', 'accuracy_retention', 'relation_confidence'
             ]
         }
+        
+        # 谓词模式规则: predicate -> ((是否作用于宾语, 类型, 权重), ...)
+        self._pred_rules = {
+            'implements': ((False, TECHNIQUE, 3), (True, ALGORITHM, 2)),
+            'builds_on': ((True, FRAMEWORK, 3),),
+            'has_algorithm': ((False, TASK, 3), (True, ALGORITHM, 2)),
+            'reduces_computation_by': ((False, TECHNIQUE, 2),),
+            'maintains_accuracy': ((False, TECHNIQUE, 2),),
+            'has_advantage': ((True, METRIC, 2),),
+            'has_challenge': ((True, METRIC, 2),),
+        }
     
     def infer_entity_types_from_triples(self, triples: List[Dict]) -> Dict[str, str]:
         """从三元组列表推断所有实体的类型"""
         entity_type_votes = defaultdict(Counter)
+        all_entities = set()
+        known_types = self.known_types
+        pred_rules = self._pred_rules
+        # 谓词模式投票先暂存，待名称投票之后再计入，
+        # 保持"实例声明 → 名称 → 谓词模式"的计票顺序（票数相同时most_common按先计入者取）
+        pattern_votes = []
         
-        # 第一轮：从is_instance_of关系直接获取类型
+        # 单次遍历：收集实体，同时处理is_instance_of声明并收集谓词模式投票
         for triple in triples:
             predicate = triple.get('predicate', '').lower()
             subject = triple.get('subject', '')
             obj = triple.get('object', '')
+            obj_is_literal = self._is_literal_value(obj)
+            
+            all_entities.add(subject)
+            if not obj_is_literal:
+                all_entities.add(obj)
             
             if predicate == 'is_instance_of':
                 # 直接类型声明
-                if obj in self.known_types:
+                if obj in known_types:
                     entity_type_votes[subject][obj] += 10  # 高权重
-                    
-        # 第二轮：从名称关键词推断
-        all_entities = set()
-        for triple in triples:
-            all_entities.add(triple.get('subject', ''))
-            obj = triple.get('object', '')
-            if not self._is_literal_value(obj):
-                all_entities.add(obj)
+            
+            elif predicate == 'uses_paradigm':
+                if not obj_is_literal:
+                    pattern_votes.append((subject, ALGORITHM, 3))
+                    if obj in known_types:
+                        pattern_votes.append((obj, PARADIGM, 3))
+            
+            else:
+                # 基于谓词模式推断主语/宾语类型
+                for on_object, entity_type, weight in pred_rules.get(predicate, ()):
+                    pattern_votes.append((obj if on_object else subject, entity_type, weight))
         
+        # 对去重后的实体做一次名称关键词推断
         for entity in all_entities:
             inferred_type = self._infer_type_from_name(entity)
             if inferred_type:
                 entity_type_votes[entity][inferred_type] += 5  # 中等权重
         
-        # 第三轮：从关系模式推断
-        for triple in triples:
-            predicate = triple.get('predicate', '').lower()
-            subject = triple.get('subject', '')
-            obj = triple.get('object', '')
-            
-            # 基于谓词模式推断主语类型
-            if predicate == 'uses_paradigm' and not self._is_literal_value(obj):
-                entity_type_votes[subject]['Algorithm'] += 3
-                if obj in self.known_types:
-                    entity_type_votes[obj]['Paradigm'] += 3
-            
-            elif predicate == 'implements':
-                entity_type_votes[subject]['Technique'] += 3
-                entity_type_votes[obj]['Algorithm'] += 2
-            
-            elif predicate == 'builds_on':
-                entity_type_votes[obj]['Framework'] += 3
-            
-            elif predicate == 'has_algorithm':
-                entity_type_votes[subject]['Task'] += 3
-                entity_type_votes[obj]['Algorithm'] += 2
-                
-            elif predicate in ['reduces_computation_by', 'maintains_accuracy']:
-                entity_type_votes[subject]['Technique'] += 2
-                
-            elif predicate in ['has_advantage', 'has_challenge']:
-                entity_type_votes[obj]['Metric'] += 2
+        # 计入谓词模式投票
+        for entity, entity_type, weight in pattern_votes:
+            entity_type_votes[entity][entity_type] += weight
         
         # 决定最终类型
         final_types = {}
@@ -111,12 +119,12 @@ class EntityTypeInferer:
             if votes:
                 final_types[entity] = votes.most_common(1)[0][0]
             else:
-                final_types[entity] = 'Unknown'
+                final_types[entity] = UNKNOWN
         
         # 为没有投票的实体分配Unknown
         for entity in all_entities:
             if entity not in final_types:
-                final_types[entity] = 'Unknown'
+                final_types[entity] = UNKNOWN
         
         return final_types
     
@@ -170,7 +178,7 @@ class EntityTypeInferer:
             if predicate == 'is_instance_of' and obj in self.known_types:
                 # 检查是否与直接声明的类型一致
                 declared_type = obj
-                inferred_type = entity_types.get(subject, 'Unknown')
+                inferred_type = entity_types.get(subject, UNKNOWN)
                 if inferred_type != declared_type:
                     issues[subject].append(f"推断类型({inferred_type})与声明类型({declared_type})不一致")
         
@@ -4,14 +4,44 @@
 规则抽取 → 规则失败时使用LLM抽取
 """
 
+import asyncio
+import hashlib
+import json
+import logging
+import re
 import time
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from dataclasses import dataclass
 
 from pipeline.rule_based_triple_extractor import RuleBasedTripleExtractor, TripleExtractionResult
-from pipeline.llm_client import LLMClient
+from pipeline.llm_client import (
+    LLMClient, LLMClientPool, count_tokens, MODEL_CONTEXT_TOKENS, DEFAULT_CONTEXT_TOKENS,
+    EXTRACTION_MAX_TOKENS, EXTRACTION_TEMPERATURE
+)
 from ontology.managers.dynamic_schema import DynamicOntologyManager
 
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?。！？])\s*')
+
+class FallbackDecision(NamedTuple):
+    """LLM兜底判断结果"""
+    need_llm: bool
+    rule_count: int
+    high_confidence_count: int
+    expected_triples: Optional[int]  # 前两个条件已触发时不计算文本复杂度，为None
+
+@dataclass(frozen=True)
+class _SchemaPrompt:
+    """按Schema版本缓存的提示词相关数据"""
+    key: Tuple[int, str]
+    schema_info: Dict[str, Any]
+    fingerprint: str
+    prompt_parts: Tuple[str, str]
+    prompt_tokens: int
+
 @dataclass
 class HybridExtractionResult:
     """混合抽取结果"""
@@ -27,12 +57,22 @@ class HybridTripleExtractor:
     def __init__(self, ontology_manager: DynamicOntologyManager):
         self.ontology_manager = ontology_manager
         self.rule_extractor = RuleBasedTripleExtractor(ontology_manager)
-        self.llm_client = LLMClient()
+        # 配置了多个端点时在端点间负载均衡并自动故障切换；
+        # LLM响应由各端点的LLMClient按提示词缓存，这里不再另设一层结果缓存
+        self.llm_client = LLMClientPool.from_config()
         
         # 配置参数
         self.min_rule_confidence = 0.6  # 规则抽取最低置信度
         self.min_rule_count = 3  # 规则抽取最少三元组数量
         self.use_llm_fallback = True  # 是否启用LLM兜底
+        
+        # LLM输入分块参数：可用于正文的token = (上下文窗口 - 提示词开销 - 输出预留) × (1 - 安全余量)
+        self.llm_output_tokens = EXTRACTION_MAX_TOKENS  # 与LLMClient抽取调用的max_tokens一致
+        self.llm_token_safety_margin = 0.2
+        self.min_chunk_tokens = 200  # 低于此长度的分块不再继续拆分重试
+        
+        # Schema信息、指纹和提示词前后缀只在Schema版本变化时重建
+        self._schema_prompt_cache: Optional[_SchemaPrompt] = None
     
     def extract_triples(self, text: str) -> HybridExtractionResult:
         """
@@ -46,62 +86,39 @@ class HybridTripleExtractor:
         """
         start_time = time.time()
         methods_used = []
+        debug = logger.isEnabledFor(logging.DEBUG)
         
-        print(f"\n🔄 混合抽取器开始处理")
-        print(f"📝 文本长度: {len(text)} 字符")
-        print("=" * 60)
+        logger.debug("🔄 混合抽取器开始处理，文本长度: %d 字符", len(text))
         
         # 第一阶段：规则抽取
-        print(f"\n🔧 阶段1: 规则抽取")
-        rule_results = self.rule_extractor.extract_triples(text)
-        
-        # 转换为标准格式
-        rule_triples = []
-        for result in rule_results:
-            triple = {
-                "subject": result.subject,
-                "predicate": result.predicate,
-                "object": result.object,
-                "confidence": result.confidence,
-                "method": result.method,
-                "evidence": result.evidence
-            }
-            rule_triples.append(triple)
-        
-        print(f"   📊 规则抽取结果: {len(rule_triples)} 个三元组")
-        
-        # 分析规则抽取质量
-        high_confidence_rules = [t for t in rule_triples if t["confidence"] >= self.min_rule_confidence]
-        rule_quality_score = len(high_confidence_rules) / max(len(rule_triples), 1)
-        
-        print(f"   📈 高置信度三元组: {len(high_confidence_rules)} 个")
-        print(f"   🎯 规则质量分数: {rule_quality_score:.2f}")
+        rule_triples = self._rule_extract_triples(text)
         
         methods_used.append("rule_extraction")
         
         # 第二阶段：判断是否需要LLM兜底
-        need_llm_fallback = self._should_use_llm_fallback(rule_triples, text)
+        decision = self._fallback_decision(rule_triples, text)
+        if debug:
+            logger.debug("🔧 规则抽取结果: %d 个三元组，高置信度 %d 个，质量分数 %.2f",
+                         decision.rule_count, decision.high_confidence_count,
+                         decision.high_confidence_count / max(decision.rule_count, 1))
         
         llm_triples = []
-        if need_llm_fallback and self.use_llm_fallback:
-            print(f"\n🤖 阶段2: LLM兜底抽取")
-            print(f"   🔍 触发原因: {self._get_fallback_reason(rule_triples, text)}")
+        if self.use_llm_fallback and decision.need_llm:
+            if debug:
+                logger.debug("🤖 LLM兜底抽取，触发原因: %s", self._get_fallback_reason(rule_triples, text, decision))
             
             llm_triples = self._llm_extract_triples(text)
-            print(f"   📊 LLM抽取结果: {len(llm_triples)} 个三元组")
+            logger.debug("📊 LLM抽取结果: %d 个三元组", len(llm_triples))
             methods_used.append("llm_extraction")
         else:
-            print(f"\n✅ 规则抽取充分，无需LLM兜底")
+            logger.debug("✅ 规则抽取充分，无需LLM兜底")
         
         # 第三阶段：结果合并和去重
-        print(f"\n🔄 阶段3: 结果合并")
         final_triples = self._merge_and_deduplicate(rule_triples, llm_triples)
         
         total_time = time.time() - start_time
         
-        print(f"   📊 最终结果: {len(final_triples)} 个三元组")
-        print(f"   ⏱️ 总耗时: {total_time:.2f}s")
-        print("=" * 60)
+        logger.debug("📊 最终结果: %d 个三元组，总耗时: %.2fs", len(final_triples), total_time)
         
         return HybridExtractionResult(
             triples=final_triples,
@@ -111,73 +128,456 @@ class HybridTripleExtractor:
             methods_used=methods_used
         )
     
-    def _should_use_llm_fallback(self, rule_triples: List[Dict[str, Any]], text: str) -> bool:
-        """判断是否需要LLM兜底"""
-        # 条件1: 规则抽取数量不足
-        if len(rule_triples) < self.min_rule_count:
-            return True
+    def extract_triples_batch(self, texts: List[str], max_concurrency: int = 8,
+                              checkpoint_path: Optional[str] = None) -> List[HybridExtractionResult]:
+        """
+        批量混合抽取三元组（同步入口）
         
-        # 条件2: 高置信度三元组比例过低
-        high_confidence_count = sum(1 for t in rule_triples if t["confidence"] >= self.min_rule_confidence)
-        if high_confidence_count / len(rule_triples) < 0.5:
-            return True
+        在已有事件循环的线程中（如Jupyter、异步服务）调用时，
+        改为在独立线程的新事件循环中执行；异步代码中应直接使用 aextract_triples_batch。
+        参数与返回值同 aextract_triples_batch。
+        """
+        coro = self.aextract_triples_batch(texts, max_concurrency, checkpoint_path)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+    
+    async def aextract_triples_batch(self, texts: List[str], max_concurrency: int = 8,
+                                     checkpoint_path: Optional[str] = None) -> List[HybridExtractionResult]:
+        """
+        批量混合抽取三元组
         
-        # 条件3: 文本复杂度高但抽取结果少
-        text_complexity = self._calculate_text_complexity(text)
-        expected_triples = max(3, text_complexity // 100)  # 每100字符期望至少1个三元组
+        先对全部文本做规则抽取，再把需要LLM兜底的文本并发提交给LLM，
+        并发数由信号量限制，整体耗时取决于最慢的一批请求而不是请求数之和。
         
-        if len(rule_triples) < expected_triples * 0.5:
-            return True
+        Args:
+            texts: 输入文本列表
+            max_concurrency: 同时进行的LLM请求上限
+            checkpoint_path: JSONL检查点文件，LLM结果逐条追加写入，
+                中断后重跑会跳过已完成的文本
+            
+        Returns:
+            与texts一一对应的混合抽取结果（total_time为整个批次的耗时）
+        """
+        start_time = time.time()
+        
+        # 第一遍：规则抽取，并收集需要LLM兜底的文本
+        rule_triples_list, fallback_indices = self._rule_extract_batch(texts)
+        
+        logger.info("🔄 批量混合抽取: %d 个文本，其中 %d 个需要LLM兜底", len(texts), len(fallback_indices))
+        
+        # 第二遍：并发LLM兜底
+        llm_triples_by_index = {}
+        if fallback_indices:
+            llm_results = await self._llm_extract_batch(
+                [texts[i] for i in fallback_indices], max_concurrency, checkpoint_path
+            )
+            llm_triples_by_index = dict(zip(fallback_indices, llm_results))
+        
+        return self._assemble_batch_results(rule_triples_list, llm_triples_by_index, time.time() - start_time)
+    
+    def extract_triples_batch_offline(self, texts: List[str], batch_input_path: str,
+                                      poll_interval: float = 60.0) -> List[HybridExtractionResult]:
+        """
+        通过OpenAI Batch API离线批量抽取三元组
+        
+        适用于大规模离线入库：需要LLM兜底的文本写成Batch API的JSONL请求文件，
+        上传后在24小时窗口内由服务端批量处理，费用约为实时调用的一半。
+        本方法会阻塞轮询直到批任务结束。已缓存的文本不会重复提交。
         
-        return False
+        Args:
+            texts: 输入文本列表
+            batch_input_path: Batch API请求JSONL文件的写入路径
+            poll_interval: 轮询批任务状态的间隔（秒）
+            
+        Returns:
+            与texts一一对应的混合抽取结果（total_time为整个批次的耗时）
+        """
+        start_time = time.time()
+        
+        rule_triples_list, fallback_indices = self._rule_extract_batch(texts)
+        logger.info("📦 离线批量抽取: %d 个文本，其中 %d 个需要LLM兜底", len(texts), len(fallback_indices))
+        
+        llm_triples_by_index = {}
+        if fallback_indices and self.llm_client.mock_mode:
+            # 模拟模式没有可提交的服务端，逐条生成模拟结果
+            for i in fallback_indices:
+                llm_triples_by_index[i] = self._llm_extract_triples(texts[i])
+        elif fallback_indices:
+            # 与实时抽取共用该端点LLMClient的提示词缓存
+            endpoint_client = self._batch_endpoint_client()
+            schema_prompt = self._schema_prompt()
+            prompts = {}
+            for i in fallback_indices:
+                prompt = LLMClient._build_extraction_prompt(texts[i], schema_prompt.schema_info, schema_prompt.prompt_parts)
+                cached_response = endpoint_client._cache_get(endpoint_client._extraction_cache_key(prompt))
+                if cached_response is not None:
+                    llm_triples_by_index[i] = self._tag_llm_triples(LLMClient._parse_triples_response(cached_response))
+                else:
+                    prompts[i] = prompt
+            
+            if prompts:
+                logger.info("📤 提交 %d 条请求（%d 条命中缓存）", len(prompts), len(fallback_indices) - len(prompts))
+                responses = self._run_openai_batch(
+                    endpoint_client, {str(i): prompt for i, prompt in prompts.items()}, batch_input_path, poll_interval
+                )
+                for i, prompt in prompts.items():
+                    content = responses.get(str(i))
+                    llm_triples = self._tag_llm_triples(LLMClient._parse_triples_response(content)) if content else []
+                    if llm_triples:
+                        endpoint_client._cache_set(endpoint_client._extraction_cache_key(prompt), content)
+                    llm_triples_by_index[i] = llm_triples
+        
+        return self._assemble_batch_results(rule_triples_list, llm_triples_by_index, time.time() - start_time)
+    
+    def _batch_endpoint_client(self) -> LLMClient:
+        """提交Batch API任务使用的端点客户端"""
+        endpoint_client = next(
+            (endpoint.client for endpoint in self.llm_client.endpoints if endpoint.client._openai is not None),
+            None
+        )
+        if endpoint_client is None:
+            raise RuntimeError("没有可用的OpenAI客户端，无法提交Batch API任务（未安装openai或未配置API密钥）")
+        return endpoint_client
+    
+    def _run_openai_batch(self, endpoint_client: LLMClient, prompts: Dict[str, str],
+                          batch_input_path: str, poll_interval: float) -> Dict[str, str]:
+        """提交Batch API任务并等待完成，返回 custom_id -> 响应文本"""
+        # 复用端点上已创建的OpenAI客户端（共享连接池、超时与重试配置）
+        client = endpoint_client._openai
+        
+        with open(batch_input_path, 'w', encoding='utf-8') as f:
+            for custom_id, prompt in prompts.items():
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": endpoint_client.model,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": EXTRACTION_MAX_TOKENS,
+                        "temperature": EXTRACTION_TEMPERATURE
+                    }
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        
+        with open(batch_input_path, 'rb') as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("🆔 批任务已创建: %s", batch.id)
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            if counts is not None:
+                logger.info("⏳ 批任务状态: %s (%d/%d)", batch.status, counts.completed, counts.total)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.warning("⚠️ 批任务未成功完成: %s", batch.status)
+            return {}
+        
+        responses = {}
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            choices = response.get("body", {}).get("choices") or []
+            if choices:
+                responses[record["custom_id"]] = choices[0]["message"]["content"]
+        
+        logger.info("📥 批任务完成: %d/%d 条成功", len(responses), len(prompts))
+        return responses
+    
+    def _rule_extract_batch(self, texts: List[str]) -> Tuple[List[List[Dict[str, Any]]], List[int]]:
+        """对全部文本做规则抽取，返回规则结果和需要LLM兜底的文本下标"""
+        rule_triples_list = [self._rule_extract_triples(text) for text in texts]
+        fallback_indices = []
+        if self.use_llm_fallback:
+            fallback_indices = [
+                i for i, (text, rule_triples) in enumerate(zip(texts, rule_triples_list))
+                if self._should_use_llm_fallback(rule_triples, text)
+            ]
+        return rule_triples_list, fallback_indices
+    
+    def _assemble_batch_results(self, rule_triples_list: List[List[Dict[str, Any]]],
+                                llm_triples_by_index: Dict[int, List[Dict[str, Any]]],
+                                total_time: float) -> List[HybridExtractionResult]:
+        """合并规则结果和LLM结果，生成批量抽取结果"""
+        results = []
+        for i, rule_triples in enumerate(rule_triples_list):
+            methods_used = ["rule_extraction"]
+            llm_triples = llm_triples_by_index.get(i, [])
+            if i in llm_triples_by_index:
+                methods_used.append("llm_extraction")
+            results.append(HybridExtractionResult(
+                triples=self._merge_and_deduplicate(rule_triples, llm_triples),
+                rule_count=len(rule_triples),
+                llm_count=len(llm_triples),
+                total_time=total_time,
+                methods_used=methods_used
+            ))
+        return results
     
-    def _get_fallback_reason(self, rule_triples: List[Dict[str, Any]], text: str) -> str:
+    async def _llm_extract_batch(self, texts: List[str], max_concurrency: int,
+                                 checkpoint_path: Optional[str]) -> List[List[Dict[str, Any]]]:
+        """并发执行LLM抽取，可选JSONL检查点"""
+        completed = self._load_checkpoint(checkpoint_path) if checkpoint_path else {}
+        if completed:
+            logger.info("📂 从检查点恢复 %d 条LLM结果", len(completed))
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def extract_one(text: str) -> List[Dict[str, Any]]:
+            key = self._result_key(text)
+            if key in completed:
+                return completed[key]
+            
+            async with semaphore:
+                triples = await asyncio.to_thread(self._llm_extract_triples, text)
+            
+            if checkpoint_path:
+                # 写入在事件循环线程内完成，各条记录不会交错
+                with open(checkpoint_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key": key, "triples": triples}, ensure_ascii=False) + "\n")
+            return triples
+        
+        return await asyncio.gather(*(extract_one(text) for text in texts))
+    
+    def _load_checkpoint(self, checkpoint_path: str) -> Dict[str, List[Dict[str, Any]]]:
+        """读取JSONL检查点"""
+        completed = {}
+        path = Path(checkpoint_path)
+        if not path.exists():
+            return completed
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    completed[record["key"]] = record["triples"]
+                except (json.JSONDecodeError, KeyError):
+                    # 中断时可能留下不完整的最后一行
+                    continue
+        return completed
+    
+    @staticmethod
+    def _text_key(text: str) -> str:
+        """文本内容的哈希键"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _rule_extract_triples(self, text: str) -> List[Dict[str, Any]]:
+        """规则抽取并转换为标准格式"""
+        return [
+            {
+                "subject": result.subject,
+                "predicate": result.predicate,
+                "object": result.object,
+                "confidence": result.confidence,
+                "method": result.method,
+                "evidence": result.evidence
+            }
+            for result in self.rule_extractor.extract_triples(text)
+        ]
+    
+    def _fallback_decision(self, rule_triples: List[Dict[str, Any]], text: str) -> FallbackDecision:
+        """一次遍历规则结果，计算是否需要LLM兜底及相关统计"""
+        rule_count = len(rule_triples)
+        high_confidence_count = sum(1 for t in rule_triples if t["confidence"] >= self.min_rule_confidence)
+        
+        # 条件1: 规则抽取数量不足；条件2: 高置信度三元组比例过低（无结果时视为比例为0）
+        if rule_count < self.min_rule_count or high_confidence_count / max(rule_count, 1) < 0.5:
+            return FallbackDecision(True, rule_count, high_confidence_count, None)
+        
+        # 条件3: 文本复杂度高但抽取结果少
+        expected_triples = self._expected_triple_count(text)
+        need_llm = rule_count < expected_triples * 0.5
+        return FallbackDecision(need_llm, rule_count, high_confidence_count, expected_triples)
+    
+    def _expected_triple_count(self, text: str) -> int:
+        """按文本复杂度估计的期望三元组数（每100字符期望至少1个）"""
+        return max(3, self._calculate_text_complexity(text) // 100)
+    
+    def _should_use_llm_fallback(self, rule_triples: List[Dict[str, Any]], text: str) -> bool:
+        """判断是否需要LLM兜底"""
+        return self._fallback_decision(rule_triples, text).need_llm
+    
+    def _get_fallback_reason(self, rule_triples: List[Dict[str, Any]], text: str,
+                             decision: Optional[FallbackDecision] = None) -> str:
         """获取LLM兜底的原因"""
+        if decision is None:
+            decision = self._fallback_decision(rule_triples, text)
+        
         reasons = []
         
-        if len(rule_triples) < self.min_rule_count:
-            reasons.append(f"三元组数量不足({len(rule_triples)}<{self.min_rule_count})")
+        if decision.rule_count < self.min_rule_count:
+            reasons.append(f"三元组数量不足({decision.rule_count}<{self.min_rule_count})")
         
-        high_confidence_count = sum(1 for t in rule_triples if t["confidence"] >= self.min_rule_confidence)
-        if len(rule_triples) > 0 and high_confidence_count / len(rule_triples) < 0.5:
-            reasons.append(f"高置信度比例过低({high_confidence_count}/{len(rule_triples)})")
+        if decision.rule_count > 0 and decision.high_confidence_count / decision.rule_count < 0.5:
+            reasons.append(f"高置信度比例过低({decision.high_confidence_count}/{decision.rule_count})")
         
-        text_complexity = self._calculate_text_complexity(text)
-        expected_triples = max(3, text_complexity // 100)
-        if len(rule_triples) < expected_triples * 0.5:
-            reasons.append(f"抽取密度过低({len(rule_triples)}<{expected_triples*0.5:.1f})")
+        expected_triples = decision.expected_triples
+        if expected_triples is None:
+            expected_triples = self._expected_triple_count(text)
+        if decision.rule_count < expected_triples * 0.5:
+            reasons.append(f"抽取密度过低({decision.rule_count}<{expected_triples*0.5:.1f})")
         
         return "; ".join(reasons) if reasons else "未知原因"
     
     def _calculate_text_complexity(self, text: str) -> int:
         """计算文本复杂度"""
         # 简单的复杂度计算：字符数 + 句子数 + 实体数估计
+        # 两次split都在C层完成，实测比逐字符的Python循环快数倍，因此保留
         char_count = len(text)
         sentence_count = len([s for s in text.split('.') if len(s.strip()) > 5])
-        entity_estimate = len([w for w in text.split() if w[0].isupper()]) if text else 0
+        entity_estimate = len([w for w in text.split() if w[0].isupper()])
         
         return char_count + sentence_count * 10 + entity_estimate * 5
     
-    def _llm_extract_triples(self, text: str) -> List[Dict[str, Any]]:
-        """使用LLM抽取三元组"""
+    def _schema_prompt(self) -> _SchemaPrompt:
+        """获取当前Schema对应的提示词缓存，Schema版本或模型变化时重建"""
+        key = (getattr(self.ontology_manager, 'schema_version', 0), self.llm_client.model)
+        cached = self._schema_prompt_cache
+        if cached is not None and cached.key == key:
+            return cached
+        
         schema_info = {
             'name': self.ontology_manager.metadata.get('name', '未知Schema'),
             'entity_types': self.ontology_manager.entity_types,
             'relation_types': self.ontology_manager.relation_types
         }
         
-        # 调用LLM抽取
-        llm_triples = self.llm_client.extract_triples(text, schema_info)
+        # 跨进程一致的指纹，用作缓存键的一部分
+        parts = [
+            self.llm_client.model,
+            str(schema_info['name']),
+            ','.join(sorted(schema_info['entity_types'])),
+            ','.join(sorted(schema_info['relation_types']))
+        ]
+        fingerprint = hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+        
+        prompt_parts = LLMClient._extraction_prompt_parts(schema_info)
+        prompt_tokens = count_tokens(''.join(prompt_parts), self.llm_client.model)
         
-        # 标记LLM来源
+        self._schema_prompt_cache = _SchemaPrompt(key, schema_info, fingerprint, prompt_parts, prompt_tokens)
+        return self._schema_prompt_cache
+    
+    def _schema_fingerprint(self) -> str:
+        """当前Schema的稳定指纹"""
+        return self._schema_prompt().fingerprint
+    
+    def _schema_info(self) -> Dict[str, Any]:
+        """传给LLM的Schema信息"""
+        return self._schema_prompt().schema_info
+    
+    def _result_key(self, text: str) -> str:
+        """检查点记录的键（文本哈希 + Schema指纹）"""
+        return f"{self._text_key(text)}:{self._schema_fingerprint()}"
+    
+    @staticmethod
+    def _tag_llm_triples(llm_triples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """标记LLM来源"""
         for triple in llm_triples:
             if "method" not in triple:
                 triple["method"] = "llm_extraction"
             if "evidence" not in triple:
                 triple["evidence"] = "LLM generated"
+        return llm_triples
+    
+    def _llm_extract_triples(self, text: str) -> List[Dict[str, Any]]:
+        """使用LLM抽取三元组，超出上下文窗口的文本按句子边界分块抽取后合并"""
+        schema_prompt = self._schema_prompt()
+        chunks = self._split_text_for_llm(text, schema_prompt)
+        
+        if len(chunks) == 1:
+            llm_triples = self._llm_extract_chunk(text, schema_prompt)
+        else:
+            logger.debug("✂️ 文本超出LLM上下文预算，分为 %d 块抽取", len(chunks))
+            with ThreadPoolExecutor(max_workers=min(len(chunks), 8)) as executor:
+                chunk_results = list(executor.map(lambda chunk: self._llm_extract_chunk(chunk, schema_prompt), chunks))
+            llm_triples = self._merge_and_deduplicate([], [t for triples in chunk_results for t in triples])
         
         return llm_triples
     
+    def _llm_extract_chunk(self, chunk: str, schema_prompt: _SchemaPrompt,
+                           allow_split: bool = True) -> List[Dict[str, Any]]:
+        """
+        对单个分块调用LLM
+        
+        客户端不暴露finish_reason，输出被截断时JSON解析失败会得到空结果，
+        因此较长分块返回空结果时对半拆分重试一次。
+        """
+        llm_triples = self._tag_llm_triples(self.llm_client.extract_triples(
+            chunk, schema_prompt.schema_info, schema_prompt.prompt_parts
+        ))
+        if llm_triples or not allow_split or self.llm_client.mock_mode:
+            return llm_triples
+        
+        if count_tokens(chunk, self.llm_client.model) < 2 * self.min_chunk_tokens:
+            return llm_triples
+        
+        halves = self._pack_sentences(_SENTENCE_SPLIT_RE.split(chunk), count_tokens(chunk, self.llm_client.model) // 2)
+        if len(halves) < 2:
+            return llm_triples
+        
+        logger.debug("✂️ 分块抽取结果为空，拆分为 %d 块重试", len(halves))
+        return [t for half in halves for t in self._llm_extract_chunk(half, schema_prompt, allow_split=False)]
+    
+    def _chunk_token_budget(self, schema_prompt: _SchemaPrompt) -> int:
+        """单个分块可用的正文token数"""
+        context_tokens = MODEL_CONTEXT_TOKENS.get(self.llm_client.model, DEFAULT_CONTEXT_TOKENS)
+        budget = (context_tokens - schema_prompt.prompt_tokens - self.llm_output_tokens) * (1 - self.llm_token_safety_margin)
+        return max(int(budget), self.min_chunk_tokens)
+    
+    def _split_text_for_llm(self, text: str, schema_prompt: _SchemaPrompt) -> List[str]:
+        """按token预算把文本切分为若干块，尽量在句子边界处切分"""
+        budget = self._chunk_token_budget(schema_prompt)
+        if count_tokens(text, self.llm_client.model) <= budget:
+            return [text]
+        return self._pack_sentences(_SENTENCE_SPLIT_RE.split(text), budget)
+    
+    def _pack_sentences(self, sentences: List[str], budget: int) -> List[str]:
+        """把句子贪心地装入不超过budget个token的分块，超长句子按字符硬切"""
+        model = self.llm_client.model
+        chunks = []
+        current = []
+        current_tokens = 0
+        
+        for sentence in sentences:
+            if not sentence:
+                continue
+            sentence_tokens = count_tokens(sentence, model)
+            
+            if sentence_tokens > budget:
+                if current:
+                    chunks.append(" ".join(current))
+                    current, current_tokens = [], 0
+                # 按token与字符的比例估算切分步长
+                step = max(1, len(sentence) * budget // sentence_tokens)
+                chunks.extend(sentence[i:i + step] for i in range(0, len(sentence), step))
+                continue
+            
+            if current and current_tokens + sentence_tokens > budget:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += sentence_tokens
+        
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+    
     def _merge_and_deduplicate(self, rule_triples: List[Dict[str, Any]], 
                               llm_triples: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """合并和去重三元组"""
@@ -186,37 +586,22 @@ class HybridTripleExtractor:
         if not all_triples:
             return []
         
-        # 简单去重：基于主语-谓语-宾语的组合
-        seen_triples = set()
-        unique_triples = []
-        
+        # 简单去重：基于主语-谓语-宾语的组合，重复时保留置信度更高的
+        best_triples = {}
         for triple in all_triples:
             triple_key = (
                 triple["subject"].lower().strip(),
                 triple["predicate"].lower().strip(),
                 triple["object"].lower().strip()
             )
-            
-            if triple_key not in seen_triples:
-                seen_triples.add(triple_key)
-                unique_triples.append(triple)
-            else:
-                # 如果重复，保留置信度更高的
-                for i, existing in enumerate(unique_triples):
-                    existing_key = (
-                        existing["subject"].lower().strip(),
-                        existing["predicate"].lower().strip(),
-                        existing["object"].lower().strip()
-                    )
-                    if existing_key == triple_key:
-                        if triple.get("confidence", 0) > existing.get("confidence", 0):
-                            unique_triples[i] = triple
-                        break
+            existing = best_triples.get(triple_key)
+            if existing is None or triple.get("confidence", 0) > existing.get("confidence", 0):
+                best_triples[triple_key] = triple
         
         # 按置信度排序
-        unique_triples.sort(key=lambda x: x.get("confidence", 0), reverse=True)
+        unique_triples = sorted(best_triples.values(), key=lambda x: x.get("confidence", 0), reverse=True)
         
-        print(f"   🔄 去重前: {len(all_triples)} 个，去重后: {len(unique_triples)} 个")
+        logger.debug("🔄 去重前: %d 个，去重后: %d 个", len(all_triples), len(unique_triples))
         
         return unique_triples
     
@@ -3,6 +3,7 @@
 支持模糊查询、子图检索、两跳扩展等功能
 """
 
+import heapq
 import json
 import re
 from typing import List, Dict, Any, Optional, Set, Tuple
@@ -12,8 +13,81 @@ import numpy as np
 from collections import defaultdict, deque
 import difflib
 
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from ontology.managers.dynamic_schema import DynamicOntologyManager
 
+_WORD_RE = re.compile(r'\w+')
+_STOPWORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, nogil=True)
+    def _bfs_kernel(indptr, neighbors, edge_ids, is_entity, seeds, hops, max_nodes, num_edges):
+        """限定跳数的BFS（numba编译版），语义与KGRetriever._bfs一致"""
+        num_nodes = indptr.shape[0] - 1
+        visited = np.zeros(num_nodes, dtype=np.bool_)
+        edge_seen = np.zeros(num_edges, dtype=np.bool_)
+        visit_order = np.empty(num_nodes, dtype=np.int64)
+        edge_order = np.empty(num_edges, dtype=np.int64)
+        visit_count = 0
+        edge_count = 0
+        node_count = 0
+        
+        # 每个节点只展开一次，入队次数不超过 种子数 + 邻接表长度
+        capacity = seeds.shape[0] + neighbors.shape[0]
+        queue_nodes = np.empty(capacity, dtype=np.int64)
+        queue_hops = np.empty(capacity, dtype=np.int64)
+        head = 0
+        tail = 0
+        for seed in seeds:
+            queue_nodes[tail] = seed
+            queue_hops[tail] = 0
+            tail += 1
+        
+        while head < tail and node_count < max_nodes:
+            node = queue_nodes[head]
+            hop = queue_hops[head]
+            head += 1
+            if visited[node] or hop > hops:
+                continue
+            
+            visited[node] = True
+            visit_order[visit_count] = node
+            visit_count += 1
+            if is_entity[node]:
+                node_count += 1
+            
+            for k in range(indptr[node], indptr[node + 1]):
+                edge_id = edge_ids[k]
+                if not edge_seen[edge_id]:
+                    edge_seen[edge_id] = True
+                    edge_order[edge_count] = edge_id
+                    edge_count += 1
+                
+                neighbor = neighbors[k]
+                if hop < hops and neighbor != node and not visited[neighbor]:
+                    queue_nodes[tail] = neighbor
+                    queue_hops[tail] = hop + 1
+                    tail += 1
+        
+        return visit_order[:visit_count], edge_order[:edge_count]
+
 @dataclass
 class SearchResult:
     """搜索结果"""
@@ -34,6 +108,7 @@ class KGRetriever:
         self.entity_index = {}
         self.relation_index = {}
         self.graph_data = {}
+        self.max_fuzzy_candidates = 50  # 三元组索引召回后参与模糊打分的候选上限
         self._build_search_index()
     
     def _build_search_index(self):
@@ -48,33 +123,35 @@ class KGRetriever:
         self._build_relation_index()
     
     def _load_graph_data(self):
-        """加载图数据"""
+        """加载图数据
+
+        检索只用到实体和三元组，未被使用的relations.json不再加载。
+        """
         try:
             # 加载实体数据
             entities_file = self.storage_path / "entities.json"
             if entities_file.exists():
-                with open(entities_file, 'r', encoding='utf-8') as f:
-                    entities_data = json.load(f)
-                    self.graph_data['entities'] = {
-                        entity['name']: entity for entity in entities_data
-                    }
-            
-            # 加载关系数据
-            relations_file = self.storage_path / "relations.json"
-            if relations_file.exists():
-                with open(relations_file, 'r', encoding='utf-8') as f:
-                    relations_data = json.load(f)
-                    self.graph_data['relations'] = relations_data
+                entities_data = self._read_json(entities_file)
+                self.graph_data['entities'] = {
+                    entity['name']: entity for entity in entities_data
+                }
             
             # 加载三元组数据
             triples_file = self.storage_path / "triples.json"
             if triples_file.exists():
-                with open(triples_file, 'r', encoding='utf-8') as f:
-                    self.graph_data['triples'] = json.load(f)
+                self.graph_data['triples'] = self._read_json(triples_file)
             
         except Exception as e:
             print(f"加载图数据失败: {e}")
-            self.graph_data = {'entities': {}, 'relations': [], 'triples': []}
+            self.graph_data = {'entities': {}, 'triples': []}
+    
+    @staticmethod
+    def _read_json(file_path: Path) -> Any:
+        """读取JSON文件（安装了orjson时使用C实现解析）"""
+        if ORJSON_AVAILABLE:
+            return orjson.loads(file_path.read_bytes())
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
     
     def _build_entity_index(self):
         """构建实体索引"""
@@ -84,6 +161,8 @@ class KGRetriever:
             'by_keywords': defaultdict(set)
         }
         
+        self._entity_keywords: Dict[str, frozenset] = {}
+        
         entities = self.graph_data.get('entities', {})
         for entity_name, entity_data in entities.items():
             # 按名称索引
@@ -93,85 +172,180 @@ class KGRetriever:
             entity_type = entity_data.get('type', 'Unknown')
             self.entity_index['by_type'][entity_type].append(entity_data)
             
-            # 按关键词索引
-            keywords = self._extract_keywords(entity_name)
+            # 按关键词索引，同时缓存每个实体的关键词集合供相关性评分使用
+            keywords = frozenset(self._extract_keywords(entity_name))
+            self._entity_keywords[entity_name] = keywords
             for keyword in keywords:
                 self.entity_index['by_keywords'][keyword].add(entity_name)
+        
+        # 模糊匹配的候选名称列表和字符三元组倒排索引
+        self._entity_name_list = list(self.entity_index['by_name'].keys())
+        self._trigram_index = defaultdict(set)
+        for entity_name in self._entity_name_list:
+            for trigram in self._trigrams(entity_name):
+                self._trigram_index[trigram].add(entity_name)
     
     def _build_relation_index(self):
-        """构建关系索引"""
+        """构建关系索引
+
+        按实体的关系索引由CSR邻接数组承担（见_entity_edge_ids），只存三元组下标。
+        """
         self.relation_index = {
-            'by_type': defaultdict(list),
-            'by_entities': defaultdict(list)
+            'by_type': defaultdict(list)
         }
         
         triples = self.graph_data.get('triples', [])
         for triple in triples:
-            relation_type = triple.get('predicate', '')
-            subject = triple.get('subject', '')
-            object_entity = triple.get('object', '')
-            
             # 按关系类型索引
-            self.relation_index['by_type'][relation_type].append(triple)
-            
-            # 按实体索引
-            self.relation_index['by_entities'][subject].append(triple)
-            self.relation_index['by_entities'][object_entity].append(triple)
+            self.relation_index['by_type'][triple.get('predicate', '')].append(triple)
+        
+        self._build_adjacency(triples)
+    
+    def _build_adjacency(self, triples: List[Dict]):
+        """构建CSR邻接数组
+
+        节点（实体名）和边（三元组下标）都映射为整数ID；节点u的邻接项为
+        neighbors[indptr[u]:indptr[u+1]]，对应的三元组下标在edge_ids的同一区间，
+        并按三元组原始顺序排列。
+        """
+        self._node_ids = {}
+        self._node_names = []
+        
+        def node_id(name: str) -> int:
+            nid = self._node_ids.get(name)
+            if nid is None:
+                nid = self._node_ids[name] = len(self._node_names)
+                self._node_names.append(name)
+            return nid
+        
+        for entity_name in self.graph_data.get('entities', {}):
+            node_id(entity_name)
+        
+        # 每个三元组贡献两条有向邻接项：subject->object 和 object->subject
+        endpoints = []
+        for triple in triples:
+            endpoints.append(node_id(triple.get('subject', '')))
+            endpoints.append(node_id(triple.get('object', '')))
+        
+        num_nodes = len(self._node_names)
+        sources = np.array(endpoints, dtype=np.int32)
+        self._edge_endpoints = sources.reshape(-1, 2)  # 第i行为三元组i的 (subject, object) 节点ID
+        targets = self._edge_endpoints[:, ::-1].ravel()
+        edge_ids = np.repeat(np.arange(len(triples), dtype=np.int32), 2)
+        
+        order = np.argsort(sources, kind='stable')
+        self._csr_indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=self._csr_indptr[1:])
+        self._csr_neighbors = targets[order]
+        self._csr_edge_ids = edge_ids[order]
+        
+        # 节点是否为已知实体（BFS的节点数上限只统计实体）
+        by_name = self.entity_index['by_name']
+        self._is_entity = np.array(
+            [name.lower() in by_name for name in self._node_names], dtype=bool
+        )
+    
+    def _entity_edge_ids(self, entity_name: str) -> np.ndarray:
+        """实体关联的三元组下标（按三元组原始顺序，自环只出现一次）"""
+        node = self._node_ids.get(entity_name)
+        if node is None:
+            return self._csr_edge_ids[:0]
+        
+        edge_ids = self._csr_edge_ids[self._csr_indptr[node]:self._csr_indptr[node + 1]]
+        # 区间内按三元组下标升序排列，自环的两个邻接项相邻
+        if len(edge_ids) > 1:
+            edge_ids = edge_ids[np.concatenate(([True], edge_ids[1:] != edge_ids[:-1]))]
+        return edge_ids
+    
+    @staticmethod
+    def _trigrams(text: str) -> Set[str]:
+        """字符三元组（首尾补空格，使短名称也能产生三元组）"""
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def _trigram_candidates(self, query_lower: str, limit: int) -> List[str]:
+        """按共享三元组数量召回候选名称"""
+        shared_counts = defaultdict(int)
+        for trigram in self._trigrams(query_lower):
+            for entity_name in self._trigram_index.get(trigram, ()):
+                shared_counts[entity_name] += 1
+        return heapq.nlargest(limit, shared_counts, key=shared_counts.get)
     
     def _extract_keywords(self, text: str) -> List[str]:
-        """提取关键词"""
-        # 分割单词
-        words = re.findall(r'\w+', text.lower())
-        
-        # 过滤停用词
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        keywords = [word for word in words if word not in stop_words and len(word) > 2]
-        
-        return keywords
+        """提取关键词（分词后过滤停用词和过短的词）"""
+        return [word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS and len(word) > 2]
     
     def fuzzy_entity_search(self, query: str, threshold: float = 0.6) -> List[Dict]:
         """模糊实体搜索"""
         query_lower = query.lower()
+        by_name = self.entity_index['by_name']
         matched_entities = []
+        matched_names = set()
         
         # 1. 精确匹配
-        if query_lower in self.entity_index['by_name']:
-            entity = self.entity_index['by_name'][query_lower]
+        if query_lower in by_name:
+            entity = by_name[query_lower]
             matched_entities.append({
                 'entity': entity,
                 'match_type': 'exact',
                 'similarity': 1.0
             })
+            matched_names.add(entity['name'])
+        
+        # 2. 候选生成：关键词倒排表的并集 + 三元组索引召回的近似名称
+        keyword_candidates = set()
+        for keyword in self._extract_keywords(query):
+            keyword_candidates.update(self.entity_index['by_keywords'].get(keyword, ()))
+        
+        candidates = {entity_name.lower() for entity_name in keyword_candidates}
+        candidates.update(self._trigram_candidates(query_lower, self.max_fuzzy_candidates))
+        candidates.discard(query_lower)
         
-        # 2. 模糊匹配
-        for entity_name, entity_data in self.entity_index['by_name'].items():
-            if query_lower != entity_name:
-                similarity = difflib.SequenceMatcher(None, query_lower, entity_name).ratio()
-                if similarity >= threshold:
-                    matched_entities.append({
-                        'entity': entity_data,
-                        'match_type': 'fuzzy',
-                        'similarity': similarity
-                    })
-        
-        # 3. 关键词匹配
-        query_keywords = self._extract_keywords(query)
-        for keyword in query_keywords:
-            if keyword in self.entity_index['by_keywords']:
-                for entity_name in self.entity_index['by_keywords'][keyword]:
-                    entity_data = self.entity_index['by_name'].get(entity_name.lower())
-                    if entity_data and not any(m['entity']['name'] == entity_data['name'] for m in matched_entities):
-                        matched_entities.append({
-                            'entity': entity_data,
-                            'match_type': 'keyword',
-                            'similarity': 0.7
-                        })
+        # 3. 模糊匹配（仅对候选打分）
+        for entity_name, similarity in self._fuzzy_scores(query_lower, sorted(candidates), threshold):
+            entity_data = by_name[entity_name]
+            matched_entities.append({
+                'entity': entity_data,
+                'match_type': 'fuzzy',
+                'similarity': similarity
+            })
+            matched_names.add(entity_data['name'])
+        
+        # 4. 关键词匹配（未被前两步命中的候选）
+        for entity_name in keyword_candidates:
+            entity_data = by_name.get(entity_name.lower())
+            if entity_data and entity_data['name'] not in matched_names:
+                matched_entities.append({
+                    'entity': entity_data,
+                    'match_type': 'keyword',
+                    'similarity': 0.7
+                })
+                matched_names.add(entity_data['name'])
         
         # 按相似度排序
         matched_entities.sort(key=lambda x: x['similarity'], reverse=True)
         
         return matched_entities[:10]  # 返回前10个结果
     
+    def _fuzzy_scores(self, query_lower: str, choices: List[str], threshold: float) -> List[Tuple[str, float]]:
+        """计算候选名称与查询的相似度，返回不低于阈值的 (名称, 相似度)"""
+        if RAPIDFUZZ_AVAILABLE:
+            # C++实现的批量打分，分数范围0-100
+            return [
+                (name, score / 100.0)
+                for name, score, _ in process.extract(
+                    query_lower, choices, scorer=fuzz.ratio,
+                    score_cutoff=threshold * 100, limit=None
+                )
+            ]
+        
+        results = []
+        for name in choices:
+            similarity = difflib.SequenceMatcher(None, query_lower, name).ratio()
+            if similarity >= threshold:
+                results.append((name, similarity))
+        return results
+    
     def retrieve_subgraph(self, query: str, hops: int = 2, max_nodes: int = 50) -> SearchResult:
         """检索相关子图"""
         import time
@@ -191,15 +365,20 @@ class KGRetriever:
                 total_edges=0
             )
         
-        # 2. 子图扩展
+        # 2. 子图扩展（全程使用整数ID，剪枝后再转换为字典）
         seed_entities = [match['entity']['name'] for match in matched_entities[:5]]  # 取前5个作为种子
-        subgraph = self._expand_subgraph(seed_entities, hops, max_nodes)
+        node_ids, edge_ids = self._expand_subgraph(seed_entities, hops, max_nodes)
+        nodes = self._nodes_from_ids(node_ids)
         
         # 3. 计算相关性评分
-        relevance_scores = self._calculate_relevance_scores(subgraph, query, matched_entities)
+        relevance_scores = self._calculate_relevance_scores(nodes, edge_ids, query, matched_entities)
         
         # 4. 剪枝优化
-        pruned_subgraph = self._prune_subgraph(subgraph, relevance_scores, max_nodes)
+        kept_nodes, kept_edge_ids = self._prune_subgraph(nodes, edge_ids, relevance_scores, max_nodes)
+        pruned_subgraph = {
+            'nodes': kept_nodes,
+            'edges': self._edges_from_ids(kept_edge_ids)
+        }
         
         search_time = time.time() - start_time
         
@@ -213,62 +392,83 @@ class KGRetriever:
             total_edges=len(pruned_subgraph['edges'])
         )
     
-    def _expand_subgraph(self, seed_entities: List[str], hops: int, max_nodes: int) -> Dict:
-        """扩展子图"""
-        nodes = {}
+    def _expand_subgraph(self, seed_entities: List[str], hops: int, max_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+        """扩展子图（在CSR邻接数组上BFS），返回访问到的节点ID和边ID，每条边只出现一次"""
+        seeds = [self._node_ids[entity] for entity in seed_entities if entity in self._node_ids]
+        return self._bfs(seeds, hops, max_nodes)
+    
+    def _nodes_from_ids(self, node_ids: np.ndarray) -> List[Dict]:
+        """节点ID转换为实体字典（非实体节点跳过）"""
+        by_name = self.entity_index['by_name']
+        nodes = []
+        for node in node_ids.tolist():
+            entity_data = by_name.get(self._node_names[node].lower())
+            if entity_data:
+                nodes.append(entity_data)
+        return nodes
+    
+    def _edges_from_ids(self, edge_ids: np.ndarray) -> List[Dict]:
+        """边ID转换为边字典"""
+        triples = self.graph_data.get('triples', [])
         edges = []
-        visited = set()
-        
-        # BFS扩展
-        queue = deque([(entity, 0) for entity in seed_entities])
+        for edge_id in edge_ids.tolist():
+            triple = triples[edge_id]
+            edges.append({
+                'source': triple['subject'],
+                'target': triple['object'],
+                'relation': triple['predicate'],
+                'confidence': triple.get('confidence', 1.0),
+                'metadata': {
+                    'source_file': triple.get('source', ''),
+                    'evidence': triple.get('evidence', '')
+                }
+            })
+        return edges
+    
+    def _bfs(self, seeds: List[int], hops: int, max_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+        """限定跳数的BFS，返回按访问顺序的节点ID和按首次出现顺序的边ID"""
+        if NUMBA_AVAILABLE:
+            return _bfs_kernel(
+                self._csr_indptr, self._csr_neighbors, self._csr_edge_ids, self._is_entity,
+                np.asarray(seeds, dtype=np.int64), hops, max_nodes, len(self._edge_endpoints)
+            )
         
-        while queue and len(nodes) < max_nodes:
-            current_entity, current_hop = queue.popleft()
-            
-            if current_entity in visited or current_hop > hops:
+        indptr = self._csr_indptr
+        neighbors = self._csr_neighbors
+        edge_ids = self._csr_edge_ids
+        is_entity = self._is_entity
+        
+        visited = bytearray(len(self._node_names))
+        edge_seen = bytearray(len(self._edge_endpoints))
+        visit_order = []
+        edge_order = []
+        node_count = 0
+        
+        queue = deque((seed, 0) for seed in seeds)
+        while queue and node_count < max_nodes:
+            node, hop = queue.popleft()
+            if visited[node] or hop > hops:
                 continue
             
-            visited.add(current_entity)
-            
-            # 添加节点
-            entity_data = self.entity_index['by_name'].get(current_entity.lower())
-            if entity_data:
-                nodes[current_entity] = entity_data
-            
-            # 查找相关的三元组
-            related_triples = self.relation_index['by_entities'].get(current_entity, [])
+            visited[node] = 1
+            visit_order.append(node)
+            if is_entity[node]:
+                node_count += 1
             
-            for triple in related_triples:
-                subject = triple['subject']
-                object_entity = triple['object']
-                predicate = triple['predicate']
-                
-                # 添加边
-                edge = {
-                    'source': subject,
-                    'target': object_entity,
-                    'relation': predicate,
-                    'confidence': triple.get('confidence', 1.0),
-                    'metadata': {
-                        'source_file': triple.get('source', ''),
-                        'evidence': triple.get('evidence', '')
-                    }
-                }
-                edges.append(edge)
+            start, end = indptr[node], indptr[node + 1]
+            for neighbor, edge_id in zip(neighbors[start:end].tolist(), edge_ids[start:end].tolist()):
+                if not edge_seen[edge_id]:
+                    edge_seen[edge_id] = 1
+                    edge_order.append(edge_id)
                 
                 # 添加相邻节点到队列
-                if current_hop < hops:
-                    if subject != current_entity and subject not in visited:
-                        queue.append((subject, current_hop + 1))
-                    if object_entity != current_entity and object_entity not in visited:
-                        queue.append((object_entity, current_hop + 1))
+                if hop < hops and neighbor != node and not visited[neighbor]:
+                    queue.append((neighbor, hop + 1))
         
-        return {
-            'nodes': list(nodes.values()),
-            'edges': edges
-        }
+        return np.array(visit_order, dtype=np.int64), np.array(edge_order, dtype=np.int64)
     
-    def _calculate_relevance_scores(self, subgraph: Dict, query: str, matched_entities: List[Dict]) -> Dict[str, float]:
+    def _calculate_relevance_scores(self, nodes: List[Dict], edge_ids: np.ndarray, query: str,
+                                    matched_entities: List[Dict]) -> Dict[str, float]:
         """计算相关性评分"""
         scores = {}
         query_keywords = set(self._extract_keywords(query))
@@ -278,51 +478,54 @@ class KGRetriever:
             entity_name = match['entity']['name']
             scores[entity_name] = match['similarity']
         
+        # 按节点ID统计度数（自环只计一次）
+        endpoints = self._edge_endpoints[edge_ids]
+        num_nodes = len(self._node_names)
+        degree = np.bincount(endpoints[:, 0], minlength=num_nodes)
+        not_loop = endpoints[:, 1] != endpoints[:, 0]
+        degree += np.bincount(endpoints[not_loop, 1], minlength=num_nodes)
+        
         # 为其他节点计算评分
-        for node in subgraph['nodes']:
+        for node in nodes:
             node_name = node['name']
             if node_name not in scores:
                 # 基于关键词匹配
-                node_keywords = set(self._extract_keywords(node_name))
+                node_keywords = self._entity_keywords.get(node_name)
+                if node_keywords is None:
+                    node_keywords = frozenset(self._extract_keywords(node_name))
                 keyword_overlap = len(query_keywords & node_keywords)
                 keyword_score = keyword_overlap / max(len(query_keywords), 1)
                 
                 # 基于节点度数（连接数）
-                degree = sum(1 for edge in subgraph['edges'] 
-                           if edge['source'] == node_name or edge['target'] == node_name)
-                degree_score = min(degree / 10.0, 1.0)  # 归一化
+                node_degree = int(degree[self._node_ids[node_name]]) if node_name in self._node_ids else 0
+                degree_score = min(node_degree / 10.0, 1.0)  # 归一化
                 
                 # 综合评分
                 scores[node_name] = 0.7 * keyword_score + 0.3 * degree_score
         
         return scores
     
-    def _prune_subgraph(self, subgraph: Dict, relevance_scores: Dict[str, float], max_nodes: int) -> Dict:
-        """剪枝子图"""
-        if len(subgraph['nodes']) <= max_nodes:
-            return subgraph
+    def _prune_subgraph(self, nodes: List[Dict], edge_ids: np.ndarray, relevance_scores: Dict[str, float],
+                        max_nodes: int) -> Tuple[List[Dict], np.ndarray]:
+        """剪枝子图，返回保留的节点和边ID"""
+        if len(nodes) <= max_nodes:
+            return nodes, edge_ids
         
         # 按相关性评分排序节点
         sorted_nodes = sorted(
-            subgraph['nodes'],
+            nodes,
             key=lambda node: relevance_scores.get(node['name'], 0),
             reverse=True
         )
         
         # 保留前max_nodes个节点
         kept_nodes = sorted_nodes[:max_nodes]
-        kept_node_names = {node['name'] for node in kept_nodes}
+        kept = np.zeros(len(self._node_names), dtype=bool)
+        kept[[self._node_ids[node['name']] for node in kept_nodes if node['name'] in self._node_ids]] = True
         
         # 过滤边，只保留连接保留节点的边
-        kept_edges = [
-            edge for edge in subgraph['edges']
-            if edge['source'] in kept_node_names and edge['target'] in kept_node_names
-        ]
-        
-        return {
-            'nodes': kept_nodes,
-            'edges': kept_edges
-        }
+        endpoints = self._edge_endpoints[edge_ids]
+        return kept_nodes, edge_ids[kept[endpoints[:, 0]] & kept[endpoints[:, 1]]]
     
     def get_entity_neighbors(self, entity_name: str, relation_types: Optional[List[str]] = None) -> Dict:
         """获取实体的邻居节点"""
@@ -331,9 +534,10 @@ class KGRetriever:
             'outgoing': []   # 从该实体出发的关系
         }
         
-        related_triples = self.relation_index['by_entities'].get(entity_name, [])
+        triples = self.graph_data.get('triples', [])
         
-        for triple in related_triples:
+        for edge_id in self._entity_edge_ids(entity_name).tolist():
+            triple = triples[edge_id]
             if relation_types and triple['predicate'] not in relation_types:
                 continue
             
@@ -393,6 +597,6 @@ class KGRetriever:
             'relation_types': dict(self.relation_index['by_type']),
             'index_size': {
                 'entity_keywords': len(self.entity_index['by_keywords']),
-                'relation_entities': len(self.relation_index['by_entities'])
+                'relation_entities': int(np.count_nonzero(np.diff(self._csr_indptr)))
             }
         }
\ No newline at end of file
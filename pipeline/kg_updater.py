@@ -3,21 +3,60 @@
 负责将处理后的三元组数据更新到知识图谱中，并提供多种存储格式
 """
 
+import re
 import json
 import csv
 import yaml
 import pickle
-from typing import Dict, List, Set, Optional, Any, Union
-from dataclasses import dataclass, asdict
+import heapq
+from operator import itemgetter
+from typing import Dict, List, Set, Optional, Any, Union, Tuple
+from dataclasses import dataclass
 from collections import defaultdict, Counter
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import networkx as nx
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 # 使用动态本体系统的类
 from ontology.managers.dynamic_schema import DynamicOntologyManager, EntityTypeConfig, RelationTypeConfig, Entity, Relation
 
-@dataclass
+_BOOLEAN_LITERALS = frozenset({'true', 'false'})
+
+# 由数字、小数点和连字符组成且至少含一个数字（如 3.5、-2、2024-10-23）
+_NUMERIC_LITERAL_RE = re.compile(r'(?=[.\-]*\d)[\d.\-]+')
+
+def _json_default(obj: Any) -> Any:
+    """JSON序列化兜底：numpy标量/数组（如np.float64置信度）转为Python数值/列表"""
+    if type(obj).__module__ == "numpy":
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+@lru_cache(maxsize=65536)
+def _is_literal_value_cached(value: str) -> bool:
+    """判断值是否为字面值（按字符串缓存，同一宾语在处理、建图和可视化时只判断一次）"""
+    # 简单的字面值识别：包含百分号、数字、或特定格式，按开销从小到大短路判断
+    return (
+        '%' in value  # 百分比
+        or value.lower() in _BOOLEAN_LITERALS  # 布尔值
+        or _NUMERIC_LITERAL_RE.fullmatch(value) is not None  # 数字
+        or len(value.split()) > 3  # 长文本描述
+    )
+
+@dataclass(slots=True)
 class KGUpdateResult:
     """知识图谱更新结果"""
     success: bool
@@ -28,20 +67,91 @@ class KGUpdateResult:
     errors: List[str] = None
     timestamp: str = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "success": self.success,
+            "updated_entities": self.updated_entities,
+            "updated_relations": self.updated_relations,
+            "new_entities": self.new_entities,
+            "new_relations": self.new_relations,
+            "errors": list(self.errors) if self.errors is not None else None,
+            "timestamp": self.timestamp
+        }
+
 class KnowledgeGraphUpdater:
     """知识图谱更新器"""
     
-    def __init__(self, ontology_schema: DynamicOntologyManager, storage_path: str = "kg_storage"):
+    def __init__(self, ontology_schema: DynamicOntologyManager, storage_path: str = "kg_storage",
+                 full_backup_interval: int = 20, export_gexf: bool = False,
+                 export_graphml: bool = False, export_edgelist: bool = True):
+        """
+        Args:
+            ontology_schema: 动态本体管理器
+            storage_path: 存储目录
+            full_backup_interval: 每隔多少次备份做一次完整快照，其余只追加增量
+            export_gexf: 是否导出GEXF格式图文件
+            export_graphml: 是否导出GraphML格式图文件
+            export_edgelist: 是否导出边列表edges.txt
+        """
         self.schema = ontology_schema
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
-        # 知识图谱的图结构表示
+        # 图结构导出格式（GEXF/GraphML需要构建完整的XML文档，默认关闭）
+        self.export_gexf = export_gexf
+        self.export_graphml = export_graphml
+        self.export_edgelist = export_edgelist
+        
+        # 知识图谱的图结构表示：节点使用整数ID，实体名与ID的映射单独保存，
+        # 只在导出、统计和查询结果处转换回实体名
         self.graph = nx.DiGraph()
+        self._name2id: Dict[str, int] = {}
+        self._id2name: List[str] = []
         
         # 统计信息
         self.update_history = []
         
+        # 关系邻接索引：主语 -> {(谓语, 宾语): Relation} 兼作去重索引，宾语 -> [Relation] 用于反查
+        # schema.relations仍是其他模块共享的关系列表，索引只是它的附加视图
+        self._by_subject: Dict[str, Dict[Tuple[str, str], Relation]] = defaultdict(dict)
+        self._by_object: Dict[str, List[Relation]] = defaultdict(list)
+        self._indexed_relation_count = 0  # 已建索引的schema.relations长度
+        
+        # 图结构增量更新：_process_triple记录新增实体/关系和被更新的关系，
+        # _update_graph_structure只把这些变化应用到self.graph
+        self._pending_nodes: List[str] = []
+        self._pending_relations: List[Relation] = []
+        self._pending_updates: List[Relation] = []
+        self._graph_entity_count = 0  # 已同步到图中的实体数
+        self._graph_relation_count = 0  # 已同步到图中的关系数
+        self._edge_owner: Dict[Tuple[str, str], Relation] = {}  # 每条边的属性来自列表中最后一个同端点关系
+        
+        # 增量备份：两次完整快照之间只把每次更新的变化追加到deltas_<快照时间戳>.jsonl
+        self.full_backup_interval = full_backup_interval
+        self._snapshot_stamp: Optional[str] = None  # 最近一次完整快照的时间戳，None表示下次必须完整备份
+        self._backups_since_snapshot = 0
+        self._unbacked_delta = self._empty_delta()
+        
+        # 批量模式下备份、图结构更新、持久化和可视化推迟到end_batch统一执行
+        self._in_batch = False
+        
+        # 按类型的实体/关系计数，在_process_triple中随插入累加；
+        # 合计与schema不一致（schema被外部修改）时重新全量统计
+        self._entities_by_type: Counter = Counter()
+        self._relations_by_type: Counter = Counter()
+        
+        # 可视化条目缓存：实体名 -> 节点条目，关系列表对应的边条目；
+        # 每次只重新生成度数变化的节点和新增/更新的边，None表示需要全量生成
+        self._viz_nodes: Optional[Dict[str, Dict[str, Any]]] = None
+        self._viz_edges: List[Dict[str, Any]] = []
+        self._viz_edge_index: Dict[int, int] = {}  # id(关系) -> 在_viz_edges中的位置
+        self._viz_relation_count = 0  # 已生成可视化条目的schema.relations长度
+        self._viz_new_entities: List[str] = []
+        self._viz_dirty_nodes: Set[str] = set()
+        self._viz_new_relations: List[Relation] = []
+        self._viz_updated_relations: List[Relation] = []
+        
     def update_kg_from_triples(self, enriched_triples: List[Dict]) -> KGUpdateResult:
         """从填充的三元组更新知识图谱"""
         result = KGUpdateResult(
@@ -51,13 +161,17 @@ class KnowledgeGraphUpdater:
         )
         
         try:
-            # 备份当前状态
-            self._backup_current_state()
+            # 备份当前状态（批量模式下已在begin_batch中备份）
+            if not self._in_batch:
+                self._backup_current_state()
             
             # 统计更新前的状态
             initial_entities = len(self.schema.entities)
             initial_relations = len(self.schema.relations)
             
+            # schema.relations可能被其他模块修改过，必要时重建去重索引
+            self._ensure_relation_index()
+            
             # 处理三元组
             for triple in enriched_triples:
                 try:
@@ -65,20 +179,14 @@ class KnowledgeGraphUpdater:
                 except Exception as e:
                     result.errors.append(f"处理三元组 {triple} 时出错: {str(e)}")
             
-            # 更新图结构
-            self._update_graph_structure()
-            
             # 计算更新统计
             result.new_entities = len(self.schema.entities) - initial_entities
             result.new_relations = len(self.schema.relations) - initial_relations
             result.updated_entities = len(self.schema.entities)
             result.updated_relations = len(self.schema.relations)
             
-            # 持久化存储
-            self._save_to_storage()
-            
-            # 生成可视化
-            self._generate_visualizations()
+            if not self._in_batch:
+                self._flush()
             
             result.success = True
             self.update_history.append(result)
@@ -95,176 +203,500 @@ class KnowledgeGraphUpdater:
             
         return result
     
+    def begin_batch(self):
+        """
+        开始批量更新
+        
+        之后的update_kg_from_triples只合并三元组，备份在此处执行一次，
+        图结构更新、持久化和可视化推迟到end_batch执行一次。
+        """
+        if self._in_batch:
+            return
+        self._backup_current_state()
+        self._in_batch = True
+    
+    def end_batch(self):
+        """结束批量更新，统一更新图结构并持久化"""
+        if not self._in_batch:
+            return
+        self._in_batch = False
+        self._flush()
+    
+    def put_batch(self, enriched_triples: List[Dict]) -> KGUpdateResult:
+        """以批量模式一次性更新全部三元组"""
+        self.begin_batch()
+        try:
+            result = self.update_kg_from_triples(enriched_triples)
+        finally:
+            try:
+                self.end_batch()
+            except Exception as e:
+                result.errors.append(f"批量更新收尾时发生严重错误: {str(e)}")
+                result.success = False
+        return result
+    
+    def _flush(self):
+        """更新图结构、持久化存储并生成可视化"""
+        # 更新图结构
+        self._update_graph_structure()
+        
+        # 持久化存储
+        self._save_to_storage()
+        
+        # 生成可视化
+        self._generate_visualizations()
+    
     def _process_triple(self, triple: Dict):
         """处理单个三元组"""
         subject = triple["subject"]
         predicate = triple["predicate"] 
         obj = triple["object"]
+        confidence = triple.get("confidence", 1.0)
+        source = triple.get("source", "unknown")
         
         # 确保主语实体存在
-        if subject not in self.schema.entities:
-            subject_type = triple.get("subject_type", "Unknown")
-            entity = Entity(
-                name=subject,
-                entity_type=subject_type,  # 使用推断的类型
-                description=f"实体类型: {subject_type}",
-                attributes={
-                    "created_from": "kg_update",
-                    "confidence": triple.get("confidence", 1.0),
-                    "source": triple.get("source", "unknown"),
-                    "inferred_type": subject_type
-                }
-            )
-            self.schema.entities[subject] = entity
+        self._ensure_entity(subject, triple.get("subject_type", "Unknown"), confidence, source)
         
         # 确保宾语实体存在（如果宾语不是字面值）
         if obj not in self.schema.entities and not self._is_literal_value(obj):
-            object_type = triple.get("object_type", "Unknown")
-            entity = Entity(
-                name=obj,
-                entity_type=object_type,  # 使用推断的类型
-                description=f"实体类型: {object_type}",
-                attributes={
-                    "created_from": "kg_update",
-                    "confidence": triple.get("confidence", 1.0),
-                    "source": triple.get("source", "unknown"),
-                    "inferred_type": object_type
-                }
-            )
-            self.schema.entities[obj] = entity
+            self._ensure_entity(obj, triple.get("object_type", "Unknown"), confidence, source)
         
         # 添加关系
         try:
-            relation = Relation(
-                subject=subject,
-                predicate=predicate,  # 直接使用字符串
-                object=obj,
-                confidence=triple.get("confidence", 1.0),
-                source=triple.get("source", "unknown")
-            )
-            
-            # 检查关系是否已存在
-            existing_relation = self._find_existing_relation(relation)
+            # 检查关系是否已存在（已存在时不必构造新的Relation）
+            outgoing = self._by_subject.get(subject)
+            existing_relation = outgoing.get((predicate, obj)) if outgoing else None
             if existing_relation:
                 # 更新置信度（取最大值）
-                if relation.confidence > existing_relation.confidence:
-                    existing_relation.confidence = relation.confidence
-                    existing_relation.source = f"{existing_relation.source}, {relation.source}"
+                if confidence > existing_relation.confidence:
+                    existing_relation.confidence = confidence
+                    existing_relation.source = f"{existing_relation.source}, {source}"
+                    self._pending_updates.append(existing_relation)
             else:
+                relation = Relation(
+                    subject=subject,
+                    predicate=predicate,  # 直接使用字符串
+                    object=obj,
+                    confidence=confidence,
+                    source=source
+                )
                 self.schema.relations.append(relation)
+                self._pending_relations.append(relation)
+                self._index_relation(relation)
+                self._indexed_relation_count += 1
+                self._relations_by_type[predicate] += 1
                 
         except Exception as e:
             # 记录错误但不中断处理
             print(f"警告: 处理关系时出错 '{predicate}' 在三元组 ({subject}, {predicate}, {obj}): {e}")
     
+    def _ensure_entity(self, name: str, entity_type: str, confidence: float, source: str):
+        """实体不存在时按推断的类型创建"""
+        entities = self.schema.entities
+        if name in entities:
+            return
+        entities[name] = Entity(
+            name=name,
+            entity_type=entity_type,  # 使用推断的类型
+            description=f"实体类型: {entity_type}",
+            attributes={
+                "created_from": "kg_update",
+                "confidence": confidence,
+                "source": source,
+                "inferred_type": entity_type
+            }
+        )
+        self._pending_nodes.append(name)
+        self._entities_by_type[entity_type] += 1
+    
     def _is_literal_value(self, value: str) -> bool:
         """判断值是否为字面值（而非实体名称）"""
-        # 简单的字面值识别：包含百分号、数字、或特定格式
-        literal_patterns = [
-            lambda v: '%' in v,  # 百分比
-            lambda v: v.lower() in ['true', 'false'],  # 布尔值
-            lambda v: v.replace('.', '').replace('-', '').isdigit(),  # 数字
-            lambda v: len(v.split()) > 3,  # 长文本描述
-        ]
-        
-        return any(pattern(value) for pattern in literal_patterns)
+        return _is_literal_value_cached(value)
     
-    def _find_existing_relation(self, relation: Relation) -> Optional[Relation]:
-        """查找是否存在相同的关系"""
-        for existing in self.schema.relations:
-            if (existing.subject == relation.subject and 
-                existing.predicate == relation.predicate and
-                existing.object == relation.object):
-                return existing
-        return None
+    def _index_relation(self, relation: Relation):
+        """把关系加入邻接索引（已存在相同关系时以先加入的为准）"""
+        outgoing = self._by_subject[relation.subject]
+        key = (relation.predicate, relation.object)
+        if key not in outgoing:
+            outgoing[key] = relation
+            self._by_object[relation.object].append(relation)
+    
+    def _ensure_relation_index(self):
+        """schema.relations与索引不一致时重建关系索引"""
+        if self._indexed_relation_count == len(self.schema.relations):
+            return
+        
+        self._by_subject = defaultdict(dict)
+        self._by_object = defaultdict(list)
+        for relation in self.schema.relations:
+            # 与线性查找一致：重复的关系以第一条为准
+            self._index_relation(relation)
+        self._indexed_relation_count = len(self.schema.relations)
     
     def _update_graph_structure(self):
-        """更新图结构表示"""
+        """增量更新图结构表示，只应用上次更新以来新增/变化的实体和关系"""
+        in_sync = (
+            self._graph_entity_count + len(self._pending_nodes) == len(self.schema.entities)
+            and self._graph_relation_count + len(self._pending_relations) == len(self.schema.relations)
+        )
+        if not in_sync:
+            # schema被其他模块修改过，无法增量同步
+            self._rebuild_graph_structure()
+            return
+        
+        # 添加新实体作为节点
+        for entity_name in self._pending_nodes:
+            self._add_entity_node(entity_name, self.schema.entities[entity_name])
+        
+        # 添加新关系作为边
+        for relation in self._pending_relations:
+            self._add_relation_edge(relation)
+        
+        # 置信度被更新的关系：只有当它仍是该边的属性来源时才需要同步
+        for relation in self._pending_updates:
+            if self._edge_owner.get((relation.subject, relation.object)) is relation:
+                edge_data = self.graph.edges[self._name2id[relation.subject], self._name2id[relation.object]]
+                edge_data['confidence'] = relation.confidence
+                edge_data['source'] = relation.source or "unknown"
+        
+        # 记录本次变化，供下次增量备份使用
+        self._unbacked_delta["added_entities"].extend(self._pending_nodes)
+        self._unbacked_delta["added_relations"].extend(self._pending_relations)
+        self._unbacked_delta["updated_relations"].extend(self._pending_updates)
+        
+        # 记录本次变化，供可视化只重新生成受影响的条目：新节点和新边两端节点的度数会变化
+        self._viz_new_entities.extend(self._pending_nodes)
+        for relation in self._pending_relations:
+            self._viz_dirty_nodes.add(relation.subject)
+            self._viz_dirty_nodes.add(relation.object)
+        self._viz_new_relations.extend(self._pending_relations)
+        self._viz_updated_relations.extend(self._pending_updates)
+        
+        self._graph_entity_count = len(self.schema.entities)
+        self._graph_relation_count = len(self.schema.relations)
+        self._clear_pending()
+    
+    def _rebuild_graph_structure(self):
+        """从schema完整重建图结构"""
         self.graph.clear()
+        self._name2id = {}
+        self._id2name = []
+        self._edge_owner = {}
+        
+        # schema的变化无法追踪，下次备份必须是完整快照，可视化也需要全量生成
+        self._snapshot_stamp = None
+        self._viz_nodes = None
         
         # 添加实体作为节点
         for entity_name, entity in self.schema.entities.items():
-            self.graph.add_node(
-                entity_name,
-                entity_type=entity.entity_type,  # 直接使用字符串
-                description=entity.description or "",
-                attributes=entity.attributes or {}
-            )
+            self._add_entity_node(entity_name, entity)
         
         # 添加关系作为边
         for relation in self.schema.relations:
-            # 只为非字面值的宾语创建边
-            if not self._is_literal_value(relation.object):
-                self.graph.add_edge(
-                    relation.subject,
-                    relation.object,
-                    relation_type=relation.predicate,  # 直接使用字符串
-                    confidence=relation.confidence,
-                    source=relation.source or "unknown"
-                )
-            else:
-                # 字面值作为节点属性
-                if relation.subject in self.graph.nodes:
-                    if 'literals' not in self.graph.nodes[relation.subject]:
-                        self.graph.nodes[relation.subject]['literals'] = {}
-                    self.graph.nodes[relation.subject]['literals'][relation.predicate] = relation.object
+            self._add_relation_edge(relation)
+        
+        self._graph_entity_count = len(self.schema.entities)
+        self._graph_relation_count = len(self.schema.relations)
+        self._clear_pending()
+    
+    def _clear_pending(self):
+        self._pending_nodes = []
+        self._pending_relations = []
+        self._pending_updates = []
+    
+    def _intern(self, name: str) -> int:
+        """返回实体名对应的节点ID，首次出现时分配新ID"""
+        node_id = self._name2id.get(name)
+        if node_id is None:
+            node_id = self._name2id[name] = len(self._id2name)
+            self._id2name.append(name)
+        return node_id
+    
+    def _add_entity_node(self, entity_name: str, entity: Entity):
+        """添加实体节点"""
+        self.graph.add_node(
+            self._intern(entity_name),
+            entity_type=entity.entity_type,  # 直接使用字符串
+            description=entity.description or "",
+            attributes=entity.attributes or {}
+        )
+    
+    def _add_relation_edge(self, relation: Relation):
+        """添加关系边，字面值宾语作为主语节点的属性"""
+        # 只为非字面值的宾语创建边
+        if not self._is_literal_value(relation.object):
+            self.graph.add_edge(
+                self._intern(relation.subject),
+                self._intern(relation.object),
+                relation_type=relation.predicate,  # 直接使用字符串
+                confidence=relation.confidence,
+                source=relation.source or "unknown"
+            )
+            self._edge_owner[(relation.subject, relation.object)] = relation
+        else:
+            # 字面值作为节点属性
+            subject_id = self._name2id.get(relation.subject)
+            if subject_id is not None:
+                node_data = self.graph.nodes[subject_id]
+                if 'literals' not in node_data:
+                    node_data['literals'] = {}
+                node_data['literals'][relation.predicate] = relation.object
+    
+    @staticmethod
+    def _empty_delta() -> Dict[str, list]:
+        return {"added_entities": [], "added_relations": [], "updated_relations": []}
     
     def _backup_current_state(self):
-        """备份当前状态"""
+        """
+        备份当前状态
+        
+        每full_backup_interval次做一次完整快照，其余只把上次备份以来的
+        新增实体、新增关系和置信度更新追加到该快照对应的增量文件中。
+        """
         backup_path = self.storage_path / "backups"
         backup_path.mkdir(exist_ok=True)
         
+        # 有未同步到图的变化或schema被外部修改时，增量记录不完整
+        in_sync = (
+            not self._pending_nodes and not self._pending_relations and not self._pending_updates
+            and self._graph_entity_count == len(self.schema.entities)
+            and self._graph_relation_count == len(self.schema.relations)
+        )
+        
+        if (self._snapshot_stamp is not None and in_sync
+                and self._backups_since_snapshot < self.full_backup_interval):
+            self._append_delta_backup(backup_path)
+        else:
+            self._write_full_backup(backup_path)
+    
+    def _write_full_backup(self, backup_path: Path):
+        """
+        写入完整快照，并开始新的增量文件
+        
+        安装了msgpack时把实体和关系按列写成kg_backup_<时间戳>.msgpack，
+        否则回退到pickle（kg_backup_<时间戳>.pkl）。图结构可由实体和关系重建，不再保存。
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = backup_path / f"kg_backup_{timestamp}.pkl"
         
-        with open(backup_file, 'wb') as f:
-            pickle.dump({
-                'schema': self.schema,
-                'graph': self.graph,
-                'timestamp': datetime.now().isoformat()
-            }, f)
+        if MSGPACK_AVAILABLE:
+            backup_file = backup_path / f"kg_backup_{timestamp}.msgpack"
+            backup_file.write_bytes(msgpack.packb(self._snapshot_columns(), use_bin_type=True, default=str))
+        else:
+            backup_file = backup_path / f"kg_backup_{timestamp}.pkl"
+            with open(backup_file, 'wb') as f:
+                pickle.dump({
+                    'schema': self.schema,
+                    'graph': self.graph,
+                    'node_names': self._id2name,
+                    'timestamp': datetime.now().isoformat()
+                }, f)
+        
+        # 同一秒内的重复快照会覆盖快照文件，对应的增量文件也要清空
+        (backup_path / f"deltas_{timestamp}.jsonl").unlink(missing_ok=True)
+        
+        self._snapshot_stamp = timestamp
+        self._backups_since_snapshot = 0
+        self._unbacked_delta = self._empty_delta()
     
-    def _save_to_storage(self):
-        """保存到持久化存储"""
-        # 保存为JSON格式
-        self._save_as_json()
+    def _snapshot_columns(self) -> Dict[str, Any]:
+        """把实体和关系整理成按列存放的快照"""
+        entities = list(self.schema.entities.values())
+        relations = self.schema.relations
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "entities": {
+                "names": [entity.name for entity in entities],
+                "entity_types": [entity.entity_type for entity in entities],
+                "descriptions": [entity.description for entity in entities],
+                "attributes": [entity.attributes for entity in entities],
+                "created_at": [entity.created_at for entity in entities]
+            },
+            "relations": {
+                "subjects": [relation.subject for relation in relations],
+                "predicates": [relation.predicate for relation in relations],
+                "objects": [relation.object for relation in relations],
+                "confidences": [relation.confidence for relation in relations],
+                "sources": [relation.source for relation in relations],
+                "created_at": [relation.created_at for relation in relations]
+            }
+        }
+    
+    @staticmethod
+    def _load_snapshot(snapshot_file: Path) -> Tuple[Dict[str, Entity], List[Relation]]:
+        """读取完整快照，返回 (实体字典, 关系列表)"""
+        if snapshot_file.suffix == ".pkl":
+            with open(snapshot_file, 'rb') as f:
+                state = pickle.load(f)
+            return state['schema'].entities, state['schema'].relations
+        
+        state = msgpack.unpackb(snapshot_file.read_bytes(), raw=False)
+        columns = state["entities"]
+        entities = {
+            name: Entity(name=name, entity_type=entity_type, description=description,
+                         attributes=attributes, created_at=created_at)
+            for name, entity_type, description, attributes, created_at in zip(
+                columns["names"], columns["entity_types"], columns["descriptions"],
+                columns["attributes"], columns["created_at"]
+            )
+        }
+        columns = state["relations"]
+        relations = [
+            Relation(subject=subject, predicate=predicate, object=obj, confidence=confidence,
+                     source=source, created_at=created_at)
+            for subject, predicate, obj, confidence, source, created_at in zip(
+                columns["subjects"], columns["predicates"], columns["objects"],
+                columns["confidences"], columns["sources"], columns["created_at"]
+            )
+        ]
+        return entities, relations
+    
+    def _append_delta_backup(self, backup_path: Path):
+        """把上次备份以来的变化追加到当前快照的增量文件"""
+        delta = self._unbacked_delta
+        record = {
+            "timestamp": datetime.now().isoformat(),
+            "added_entities": [self.schema.entities[name].to_dict() for name in delta["added_entities"]],
+            "added_relations": [relation.to_dict() for relation in delta["added_relations"]],
+            "updated_relations": [
+                {
+                    "subject": relation.subject,
+                    "predicate": relation.predicate,
+                    "object": relation.object,
+                    "confidence": relation.confidence,
+                    "source": relation.source
+                }
+                for relation in delta["updated_relations"]
+            ]
+        }
         
-        # 保存为CSV格式
-        self._save_as_csv()
+        with open(backup_path / f"deltas_{self._snapshot_stamp}.jsonl", 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
         
-        # 保存图结构
-        self._save_graph_structure()
+        self._backups_since_snapshot += 1
+        self._unbacked_delta = self._empty_delta()
+    
+    def restore_from_backups(self) -> bool:
+        """
+        从最近的完整快照和其增量文件恢复实体、关系和图结构
         
-        # 保存统计信息
-        self._save_statistics()
+        Returns:
+            是否找到可恢复的快照
+        """
+        backup_path = self.storage_path / "backups"
+        snapshots = list(backup_path.glob("kg_backup_*.pkl"))
+        if MSGPACK_AVAILABLE:
+            snapshots.extend(backup_path.glob("kg_backup_*.msgpack"))
+        if not snapshots:
+            return False
+        
+        # 按文件名中的时间戳取最新的快照（兼容旧的pickle快照）
+        snapshot_file = max(snapshots, key=lambda path: path.stem)
+        entities, relations = self._load_snapshot(snapshot_file)
+        
+        # 恢复到当前的本体管理器上，保持其他模块持有的引用有效
+        self.schema.entities = entities
+        self.schema.relations = relations
+        self._indexed_relation_count = -1
+        self._ensure_relation_index()
+        self._entities_by_type = Counter()
+        self._relations_by_type = Counter()
+        
+        stamp = snapshot_file.stem[len("kg_backup_"):]
+        deltas_file = backup_path / f"deltas_{stamp}.jsonl"
+        if deltas_file.exists():
+            with open(deltas_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 中断时可能留下不完整的最后一行
+                        continue
+                    self._replay_delta(record)
+        
+        self._rebuild_graph_structure()
+        return True
+    
+    def _replay_delta(self, record: Dict[str, Any]):
+        """在当前状态上重放一条增量记录"""
+        for entity_data in record.get("added_entities", []):
+            self.schema.entities[entity_data["name"]] = Entity(**entity_data)
+        
+        for relation_data in record.get("added_relations", []):
+            relation = Relation(**relation_data)
+            self.schema.relations.append(relation)
+            self._index_relation(relation)
+            self._indexed_relation_count += 1
+        
+        for update in record.get("updated_relations", []):
+            existing = self._by_subject.get(update["subject"], {}).get((update["predicate"], update["object"]))
+            if existing is not None:
+                existing.confidence = update["confidence"]
+                existing.source = update["source"]
+    
+    def _save_to_storage(self):
+        """保存到持久化存储
+
+        各写入器之间相互独立且只读共享状态，放到线程池中并发执行，
+        总耗时取决于最慢的单个写入器而不是四者之和。
+        写入器的异常在工作线程内转换为错误信息，汇总后在调用线程抛出，
+        异常对象（及其引用的lxml等C扩展帧）不经由Future跨线程传递。
+        """
+        writers = (
+            self._save_as_json,          # JSON格式
+            self._save_as_csv,           # CSV格式
+            self._save_graph_structure,  # 图结构
+            self._save_statistics        # 统计信息
+        )
+        with ThreadPoolExecutor(max_workers=len(writers)) as executor:
+            errors = [error for error in executor.map(self._run_writer, writers) if error]
+        if errors:
+            raise RuntimeError("; ".join(errors))
+    
+    @staticmethod
+    def _run_writer(writer) -> Optional[str]:
+        """执行单个写入器，失败时返回错误信息"""
+        try:
+            writer()
+        except Exception as e:
+            return f"{writer.__name__}: {e}"
+        return None
+    
+    @staticmethod
+    def _write_json(file_path: Path, data: Any):
+        """写入JSON文件（安装了orjson时使用C实现序列化）"""
+        if ORJSON_AVAILABLE:
+            file_path.write_bytes(orjson.dumps(
+                data, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ))
+            return
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=_json_default)
     
     def _save_as_json(self):
         """保存为JSON格式"""
         # 实体JSON
-        entities_data = {}
-        for name, entity in self.schema.entities.items():
-            entities_data[name] = {
+        entities_data = {
+            name: {
                 "entity_type": entity.entity_type,  # 直接使用字符串
                 "description": entity.description,
                 "attributes": entity.attributes
             }
-        
-        with open(self.storage_path / "entities.json", 'w', encoding='utf-8') as f:
-            json.dump(entities_data, f, ensure_ascii=False, indent=2)
+            for name, entity in self.schema.entities.items()
+        }
+        self._write_json(self.storage_path / "entities.json", entities_data)
         
         # 关系JSON
-        relations_data = []
-        for relation in self.schema.relations:
-            relations_data.append({
+        relations_data = [
+            {
                 "subject": relation.subject,
                 "predicate": relation.predicate,  # 直接使用字符串
                 "object": relation.object,
                 "confidence": relation.confidence,
                 "source": relation.source
-            })
-        
-        with open(self.storage_path / "relations.json", 'w', encoding='utf-8') as f:
-            json.dump(relations_data, f, ensure_ascii=False, indent=2)
+            }
+            for relation in self.schema.relations
+        ]
+        self._write_json(self.storage_path / "relations.json", relations_data)
     
     def _save_as_csv(self):
         """保存为CSV格式"""
@@ -272,107 +704,185 @@ class KnowledgeGraphUpdater:
         with open(self.storage_path / "entities.csv", 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(["name", "entity_type", "description", "attributes"])
-            
-            for name, entity in self.schema.entities.items():
-                writer.writerow([
+            writer.writerows(
+                (
                     name,
                     entity.entity_type,  # 直接使用字符串
                     entity.description or "",
                     json.dumps(entity.attributes or {})
-                ])
+                )
+                for name, entity in self.schema.entities.items()
+            )
         
         # 关系CSV  
         with open(self.storage_path / "relations.csv", 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(["subject", "predicate", "object", "confidence", "source"])
-            
-            for relation in self.schema.relations:
-                writer.writerow([
+            writer.writerows(
+                (
                     relation.subject,
                     relation.predicate,  # 直接使用字符串
                     relation.object,
                     relation.confidence,
                     relation.source or ""
-                ])
+                )
+                for relation in self.schema.relations
+            )
     
     def _save_graph_structure(self):
         """保存图结构"""
-        # NetworkX格式
-        nx.write_gexf(self.graph, self.storage_path / "knowledge_graph.gexf")
-        nx.write_graphml(self.graph, self.storage_path / "knowledge_graph.graphml")
+        # NetworkX格式（导出文件中的节点仍以实体名为ID）
+        if self.export_gexf or self.export_graphml:
+            named_graph = nx.relabel_nodes(self.graph, self._id2name.__getitem__, copy=True)
+            if self.export_gexf:
+                nx.write_gexf(named_graph, self.storage_path / "knowledge_graph.gexf")
+            if self.export_graphml:
+                nx.write_graphml(named_graph, self.storage_path / "knowledge_graph.graphml")
         
         # 简单的边列表格式
-        with open(self.storage_path / "edges.txt", 'w', encoding='utf-8') as f:
-            for subject, obj, data in self.graph.edges(data=True):
-                relation_type = data.get('relation_type', 'unknown')
-                confidence = data.get('confidence', 1.0)
-                f.write(f"{subject}\t{relation_type}\t{obj}\t{confidence}\n")
+        if self.export_edgelist:
+            names = self._id2name
+            with open(self.storage_path / "edges.txt", 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write("".join(
+                    f"{names[subject]}\t{data.get('relation_type', 'unknown')}\t{names[obj]}\t{data.get('confidence', 1.0)}\n"
+                    for subject, obj, data in self.graph.edges(data=True)
+                ))
     
     def _save_statistics(self):
         """保存统计信息"""
-        stats = self.get_kg_statistics()
-        
-        with open(self.storage_path / "statistics.json", 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+        self._write_json(self.storage_path / "statistics.json", self.get_kg_statistics())
+    
+    # 按实体类型分类（使用字符串常量）
+    VIZ_TYPE_COLORS = {
+        "Paradigm": "#FF6B6B",
+        "Algorithm": "#4ECDC4", 
+        "Technique": "#45B7D1",
+        "Framework": "#96CEB4",
+        "Task": "#FFEAA7",
+        "Metric": "#DDA0DD"
+    }
     
     def _generate_visualizations(self):
-        """生成可视化文件（为后续可视化工具准备）"""
+        """
+        生成可视化文件（为后续可视化工具准备）
+        
+        节点和边条目缓存在内存中，增量更新时只重新生成度数变化的节点、
+        新增的边和置信度被更新的边，再与已有条目一起写出。
+        """
         viz_path = self.storage_path / "visualizations"
         viz_path.mkdir(exist_ok=True)
         
-        # 生成可视化配置文件
+        in_sync = (
+            self._viz_nodes is not None
+            and len(self._viz_nodes) + len(self._viz_new_entities) == len(self.schema.entities)
+            and self._viz_relation_count + len(self._viz_new_relations) == len(self.schema.relations)
+        )
+        if in_sync:
+            self._update_viz_entries()
+        else:
+            self._rebuild_viz_entries()
+        
         viz_config = {
-            "nodes": [],
-            "edges": [],
-            "categories": {}
+            "nodes": list(self._viz_nodes.values()),
+            "edges": self._viz_edges,
+            # 类别配置
+            "categories": {
+                entity_type: {
+                    "color": color,
+                    "description": f"{entity_type} entities"
+                }
+                for entity_type, color in self.VIZ_TYPE_COLORS.items()
+            }
         }
         
-        # 按实体类型分类（使用字符串常量）
-        type_colors = {
-            "Paradigm": "#FF6B6B",
-            "Algorithm": "#4ECDC4", 
-            "Technique": "#45B7D1",
-            "Framework": "#96CEB4",
-            "Task": "#FFEAA7",
-            "Metric": "#DDA0DD"
+        self._write_json(viz_path / "graph_data.json", viz_config)
+    
+    def _viz_node_entry(self, name: str, entity: Entity, degree: int) -> Dict[str, Any]:
+        """生成单个节点的可视化条目，degree为节点在图中的度数（不在图中为0）"""
+        return {
+            "id": name,
+            "label": name,
+            "category": entity.entity_type,  # 直接使用字符串
+            "color": self.VIZ_TYPE_COLORS.get(entity.entity_type, "#999999"),
+            "size": degree + 5,
+            "description": entity.description or ""
         }
-        
-        # 节点数据
-        for name, entity in self.schema.entities.items():
-            viz_config["nodes"].append({
-                "id": name,
-                "label": name,
-                "category": entity.entity_type,  # 直接使用字符串
-                "color": type_colors.get(entity.entity_type, "#999999"),
-                "size": self.graph.degree(name) + 5 if name in self.graph else 5,
-                "description": entity.description or ""
-            })
-        
-        # 边数据
-        for relation in self.schema.relations:
+    
+    def _node_degree(self, name: str) -> int:
+        """实体名对应节点的度数，不在图中时为0"""
+        node_id = self._name2id.get(name)
+        return self.graph.degree(node_id) if node_id is not None else 0
+    
+    @staticmethod
+    def _viz_edge_entry(relation: Relation) -> Dict[str, Any]:
+        """生成单条边的可视化条目"""
+        return {
+            "source": relation.subject,
+            "target": relation.object,
+            "label": relation.predicate,  # 直接使用字符串
+            "weight": relation.confidence,
+            "color": "#999999"
+        }
+    
+    def _append_viz_edges(self, relations: List[Relation]):
+        """为非字面值宾语的关系追加边条目"""
+        for relation in relations:
             if not self._is_literal_value(relation.object):
-                viz_config["edges"].append({
-                    "source": relation.subject,
-                    "target": relation.object,
-                    "label": relation.predicate,  # 直接使用字符串
-                    "weight": relation.confidence,
-                    "color": "#999999"
-                })
-        
-        # 类别配置
-        viz_config["categories"] = {
-            entity_type: {
-                "color": color,
-                "description": f"{entity_type} entities"
-            }
-            for entity_type, color in type_colors.items()
+                self._viz_edge_index[id(relation)] = len(self._viz_edges)
+                self._viz_edges.append(self._viz_edge_entry(relation))
+    
+    def _rebuild_viz_entries(self):
+        """全量生成节点和边条目"""
+        # 一次性取出所有节点的度数，避免逐个实体查询图
+        degrees = dict(self.graph.degree())
+        name2id = self._name2id
+        self._viz_nodes = {
+            name: self._viz_node_entry(name, entity, degrees.get(name2id.get(name), 0))
+            for name, entity in self.schema.entities.items()
         }
         
-        with open(viz_path / "graph_data.json", 'w', encoding='utf-8') as f:
-            json.dump(viz_config, f, ensure_ascii=False, indent=2)
+        edge_relations = [
+            relation for relation in self.schema.relations
+            if not self._is_literal_value(relation.object)
+        ]
+        self._viz_edges = [self._viz_edge_entry(relation) for relation in edge_relations]
+        self._viz_edge_index = {id(relation): index for index, relation in enumerate(edge_relations)}
+        self._viz_relation_count = len(self.schema.relations)
+        self._clear_viz_dirty()
+    
+    def _update_viz_entries(self):
+        """只重新生成受上次更新影响的条目"""
+        entities = self.schema.entities
+        # 新实体按插入顺序追加，保持与schema.entities一致的节点顺序
+        for name in self._viz_new_entities:
+            self._viz_nodes[name] = self._viz_node_entry(name, entities[name], self._node_degree(name))
+        for name in self._viz_dirty_nodes:
+            entity = entities.get(name)
+            if entity is not None:  # 字面值宾语不是实体
+                self._viz_nodes[name] = self._viz_node_entry(name, entity, self._node_degree(name))
+        
+        self._append_viz_edges(self._viz_new_relations)
+        self._viz_relation_count += len(self._viz_new_relations)
+        
+        for relation in self._viz_updated_relations:
+            index = self._viz_edge_index.get(id(relation))
+            if index is not None:
+                self._viz_edges[index]["weight"] = relation.confidence
+        
+        self._clear_viz_dirty()
     
-    def get_kg_statistics(self) -> Dict[str, Any]:
-        """获取知识图谱统计信息"""
+    def _clear_viz_dirty(self):
+        self._viz_new_entities = []
+        self._viz_dirty_nodes = set()
+        self._viz_new_relations = []
+        self._viz_updated_relations = []
+    
+    def get_kg_statistics(self, compute_clustering: bool = False) -> Dict[str, Any]:
+        """获取知识图谱统计信息
+
+        Args:
+            compute_clustering: 是否计算平均聚类系数（O(V·d²)，且需要构造无向副本，大图上默认跳过）
+        """
         stats = {
             "timestamp": datetime.now().isoformat(),
             "total_entities": len(self.schema.entities),
@@ -382,34 +892,37 @@ class KnowledgeGraphUpdater:
             "graph_metrics": {}
         }
         
-        # 按类型统计实体
-        for entity in self.schema.entities.values():
-            entity_type = entity.entity_type  # 直接使用字符串
-            stats["entities_by_type"][entity_type] = stats["entities_by_type"].get(entity_type, 0) + 1
-        
-        # 按类型统计关系
-        for relation in self.schema.relations:
-            relation_type = relation.predicate  # 直接使用字符串
-            stats["relations_by_type"][relation_type] = stats["relations_by_type"].get(relation_type, 0) + 1
+        # 按类型统计实体和关系（使用插入时累加的计数，与schema不一致时重新统计）
+        if sum(self._entities_by_type.values()) != len(self.schema.entities):
+            self._entities_by_type = Counter(entity.entity_type for entity in self.schema.entities.values())
+        if sum(self._relations_by_type.values()) != len(self.schema.relations):
+            self._relations_by_type = Counter(relation.predicate for relation in self.schema.relations)
+        stats["entities_by_type"] = dict(self._entities_by_type)
+        stats["relations_by_type"] = dict(self._relations_by_type)
         
         # 图指标
-        if self.graph.number_of_nodes() > 0:
+        num_nodes = self.graph.number_of_nodes()
+        if num_nodes > 0:
             stats["graph_metrics"] = {
-                "nodes": self.graph.number_of_nodes(),
+                "nodes": num_nodes,
                 "edges": self.graph.number_of_edges(),
                 "density": nx.density(self.graph),
-                "is_connected": nx.is_weakly_connected(self.graph),
-                "average_clustering": nx.average_clustering(self.graph.to_undirected())
+                "is_connected": nx.is_weakly_connected(self.graph)
             }
+            if compute_clustering:
+                stats["graph_metrics"]["average_clustering"] = nx.average_clustering(self.graph.to_undirected())
             
-            # 中心性指标
-            if self.graph.number_of_nodes() > 1:
-                degree_centrality = nx.degree_centrality(self.graph)
-                stats["top_central_nodes"] = sorted(
-                    degree_centrality.items(), 
-                    key=lambda x: x[1], 
-                    reverse=True
-                )[:10]
+            # 中心性指标：度中心性 = (入度 + 出度) / (n - 1)，只取前10，无需全量排序
+            if num_nodes > 1:
+                inv = 1.0 / (num_nodes - 1)
+                in_degree = self.graph.in_degree
+                out_degree = self.graph.out_degree
+                degree_centrality = {node: (in_degree(node) + out_degree(node)) * inv for node in self.graph}
+                names = self._id2name
+                stats["top_central_nodes"] = [
+                    (names[node], centrality)
+                    for node, centrality in heapq.nlargest(10, degree_centrality.items(), key=itemgetter(1))
+                ]
         
         return stats
     
@@ -421,7 +934,7 @@ class KnowledgeGraphUpdater:
             entity_type = kwargs.get("entity_type")
             if entity_type:
                 results = [
-                    {"name": name, "entity": asdict(entity)}
+                    {"name": name, "entity": entity.to_dict()}
                     for name, entity in self.schema.entities.items()
                     if entity.entity_type == entity_type  # 直接比较字符串
                 ]
@@ -429,6 +942,10 @@ class KnowledgeGraphUpdater:
         elif query_type == "relations_of_entity":
             entity_name = kwargs.get("entity_name")
             if entity_name:
+                self._ensure_relation_index()
+                # 先出边后入边，自环只在出边中出现一次
+                outgoing = list(self._by_subject.get(entity_name, {}).values())
+                incoming = [rel for rel in self._by_object.get(entity_name, []) if rel.subject != entity_name]
                 results = [
                     {
                         "subject": rel.subject,
@@ -436,16 +953,16 @@ class KnowledgeGraphUpdater:
                         "object": rel.object,
                         "confidence": rel.confidence
                     }
-                    for rel in self.schema.relations
-                    if rel.subject == entity_name or rel.object == entity_name
+                    for rel in outgoing + incoming
                 ]
         
         elif query_type == "shortest_path":
             start = kwargs.get("start")
             end = kwargs.get("end")
-            if start and end and start in self.graph and end in self.graph:
+            if start and end and start in self._name2id and end in self._name2id:
                 try:
-                    path = nx.shortest_path(self.graph, start, end)
+                    path_ids = nx.shortest_path(self.graph, self._name2id[start], self._name2id[end])
+                    path = [self._id2name[node] for node in path_ids]
                     results = [{"path": path, "length": len(path) - 1}]
                 except nx.NetworkXNoPath:
                     results = [{"path": None, "message": "No path found"}]
@@ -0,0 +1,69 @@
+"""
+LLM响应缓存模块
+基于SQLite的持久化键值缓存，相同输入重复运行时跳过LLM调用
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+class LLMResponseCache:
+    """LLM响应缓存
+
+    值以JSON形式存储。SQLite使用WAL模式，多个进程可以共享同一个缓存文件；
+    同一进程内的多线程访问由锁串行化。
+    """
+
+    def __init__(self, db_path: str = "llm_cache/responses.sqlite", ttl: Optional[float] = None):
+        """
+        Args:
+            db_path: 缓存数据库路径
+            ttl: 缓存有效期（秒），None表示永不过期
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中或已过期时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, created_at = row
+        if self.ttl is not None and time.time() - created_at > self.ttl:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        """写入缓存"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time())
+            )
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
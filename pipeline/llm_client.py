@@ -4,12 +4,114 @@ LLM客户端模块
 """
 
 import os
+import re
 import json
+import asyncio
+import hashlib
+import logging
 import time
-from typing import Optional, Dict, Any
+import threading
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
+from pipeline.llm_cache import LLMResponseCache
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import httpx
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# OpenAI客户端的超时（秒）、重试次数与连接池大小
+OPENAI_TIMEOUT = 60
+OPENAI_MAX_RETRIES = 2
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 16
+OPENAI_MAX_CONNECTIONS = 32
+
+# 响应缓存有效期（秒）
+LLM_CACHE_TTL = 7 * 24 * 3600
+
+# 三元组抽取调用的输出上限与温度
+EXTRACTION_MAX_TOKENS = 2000
+EXTRACTION_TEMPERATURE = 0.3
+
+# 常见模型的上下文窗口（token），未列出的模型按默认值处理
+MODEL_CONTEXT_TOKENS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+
+# 合法三元组必须包含的字段
+_TRIPLE_KEYS = ('subject', 'predicate', 'object')
+
+_CJK_RE = re.compile(r'[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """获取模型对应的tiktoken编码器，不可用时返回None"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # 首次使用需要下载词表，离线环境下回退到估算
+        logger.warning("⚠️ tiktoken编码器加载失败，使用估算token数: %s", e)
+        return None
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """
+    统计文本的token数
+    
+    tiktoken可用时使用模型对应的分词器；否则按中日韩字符每字1个token、
+    其余字符每4个1个token估算。
+    """
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    cjk_count = len(_CJK_RE.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+@lru_cache(maxsize=1)
+def _load_config() -> Dict[str, Any]:
+    """
+    加载配置文件
+
+    结果在进程内缓存，所有LLMClient实例共享；修改config.json后调用
+    _load_config.cache_clear()重新读取。调用方不应修改返回的字典。
+    """
+    config_path = Path("config.json")
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning("⚠️ 配置文件加载失败: %s", e)
+    return {}
+
 @dataclass
 class LLMResponse:
     """LLM响应结果"""
@@ -21,35 +123,70 @@ class LLMResponse:
 class LLMClient:
     """LLM客户端，支持多种LLM服务"""
     
-    def __init__(self, model: str = "gpt-3.5-turbo", api_key: Optional[str] = None):
+    def __init__(self, model: str = "gpt-3.5-turbo", api_key: Optional[str] = None,
+                 base_url: Optional[str] = None, use_cache: bool = True,
+                 cache_path: str = "llm_cache/prompts.sqlite",
+                 cache_ttl: Optional[float] = LLM_CACHE_TTL):
+        """
+        Args:
+            model: 模型名称
+            api_key: API密钥，为None时依次读取config.json和环境变量
+            base_url: API地址
+            use_cache: 是否按 (模型, 温度, max_tokens, 提示词) 在磁盘上缓存响应
+            cache_path: 响应缓存数据库路径
+            cache_ttl: 响应缓存有效期（秒），None表示永不过期
+        """
         # 首先尝试从config.json读取配置
-        config = self._load_config()
+        config = _load_config()
 
         self.model = model
         self.api_key = api_key or config.get("openai", {}).get("api_key") or os.getenv("OPENAI_API_KEY")
-        self.base_url = config.get("openai", {}).get("base_url") or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        self.base_url = base_url or config.get("openai", {}).get("base_url") or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
         
         # 如果没有API密钥，使用模拟模式
         self.mock_mode = not self.api_key
         
         if self.mock_mode:
-            print("⚠️ LLM客户端运行在模拟模式（未配置API密钥）")
+            logger.warning("⚠️ LLM客户端运行在模拟模式（未配置API密钥）")
         else:
-            print(f"✅ LLM客户端已配置: {self.model} @ {self.base_url}")
+            logger.info("✅ LLM客户端已配置: %s @ %s", self.model, self.base_url)
+
+        # OpenAI客户端只创建一次，所有请求复用同一个HTTP连接池，避免每次调用重新握手
+        self._openai = None
+        if not self.mock_mode and OPENAI_AVAILABLE:
+            self._openai = openai.OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=OPENAI_TIMEOUT,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=httpx.Client(limits=httpx.Limits(
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    max_connections=OPENAI_MAX_CONNECTIONS
+                ))
+            )
+
+        # 模拟模式的响应不缓存，避免配置API密钥后仍读到模拟数据；
+        # 缓存在首次读写时才创建，导入模块（模块级llm_client实例）不会创建缓存目录和数据库文件
+        self._use_cache = use_cache and not self.mock_mode
+        self._cache_path = cache_path
+        self._cache_ttl = cache_ttl
+        self._response_cache: Optional[LLMResponseCache] = None
+        self._cache_lock = threading.Lock()
+
+    @property
+    def response_cache(self) -> Optional[LLMResponseCache]:
+        """响应缓存，首次访问时创建；未启用缓存时为None"""
+        if not self._use_cache:
+            return None
+        if self._response_cache is None:
+            with self._cache_lock:
+                if self._response_cache is None:
+                    self._response_cache = LLMResponseCache(self._cache_path, ttl=self._cache_ttl)
+        return self._response_cache
 
-    def _load_config(self) -> Dict[str, Any]:
-        """加载配置文件"""
-        config_path = Path("config.json")
-        if config_path.exists():
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️ 配置文件加载失败: {e}")
-        return {}
-    
     def generate_response(self, prompt: str, max_tokens: int = 1000, 
-                         temperature: float = 0.7) -> str:
+                         temperature: float = 0.7, fallback_to_mock: bool = True,
+                         bypass_cache: bool = False, cache_write: bool = True) -> str:
         """
         生成LLM响应
         
@@ -57,6 +194,9 @@ class LLMClient:
             prompt: 输入提示词
             max_tokens: 最大token数
             temperature: 温度参数
+            fallback_to_mock: API调用失败时是否降级到模拟响应，为False时抛出异常
+            bypass_cache: 为True时跳过缓存读取，强制重新调用API（结果仍会写入缓存）
+            cache_write: 为False时不写入缓存，由调用方在校验响应内容后自行写入
             
         Returns:
             LLM生成的文本
@@ -67,15 +207,47 @@ class LLMClient:
             # 模拟模式：基于简单规则生成响应
             return self._mock_response(prompt)
         
+        cache_key = self._cache_key(prompt, max_tokens, temperature)
+        if not bypass_cache:
+            cached_response = self._cache_get(cache_key)
+            if cached_response is not None:
+                return cached_response
+        
         try:
             # 尝试使用OpenAI API
             response = self._call_openai_api(prompt, max_tokens, temperature)
+            if cache_write:
+                self._cache_set(cache_key, response)
             return response
         except Exception as e:
-            print(f"⚠️ LLM API调用失败: {e}")
+            if not fallback_to_mock:
+                raise
+            logger.warning("⚠️ LLM API调用失败: %s", e)
             # 降级到模拟模式
             return self._mock_response(prompt)
     
+    def _cache_key(self, prompt: str, max_tokens: int, temperature: float) -> str:
+        """响应缓存键：模型、采样参数与提示词共同决定"""
+        return hashlib.blake2b(
+            f"{self.model}|{temperature}|{max_tokens}|{prompt}".encode('utf-8'), digest_size=16
+        ).hexdigest()
+    
+    def _extraction_cache_key(self, prompt: str) -> str:
+        """三元组抽取调用的响应缓存键（实时、并发与Batch API抽取共用）"""
+        return self._cache_key(prompt, EXTRACTION_MAX_TOKENS, EXTRACTION_TEMPERATURE)
+    
+    def _cache_get(self, cache_key: str) -> Optional[str]:
+        """读取响应缓存"""
+        if self.response_cache is None:
+            return None
+        return self.response_cache.get(cache_key)
+    
+    def _cache_set(self, cache_key: str, response: Optional[str]):
+        """写入响应缓存（空响应不缓存）"""
+        if self.response_cache is None or not response:
+            return
+        self.response_cache.set(cache_key, response)
+    
     def _mock_response(self, prompt: str) -> str:
         """模拟LLM响应"""
         prompt_lower = prompt.lower()
@@ -129,15 +301,11 @@ class LLMClient:
     
     def _call_openai_api(self, prompt: str, max_tokens: int, temperature: float) -> str:
         """调用OpenAI API"""
+        if self._openai is None:
+            raise Exception("OpenAI库未安装，请运行: pip install openai")
+
         try:
-            import openai
-            
-            client = openai.OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url
-            )
-            
-            response = client.chat.completions.create(
+            response = self._openai.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "user", "content": prompt}
@@ -148,18 +316,18 @@ class LLMClient:
             
             return response.choices[0].message.content
             
-        except ImportError:
-            raise Exception("OpenAI库未安装，请运行: pip install openai")
         except Exception as e:
             raise Exception(f"OpenAI API调用失败: {e}")
     
-    def extract_triples(self, text: str, schema_info: Dict[str, Any]) -> list:
+    def extract_triples(self, text: str, schema_info: Dict[str, Any],
+                        prompt_parts: Optional[Tuple[str, str]] = None) -> list:
         """
         从文本中抽取三元组
 
         Args:
             text: 输入文本
             schema_info: Schema信息
+            prompt_parts: 预先构建的提示词 (前缀, 后缀)，为None时根据schema_info构建
 
         Returns:
             三元组列表
@@ -172,47 +340,153 @@ class LLMClient:
         if self.mock_mode:
             return self._generate_mock_triples(text, schema_name, entity_types, relation_types)
 
-        prompt = f"""
+        prompt = self._build_extraction_prompt(text, schema_info, prompt_parts)
+        # 截断或非JSON的响应解析为空列表，不能写入缓存，否则之后每次运行都读到同一个坏响应
+        response = self.generate_response(prompt, max_tokens=EXTRACTION_MAX_TOKENS, temperature=EXTRACTION_TEMPERATURE, cache_write=False)
+        triples = self._parse_triples_response(response)
+        if triples:
+            self._cache_set(self._extraction_cache_key(prompt), response)
+        return triples
+
+    def extract_triples_batch(self, texts: List[str], schema_info: Dict[str, Any],
+                              concurrency: int = 8,
+                              prompt_parts: Optional[Tuple[str, str]] = None) -> List[list]:
+        """
+        并发地从多段文本中抽取三元组
+
+        使用AsyncOpenAI在单个事件循环中同时发起多个请求，并发数由信号量限制。
+        不能在已运行的事件循环中调用（内部使用asyncio.run）。
+
+        Args:
+            texts: 输入文本列表
+            schema_info: Schema信息
+            concurrency: 最大并发请求数
+            prompt_parts: 预先构建的提示词 (前缀, 后缀)，为None时根据schema_info构建
+
+        Returns:
+            与texts一一对应的三元组列表
+        """
+        if self.mock_mode or self._openai is None:
+            return [self.extract_triples(text, schema_info, prompt_parts) for text in texts]
+
+        prompt_parts = prompt_parts or self._extraction_prompt_parts(schema_info)
+        prompts = [self._build_extraction_prompt(text, schema_info, prompt_parts) for text in texts]
+        return asyncio.run(self._aextract_triples_batch(prompts, concurrency))
+
+    async def _aextract_triples_batch(self, prompts: List[str], concurrency: int) -> List[list]:
+        """在同一个AsyncOpenAI客户端上并发执行所有抽取请求"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        async with openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                      timeout=OPENAI_TIMEOUT,
+                                      max_retries=OPENAI_MAX_RETRIES) as client:
+            return await asyncio.gather(*(
+                self._aextract_triples(client, semaphore, prompt) for prompt in prompts
+            ))
+
+    async def _aextract_triples(self, client, semaphore: asyncio.Semaphore, prompt: str) -> list:
+        """异步抽取单段文本的三元组，失败时与generate_response一样降级到模拟响应"""
+        cache_key = self._extraction_cache_key(prompt)
+        content = self._cache_get(cache_key)
+        from_api = False
+        if content is None:
+            async with semaphore:
+                try:
+                    response = await client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "user", "content": prompt}
+                        ],
+                        max_tokens=EXTRACTION_MAX_TOKENS,
+                        temperature=EXTRACTION_TEMPERATURE
+                    )
+                    content = response.choices[0].message.content
+                    from_api = True
+                except Exception as e:
+                    logger.warning("⚠️ LLM API调用失败: %s", e)
+                    content = self._mock_response(prompt)
+
+        # JSON解析放到线程中，避免阻塞事件循环
+        triples = await asyncio.to_thread(self._parse_triples_response, content)
+        # 只缓存能解析出三元组的响应
+        if from_api and triples:
+            self._cache_set(cache_key, content)
+        return triples
+
+    @staticmethod
+    def _extraction_prompt_parts(schema_info: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        构建三元组抽取提示词中与文本无关的部分
+
+        Schema信息放在前缀中，同一Schema下所有请求的前缀完全相同，
+        便于服务端的提示词前缀缓存命中。
+        """
+        schema_name = schema_info.get('name', '未知Schema')
+        entity_types = list(schema_info.get('entity_types', {}).keys())
+        relation_types = list(schema_info.get('relation_types', {}).keys())
+
+        prefix = f"""
 请从以下文本中抽取符合{schema_name}的知识三元组。
 
 可用实体类型: {', '.join(entity_types[:10])}
 可用关系类型: {', '.join(relation_types[:10])}
 
 文本内容:
-{text}
+"""
+        suffix = """
 
 请以JSON格式返回三元组列表，格式如下:
 [
-    {{"subject": "主语", "predicate": "关系", "object": "宾语", "confidence": 0.9}},
+    {"subject": "主语", "predicate": "关系", "object": "宾语", "confidence": 0.9},
     ...
 ]
 
 只返回JSON，不要其他解释。
 """
+        return prefix, suffix
+
+    @staticmethod
+    def _build_extraction_prompt(text: str, schema_info: Dict[str, Any],
+                                 prompt_parts: Optional[Tuple[str, str]] = None) -> str:
+        """构建三元组抽取提示词"""
+        prefix, suffix = prompt_parts or LLMClient._extraction_prompt_parts(schema_info)
+        return prefix + text + suffix
 
-        response = self.generate_response(prompt, max_tokens=2000, temperature=0.3)
+    @staticmethod
+    def _parse_triples_response(response: Optional[str]) -> list:
+        """解析LLM返回的三元组JSON，只保留含subject/predicate/object的字典项"""
+        if not isinstance(response, str):
+            logger.warning("⚠️ LLM返回内容为空或类型异常: %s", type(response).__name__)
+            return []
 
-        print(f"🤖 LLM原始响应: {response[:200]}...")
+        logger.debug("🤖 LLM原始响应: %s...", response[:200])
 
         try:
             # 尝试解析JSON
             if response.strip().startswith('['):
-                triples = json.loads(response)
-                print(f"✅ 成功解析JSON，获得 {len(triples)} 个三元组")
+                parsed = orjson.loads(response) if ORJSON_AVAILABLE else json.loads(response)
+                if not isinstance(parsed, list):
+                    logger.warning("⚠️ LLM返回的JSON不是列表: %s", type(parsed).__name__)
+                    return []
+                triples = [
+                    item for item in parsed
+                    if isinstance(item, dict) and all(key in item for key in _TRIPLE_KEYS)
+                ]
+                if len(triples) < len(parsed):
+                    logger.warning("⚠️ 丢弃 %d 个格式不正确的三元组", len(parsed) - len(triples))
+                logger.debug("✅ 成功解析JSON，获得 %d 个三元组", len(triples))
                 return triples
             else:
-                print(f"⚠️ LLM返回的不是JSON格式: {response[:100]}...")
+                logger.warning("⚠️ LLM返回的不是JSON格式: %s...", response[:100])
                 return []
-        except json.JSONDecodeError as e:
-            print(f"⚠️ LLM返回的不是有效JSON: {e}")
-            print(f"   原始响应: {response[:200]}...")
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError是其子类
+            logger.warning("⚠️ LLM返回的不是有效JSON: %s\n   原始响应: %s...", e, response[:200])
             return []
 
     def _generate_mock_triples(self, text: str, schema_name: str, entity_types: list, relation_types: list) -> list:
         """根据Schema类型生成模拟三元组"""
         text_lower = text.lower()
 
-        print(f"🎭 模拟模式: 根据Schema '{schema_name}' 生成三元组")
+        logger.debug("🎭 模拟模式: 根据Schema '%s' 生成三元组", schema_name)
 
         # 通用Schema的模拟三元组
         if "通用" in schema_name or "general" in schema_name.lower():
@@ -293,5 +567,164 @@ Schema: {schema_info.get('name', '未知')}
         except json.JSONDecodeError:
             return {"valid": True, "confidence": 0.5, "reason": "解析失败，默认有效"}
 
+@dataclass
+class LLMEndpoint:
+    """端点池中的单个LLM服务端点"""
+    client: LLMClient
+    concurrency_limit: int
+    semaphore: threading.BoundedSemaphore
+    in_flight: int = 0
+    failures: int = 0
+
+class LLMClientPool:
+    """
+    多端点LLM客户端池
+    
+    请求分配给当前并发数最少的端点，每个端点的并发数受concurrency_limit限制；
+    端点调用失败时自动切换到下一个端点，全部失败才降级到模拟响应。
+    对外接口与LLMClient一致，可直接替换。
+    """
+    
+    def __init__(self, clients: List[LLMClient], concurrency_limits: Optional[List[int]] = None):
+        if not clients:
+            raise ValueError("端点池至少需要一个LLM客户端")
+        
+        limits = concurrency_limits or [8] * len(clients)
+        self.endpoints = [
+            LLMEndpoint(client=client, concurrency_limit=limit, semaphore=threading.BoundedSemaphore(limit))
+            for client, limit in zip(clients, limits)
+        ]
+        self._lock = threading.Lock()
+        
+        if len(self.endpoints) > 1:
+            logger.info("✅ LLM端点池已配置: %d 个端点", len(self.endpoints))
+    
+    @classmethod
+    def from_config(cls, model: str = "gpt-3.5-turbo") -> "LLMClientPool":
+        """
+        从配置创建端点池
+        
+        端点列表依次读取环境变量LLM_ENDPOINTS（JSON数组）和config.json中的"llm_endpoints"，
+        每项形如 {"base_url": ..., "model": ..., "api_key": ..., "concurrency_limit": ...}；
+        都未配置时退化为单个默认LLMClient。
+        """
+        endpoint_configs = None
+        env_endpoints = os.getenv("LLM_ENDPOINTS")
+        if env_endpoints:
+            try:
+                endpoint_configs = json.loads(env_endpoints)
+            except json.JSONDecodeError as e:
+                logger.warning("⚠️ LLM_ENDPOINTS解析失败: %s", e)
+        if not endpoint_configs:
+            endpoint_configs = _load_config().get("llm_endpoints")
+        
+        if not endpoint_configs:
+            return cls([LLMClient(model=model)])
+        
+        clients = [
+            LLMClient(
+                model=config.get("model", model),
+                api_key=config.get("api_key"),
+                base_url=config.get("base_url")
+            )
+            for config in endpoint_configs
+        ]
+        limits = [int(config.get("concurrency_limit", 8)) for config in endpoint_configs]
+        return cls(clients, limits)
+    
+    @property
+    def model(self) -> str:
+        return self.endpoints[0].client.model
+    
+    @property
+    def mock_mode(self) -> bool:
+        return all(endpoint.client.mock_mode for endpoint in self.endpoints)
+    
+    def _ordered_endpoints(self) -> List[LLMEndpoint]:
+        """按当前并发数从少到多排列可用端点，失败次数多的排在后面"""
+        with self._lock:
+            return sorted(
+                (endpoint for endpoint in self.endpoints if not endpoint.client.mock_mode),
+                key=lambda endpoint: (endpoint.in_flight / endpoint.concurrency_limit, endpoint.failures)
+            )
+    
+    def _acquire_endpoint(self, candidates: List[LLMEndpoint]) -> LLMEndpoint:
+        """
+        占用一个端点的并发名额
+        
+        按顺序非阻塞地尝试每个端点，有空闲名额即返回；全部占满时才在负载最小的端点上等待。
+        返回的端点已计入in_flight，调用方负责递减并释放信号量。
+        """
+        for endpoint in candidates:
+            if endpoint.semaphore.acquire(blocking=False):
+                with self._lock:
+                    endpoint.in_flight += 1
+                return endpoint
+        
+        # in_flight包含正在等待的请求，等待者会分散到排队较短的端点
+        with self._lock:
+            endpoint = min(
+                candidates,
+                key=lambda endpoint: (endpoint.in_flight / endpoint.concurrency_limit, endpoint.failures)
+            )
+            endpoint.in_flight += 1
+        endpoint.semaphore.acquire()
+        return endpoint
+    
+    def generate_response(self, prompt: str, max_tokens: int = 1000,
+                         temperature: float = 0.7, fallback_to_mock: bool = True,
+                         bypass_cache: bool = False, cache_write: bool = True) -> str:
+        """在端点池上生成LLM响应，失败时切换端点"""
+        return self._generate(prompt, max_tokens, temperature, fallback_to_mock,
+                              bypass_cache, cache_write)[0]
+    
+    def _generate(self, prompt: str, max_tokens: int, temperature: float, fallback_to_mock: bool,
+                  bypass_cache: bool, cache_write: bool) -> Tuple[str, Optional[LLMEndpoint]]:
+        """生成响应并返回实际应答的端点，降级到模拟响应时端点为None"""
+        last_error = None
+        remaining = self._ordered_endpoints()
+        while remaining:
+            endpoint = self._acquire_endpoint(remaining)
+            remaining.remove(endpoint)
+            try:
+                response = endpoint.client.generate_response(
+                    prompt, max_tokens, temperature, fallback_to_mock=False,
+                    bypass_cache=bypass_cache, cache_write=cache_write
+                )
+                return response, endpoint
+            except Exception as e:
+                last_error = e
+                with self._lock:
+                    endpoint.failures += 1
+                logger.warning("⚠️ LLM端点 %s 调用失败，切换端点: %s", endpoint.client.base_url, e)
+            finally:
+                with self._lock:
+                    endpoint.in_flight -= 1
+                endpoint.semaphore.release()
+        
+        if last_error is not None and not fallback_to_mock:
+            raise last_error
+        return self.endpoints[0].client._mock_response(prompt), None
+    
+    def extract_triples(self, text: str, schema_info: Dict[str, Any],
+                        prompt_parts: Optional[Tuple[str, str]] = None) -> list:
+        """在端点池上抽取三元组，接口与LLMClient.extract_triples一致"""
+        if self.mock_mode:
+            return self.endpoints[0].client.extract_triples(text, schema_info, prompt_parts)
+        
+        prompt = LLMClient._build_extraction_prompt(text, schema_info, prompt_parts)
+        response, endpoint = self._generate(prompt, EXTRACTION_MAX_TOKENS, EXTRACTION_TEMPERATURE, fallback_to_mock=True,
+                                            bypass_cache=False, cache_write=False)
+        triples = LLMClient._parse_triples_response(response)
+        # 与LLMClient.extract_triples一致，只缓存能解析出三元组的响应
+        if triples and endpoint is not None:
+            endpoint.client._cache_set(endpoint.client._extraction_cache_key(prompt), response)
+        return triples
+    
+    def validate_triple(self, subject: str, predicate: str, obj: str,
+                       schema_info: Dict[str, Any]) -> Dict[str, Any]:
+        """验证三元组的语义正确性"""
+        return self.endpoints[0].client.validate_triple(subject, predicate, obj, schema_info)
+
 # 全局LLM客户端实例
 llm_client = LLMClient()
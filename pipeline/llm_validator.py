@@ -4,12 +4,153 @@ LLM语义验证器
 """
 
 import json
+import logging
 import time
-from typing import Dict, List, Any, Optional
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from ontology.managers.dynamic_schema import DynamicOntologyManager
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  httpx的HTTP/2支持依赖h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 抽取/验证共用的OpenAI连接池大小与超时（秒）
+OPENAI_MAX_CONNECTIONS = 64
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 32
+OPENAI_TIMEOUT = 30.0
+OPENAI_CONNECT_TIMEOUT = 5.0
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_json(text: str, opener: str = '{') -> Any:
+    """
+    从夹杂说明文字的LLM响应中取出第一个完整的JSON对象（opener为'['时取数组）
+
+    从每个opener位置尝试raw_decode，遇到多个JSON块或尾随文字时也只解析第一个完整的块。
+    找不到时抛出ValueError。
+    """
+    pos = text.find(opener)
+    while pos != -1:
+        try:
+            return _JSON_DECODER.raw_decode(text, pos)[0]
+        except json.JSONDecodeError:
+            pos = text.find(opener, pos + 1)
+    raise ValueError(f"响应中没有可解析的JSON: {text}")
+
+# 规则验证通过、跳过语义验证时共享的语义验证结果（只读）
+_EMPTY_SEMANTIC: Dict[str, Any] = {"valid": True, "confidence": 1.0, "reasoning": "跳过语义验证"}
+
+# 语义验证结果的JSON Schema，支持structured outputs的接口据此输出紧凑的JSON
+_VALIDATION_ITEM_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "valid": {"type": "boolean"},
+        "confidence": {"type": "number"},
+        "reasoning": {"type": "string"},
+        "suggested_types": {
+            "type": "object",
+            "properties": {
+                "subject_type": {"type": "string"},
+                "object_type": {"type": "string"}
+            },
+            "required": ["subject_type", "object_type"],
+            "additionalProperties": False
+        }
+    },
+    "required": ["valid", "confidence", "reasoning", "suggested_types"],
+    "additionalProperties": False
+}
+
+_VALIDATION_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {"name": "TripleValidation", "schema": _VALIDATION_ITEM_SCHEMA, "strict": True}
+}
+
+# 批量验证：structured outputs要求根节点为对象，数组放在results字段中
+_BATCH_VALIDATION_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "TripleValidationBatch",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        **_VALIDATION_ITEM_SCHEMA,
+                        "properties": {"index": {"type": "integer"}, **_VALIDATION_ITEM_SCHEMA["properties"]},
+                        "required": ["index", *_VALIDATION_ITEM_SCHEMA["required"]]
+                    }
+                }
+            },
+            "required": ["results"],
+            "additionalProperties": False
+        },
+        "strict": True
+    }
+}
+
+@lru_cache(maxsize=1)
+def _load_openai_config() -> Dict[str, Any]:
+    """
+    读取config.json中的OpenAI设置
+
+    结果在进程内缓存；修改config.json后调用_load_openai_config.cache_clear()重新读取。
+    调用方不应修改返回的字典。
+    """
+    with open('config.json', 'r') as f:
+        return json.load(f).get('openai', {})
+
+@lru_cache(maxsize=4)
+def _get_openai_client(base_url: Optional[str], api_key: str, max_retries: int = 2):
+    """
+    获取共享的OpenAI客户端，同一接口的请求复用HTTP连接池
+
+    max_retries为客户端内置的重试次数：限流(429)、超时、连接错误和5xx按带随机抖动的
+    指数退避重试，并遵循响应中的Retry-After。
+    """
+    import httpx
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries,
+                  http_client=httpx.Client(**_http_client_options()))
+
+def _http_client_options() -> Dict[str, Any]:
+    """
+    OpenAI客户端底层httpx连接池的参数（同步与异步客户端共用）
+
+    安装了h2时启用HTTP/2，并发请求在同一TCP连接上多路复用。
+    """
+    import httpx
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "limits": httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                               max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS),
+        "timeout": httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+    }
+
+def _request_timeout(timeout: float):
+    """
+    单次请求的超时参数
+
+    请求级的timeout会整体覆盖客户端的httpx.Timeout，因此同样保留较短的连接超时。
+    """
+    import httpx
+    return httpx.Timeout(timeout, connect=OPENAI_CONNECT_TIMEOUT)
+
+@dataclass(slots=True)
 class ValidationResult:
     """验证结果"""
     valid: bool
@@ -23,34 +164,146 @@ class ValidationResult:
 class LLMSemanticValidator:
     """LLM语义验证器"""
     
+    # 验证结果缓存的最大条目数
+    VALIDATION_CACHE_SIZE = 10000
+    
     def __init__(self, ontology_manager: DynamicOntologyManager, model: str = "gpt-3.5-turbo"):
         self.ontology = ontology_manager
         self.model = model
         self.timeout = 30
+        self.max_retries = 3
+        # 已通过验证的三元组 (subject, predicate, obj) -> 验证结果，按LRU淘汰
+        self._validation_cache: "OrderedDict[Tuple[str, str, str], ValidationResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # 接口不支持structured outputs时置为False，之后不再尝试
+        self._structured_outputs = True
+        # 验证系统提示按Schema版本缓存；版本与内容放在同一个元组中整体替换，
+        # extract_batch等多线程共用同一个验证器时不会读到不配套的版本和内容
+        self._system_prompt_cache: Tuple[Optional[int], Optional[str]] = (None, None)
+        # Schema中的关系类型集合，同样按Schema版本重建
+        self._predicates_cache: Tuple[Optional[int], frozenset] = (None, frozenset())
         
     def validate_triple(self, subject: str, predicate: str, obj: str, 
                        context: str = "", use_llm: bool = True) -> ValidationResult:
-        """综合验证三元组（规则+语义）"""
+        """综合验证三元组（规则+语义）
+        
+        同一三元组在多个文本块中重复出现时，直接复用此前通过验证的结果（忽略上下文）。
+        """
+        key = (subject, predicate, obj)
+        cached = self._get_cached_validation(key, use_llm)
+        if cached is not None:
+            logger.debug("🔍 验证三元组: (%s, %s, %s) - 命中缓存 ✅ 通过", subject, predicate, obj)
+            return cached
+        
         start_time = time.time()
         
-        print(f"🔍 验证三元组: ({subject}, {predicate}, {obj})")
+        logger.debug("🔍 验证三元组: (%s, %s, %s)", subject, predicate, obj)
         
-        # 1. 规则验证
-        print("   📋 执行规则验证...")
-        rule_result = self.ontology.validate_triple(subject, predicate, obj)
-        print(f"   📋 规则验证结果: {'✅ 通过' if rule_result['valid'] else '❌ 失败'}")
-        if not rule_result['valid']:
-            print(f"      问题: {', '.join(rule_result['issues'])}")
+        # 1. 规则验证，通过时直接返回
+        rule_result = self._rule_validation(subject, predicate, obj, use_llm)
+        if rule_result['valid']:
+            return self._rule_passed_result(key, rule_result, start_time)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("   📋 规则验证失败: %s", ', '.join(rule_result['issues']))
         
-        # 2. 语义验证（如果启用且规则验证失败）
-        semantic_result = {"valid": True, "confidence": 1.0, "reasoning": "跳过语义验证"}
+        # 2. 语义验证（如果启用）
+        semantic_result = _EMPTY_SEMANTIC
         
-        if use_llm and not rule_result['valid']:
-            print("   🧠 执行LLM语义验证...")
+        if use_llm:
             semantic_result = self._llm_semantic_validation(subject, predicate, obj, context)
-            print(f"   🧠 语义验证结果: {'✅ 通过' if semantic_result['valid'] else '❌ 失败'} (置信度: {semantic_result['confidence']:.2f})")
-            if semantic_result.get('reasoning'):
-                print(f"      推理: {semantic_result['reasoning']}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("   🧠 语义验证结果: %s (置信度: %.2f)",
+                             '✅ 通过' if semantic_result['valid'] else '❌ 失败', semantic_result['confidence'])
+                if semantic_result.get('reasoning'):
+                    logger.debug("      推理: %s", semantic_result['reasoning'])
+        
+        return self._finalize_validation(key, rule_result, semantic_result, start_time)
+    
+    def validate_triples_batch(self, triples: List[Tuple[str, str, str]], context: str = "",
+                               use_llm: bool = True, batch_size: int = 10) -> List[ValidationResult]:
+        """
+        批量验证三元组（规则+语义）
+        
+        规则验证逐条进行；规则验证失败、需要LLM语义验证的三元组每batch_size条合并为一次LLM请求，
+        减少网络往返和重复的系统提示词。
+        
+        Args:
+            triples: (subject, predicate, obj) 列表
+            context: 共享的上下文
+            use_llm: 是否启用LLM语义验证
+            batch_size: 每次LLM请求验证的三元组数
+            
+        Returns:
+            与triples一一对应的验证结果
+        """
+        results: List[Optional[ValidationResult]] = [None] * len(triples)
+        pending = []  # 等待语义验证的 (序号, 三元组, 规则验证结果, 开始时间)
+        
+        for i, key in enumerate(triples):
+            key = tuple(key)
+            cached = self._get_cached_validation(key, use_llm)
+            if cached is not None:
+                results[i] = cached
+                continue
+            
+            start_time = time.time()
+            rule_result = self._rule_validation(*key, use_llm)
+            if rule_result['valid']:
+                results[i] = self._rule_passed_result(key, rule_result, start_time)
+            elif use_llm:
+                pending.append((i, key, rule_result, start_time))
+            else:
+                results[i] = self._finalize_validation(key, rule_result, _EMPTY_SEMANTIC, start_time)
+        
+        batch_size = max(1, batch_size)
+        for offset in range(0, len(pending), batch_size):
+            group = pending[offset:offset + batch_size]
+            logger.debug("   🧠 批量LLM语义验证: %d 个三元组", len(group))
+            semantic_results = self._llm_semantic_validation_batch([item[1] for item in group], context)
+            for (i, key, rule_result, start_time), semantic_result in zip(group, semantic_results):
+                results[i] = self._finalize_validation(key, rule_result, semantic_result, start_time)
+        
+        return results
+    
+    def _known_predicates(self) -> frozenset:
+        """当前Schema中的关系类型集合（Schema版本变化时重建）"""
+        schema_version = getattr(self.ontology, 'schema_version', None)
+        cached_version, predicates = self._predicates_cache
+        if schema_version is None or schema_version != cached_version:
+            predicates = frozenset(self.ontology.relation_types)
+            self._predicates_cache = (schema_version, predicates)
+        return predicates
+    
+    def _rule_validation(self, subject: str, predicate: str, obj: str, use_llm: bool) -> Dict[str, Any]:
+        """
+        规则验证
+        
+        不做语义验证时，未知关系直接判为失败，省去实体类型推断和相似关系查找；
+        需要语义验证时仍执行完整的规则验证，保留相似关系建议。
+        """
+        if not use_llm and predicate not in self._known_predicates():
+            return {"valid": False, "issues": [f"未知关系类型: {predicate}"], "suggestions": []}
+        return self.ontology.validate_triple(subject, predicate, obj)
+    
+    def _rule_passed_result(self, key: Tuple[str, str, str], rule_result: Dict[str, Any],
+                            start_time: float) -> ValidationResult:
+        """规则验证通过时的结果，不再进行语义验证和结果合并"""
+        result = ValidationResult(
+            valid=True,
+            confidence=1.0,
+            issues=rule_result['issues'],
+            suggestions=rule_result['suggestions'],
+            rule_validation=rule_result,
+            semantic_validation=_EMPTY_SEMANTIC,
+            validation_time=time.time() - start_time
+        )
+        self._cache_validation(key, result)
+        return result
+    
+    def _finalize_validation(self, key: Tuple[str, str, str], rule_result: Dict[str, Any],
+                             semantic_result: Dict[str, Any], start_time: float) -> ValidationResult:
+        """综合规则与语义验证结果，更新实体类型缓存和验证缓存"""
+        subject, predicate, obj = key
         
         # 3. 综合判断
         final_valid = rule_result['valid'] or (semantic_result['valid'] and semantic_result['confidence'] > 0.7)
@@ -95,10 +348,33 @@ class LLMSemanticValidator:
                         final_confidence, 'llm_semantic_validation'
                     )
 
-        print(f"   🎯 最终验证结果: {'✅ 通过' if final_valid else '❌ 失败'} (耗时: {validation_time:.2f}s)")
+        logger.debug("   🎯 最终验证结果: %s (耗时: %.2fs)", '✅ 通过' if final_valid else '❌ 失败', validation_time)
+
+        # 只缓存通过的结果，失败的三元组下次仍会重新验证
+        if final_valid:
+            self._cache_validation(key, result)
 
         return result
     
+    def _get_cached_validation(self, key: Tuple[str, str, str], use_llm: bool) -> Optional[ValidationResult]:
+        """查询验证缓存；依赖LLM语义验证才通过的结果在use_llm=False时不复用"""
+        with self._cache_lock:
+            cached = self._validation_cache.get(key)
+            if cached is None:
+                return None
+            if not use_llm and not cached.rule_validation['valid']:
+                return None
+            self._validation_cache.move_to_end(key)
+            return cached
+    
+    def _cache_validation(self, key: Tuple[str, str, str], result: ValidationResult):
+        """写入验证缓存，超出容量时淘汰最久未使用的条目"""
+        with self._cache_lock:
+            self._validation_cache[key] = result
+            self._validation_cache.move_to_end(key)
+            if len(self._validation_cache) > self.VALIDATION_CACHE_SIZE:
+                self._validation_cache.popitem(last=False)
+    
     def _llm_semantic_validation(self, subject: str, predicate: str, obj: str, 
                                 context: str = "") -> Dict[str, Any]:
         """LLM语义验证"""
@@ -107,8 +383,12 @@ class LLMSemanticValidator:
             system_prompt = self._build_validation_system_prompt()
             user_prompt = self._build_validation_user_prompt(subject, predicate, obj, context)
             
-            # 调用LLM
-            response = self._call_llm(system_prompt, user_prompt)
+            # 调用LLM（structured outputs下只需输出固定的几个字段）
+            response = self._call_llm(
+                system_prompt, user_prompt,
+                response_format=_VALIDATION_RESPONSE_FORMAT,
+                structured_max_tokens=200
+            )
             
             # 解析响应
             result = self._parse_validation_response(response)
@@ -116,7 +396,7 @@ class LLMSemanticValidator:
             return result
             
         except Exception as e:
-            print(f"      ⚠️ LLM语义验证出错: {e}")
+            logger.warning("⚠️ LLM语义验证出错: %s", e)
             return {
                 "valid": False,
                 "confidence": 0.0,
@@ -124,11 +404,16 @@ class LLMSemanticValidator:
             }
     
     def _build_validation_system_prompt(self) -> str:
-        """构建验证系统提示"""
+        """构建验证系统提示（Schema版本不变时复用上次的结果）"""
+        schema_version = getattr(self.ontology, 'schema_version', None)
+        cached_version, cached_prompt = self._system_prompt_cache
+        if schema_version is not None and schema_version == cached_version:
+            return cached_prompt
+        
         entity_types = list(self.ontology.entity_types.keys())
         relation_types = list(self.ontology.relation_types.keys())
         
-        return f"""你是一个知识图谱三元组语义验证专家。
+        system_prompt = f"""你是一个知识图谱三元组语义验证专家。
 
 你的任务是验证给定的三元组是否在语义上合理，即使它可能不完全符合预定义的Schema规则。
 
@@ -140,6 +425,9 @@ class LLMSemanticValidator:
 2. 类型兼容性: 实体类型是否与关系兼容（允许一定灵活性）
 3. 上下文一致性: 是否与给定上下文一致
 
+请分析每个三元组是否在语义上合理，并给出详细的推理过程。
+标注了[新关系]的三元组使用了上述列表之外的关系类型，请主要依据语义判断，不要仅因关系未预定义而判为无效。
+
 请返回JSON格式的结果:
 {{
   "valid": true/false,
@@ -149,58 +437,116 @@ class LLMSemanticValidator:
     "subject_type": "建议的主语类型",
     "object_type": "建议的宾语类型"
   }}
-}}"""
+}}
 
-    def _build_validation_user_prompt(self, subject: str, predicate: str, obj: str, context: str) -> str:
-        """构建验证用户提示"""
-        prompt = f"""请验证以下三元组的语义合理性:
+如果给出的是多个编号的三元组，请返回JSON数组，每个三元组对应一个上述格式的元素，
+并额外包含index字段（对应三元组的序号），例如:
+[{{"index": 1, "valid": true, "confidence": 0.9, "reasoning": "...", "suggested_types": {{...}}}}]"""
+        self._system_prompt_cache = (schema_version, system_prompt)
+        return system_prompt
 
-三元组: ({subject}, {predicate}, {obj})"""
+    def _llm_semantic_validation_batch(self, triples: List[Tuple[str, str, str]],
+                                       context: str = "") -> List[Dict[str, Any]]:
+        """
+        一次LLM请求验证多个三元组
         
-        if context:
-            prompt += f"\n\n上下文: {context}"
-        
-        prompt += "\n\n请分析这个三元组是否在语义上合理，并给出详细的推理过程。"
+        响应中缺失或无法对齐的条目退回单条验证；LLM调用本身失败（已重试）时整批判为未通过，
+        不再逐条重复请求。
+        """
+        if len(triples) == 1:
+            return [self._llm_semantic_validation(*triples[0], context)]
         
-        return prompt
-    
-    def _call_llm(self, system_prompt: str, user_prompt: str) -> str:
-        """调用LLM"""
         try:
-            # 从配置文件读取API设置
-            import json
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-            
-            openai_config = config.get('openai', {})
-            
-            if not openai_config.get('api_key'):
-                return self._mock_validation_response()
-            
-            from openai import OpenAI
-            
-            # 创建OpenAI客户端
-            client = OpenAI(
-                api_key=openai_config['api_key'],
-                base_url=openai_config.get('base_url')
-            )
-            
-            response = client.chat.completions.create(
-                model=openai_config.get('model', self.model),
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.1,
-                max_tokens=1000,
-                timeout=self.timeout
+            system_prompt = self._build_validation_system_prompt()
+            user_prompt = self._build_batch_validation_user_prompt(triples, context)
+            response = self._call_llm(
+                system_prompt, user_prompt,
+                max_tokens=min(4000, 200 * len(triples)),
+                mock_response=self._mock_batch_validation_response(len(triples)),
+                response_format=_BATCH_VALIDATION_RESPONSE_FORMAT
             )
-            
-            return response.choices[0].message.content
-            
         except Exception as e:
-            print(f"      ⚠️ LLM调用失败: {e}")
-            return self._mock_validation_response()
+            logger.warning("⚠️ 批量LLM语义验证出错: %s", e)
+            return [
+                {"valid": False, "confidence": 0.0, "reasoning": f"验证过程出错: {str(e)}"}
+                for _ in triples
+            ]
+        
+        parsed = self._parse_batch_validation_response(response, len(triples))
+        
+        return [
+            result if result is not None else self._llm_semantic_validation(*triple, context)
+            for triple, result in zip(triples, parsed)
+        ]
+    
+    def _build_validation_user_prompt(self, subject: str, predicate: str, obj: str, context: str) -> str:
+        """构建验证用户提示
+        
+        固定的说明都放在系统提示中，用户提示只包含变化的部分，
+        使各次请求的前缀完全一致，便于服务端复用前缀缓存。
+        """
+        tag = " [新关系]" if predicate not in self._known_predicates() else ""
+        if context:
+            return f"三元组: ({subject}, {predicate}, {obj}){tag}\n上下文: {context}"
+        return f"三元组: ({subject}, {predicate}, {obj}){tag}"
+    
+    def _build_batch_validation_user_prompt(self, triples: List[Tuple[str, str, str]], context: str) -> str:
+        """构建批量验证用户提示（上下文在前，编号的三元组列表放在最后）"""
+        known_predicates = self._known_predicates()
+        prompt = f"上下文: {context}\n" if context else ""
+        prompt += "三元组:\n" + "\n".join(
+            f"{i}. ({subject}, {predicate}, {obj}){'' if predicate in known_predicates else ' [新关系]'}"
+            for i, (subject, predicate, obj) in enumerate(triples, 1)
+        )
+        
+        return prompt
+    
+    def _call_llm(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000,
+                  mock_response: Optional[str] = None, response_format: Optional[Dict[str, Any]] = None,
+                  structured_max_tokens: Optional[int] = None) -> str:
+        """
+        调用LLM，未配置API密钥时返回mock_response（默认为单条模拟验证响应）
+        
+        限流、超时等临时错误由OpenAI客户端重试max_retries次，仍失败时抛出异常，
+        由调用方判为验证未通过，而不是把模拟的“通过”结果当作真实判断。
+        
+        Args:
+            response_format: structured outputs的响应格式；接口返回BadRequestError时
+                退回普通调用，并在之后的调用中不再使用
+            structured_max_tokens: 使用structured outputs时的max_tokens，默认同max_tokens
+        """
+        openai_config = _load_openai_config()
+        
+        if not openai_config.get('api_key'):
+            return mock_response or self._mock_validation_response()
+        
+        client = _get_openai_client(openai_config.get('base_url'), openai_config['api_key'], self.max_retries)
+        request = {
+            "model": openai_config.get('model', self.model),
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.1,
+            "timeout": _request_timeout(self.timeout)
+        }
+        
+        if response_format is not None and self._structured_outputs:
+            from openai import BadRequestError
+            try:
+                response = client.chat.completions.create(
+                    **request,
+                    max_tokens=structured_max_tokens or max_tokens,
+                    response_format=response_format
+                )
+                return response.choices[0].message.content
+            except BadRequestError as e:
+                logger.warning("⚠️ 接口不支持structured outputs，改用普通JSON输出: %s", e)
+                self._structured_outputs = False
+        
+        response = client.chat.completions.create(**request, max_tokens=max_tokens)
+        
+        return response.choices[0].message.content
     
     def _mock_validation_response(self) -> str:
         """模拟验证响应"""
@@ -214,19 +560,46 @@ class LLMSemanticValidator:
             }
         }, ensure_ascii=False)
     
+    def _mock_batch_validation_response(self, count: int) -> str:
+        """模拟批量验证响应"""
+        mock = json.loads(self._mock_validation_response())
+        return json.dumps([{"index": i, **mock} for i in range(1, count + 1)], ensure_ascii=False)
+    
     def _parse_validation_response(self, response: str) -> Dict[str, Any]:
         """解析验证响应"""
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return orjson.loads(response) if ORJSON_AVAILABLE else json.loads(response)
+        except json.JSONDecodeError:  # orjson.JSONDecodeError是其子类
             # 尝试提取JSON部分
-            import re
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            else:
+            try:
+                return _extract_json(response)
+            except ValueError:
                 return {
                     "valid": False,
                     "confidence": 0.0,
                     "reasoning": f"无法解析LLM响应: {response}"
                 }
+    
+    def _parse_batch_validation_response(self, response: str, count: int) -> List[Optional[Dict[str, Any]]]:
+        """解析批量验证响应，按index对齐；缺失或格式不正确的条目为None"""
+        try:
+            data = orjson.loads(response) if ORJSON_AVAILABLE else json.loads(response)
+        except json.JSONDecodeError:
+            try:
+                data = _extract_json(response, '[')
+            except ValueError:
+                return [None] * count
+        
+        # 部分模型会把数组包在对象里返回
+        if isinstance(data, dict):
+            data = next((value for value in data.values() if isinstance(value, list)), [])
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * count
+        for item in data:
+            if not isinstance(item, dict) or 'valid' not in item:
+                continue
+            index = item.get('index')
+            if isinstance(index, int) and 1 <= index <= count:
+                item.setdefault('confidence', 0.0)
+                results[index - 1] = item
+        return results
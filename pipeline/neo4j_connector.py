@@ -3,28 +3,287 @@ Neo4j知识图谱连接器
 将动态知识图谱数据导入到Neo4j数据库
 """
 
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import csv
 import json
-from dataclasses import asdict
 import logging
+import re
+import subprocess
+import zlib
 
 try:
-    from neo4j import GraphDatabase
+    from neo4j import GraphDatabase, RoutingControl
+    from neo4j.exceptions import ClientError
     NEO4J_AVAILABLE = True
 except ImportError:
     NEO4J_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# 字面值判断：只含数字、'.'、'-'且至少有一个数字；超过3个以空白分隔的词
+_BOOLEAN_LITERALS = frozenset(("true", "false"))
+_NUMERIC_LITERAL = re.compile(r'[.\-]*\d[\d.\-]*').fullmatch
+_LONG_TEXT = re.compile(r'\S+(?:\s+\S+){3}').search
+
+# 导出时不作为字面值属性关系的实体标准属性
+_STANDARD_ENTITY_PROPS = frozenset({"name", "type", "description", "confidence", "created_at", "attributes"})
+
+# 导出CSV的列
+_ENTITY_CSV_FIELDS = ("name", "entity_type", "description", "confidence", "created_at", "attributes")
+_RELATION_CSV_FIELDS = ("subject", "predicate", "object", "confidence", "source")
+
+# neo4j-admin导入时实体CSV的固定属性列（字面值属性不能与之同名）
+_ADMIN_ENTITY_COLUMNS = frozenset({"name", "type", "description", "confidence", "created_at", "attributes", "display_name"})
+
+# Neo4j关系类型中不允许的字符
+_RELATION_TYPE_INVALID_CHARS = re.compile(r'[^A-Z0-9_]')
+
+# 每个UNWIND批次的行数
+ENTITY_BATCH_SIZE = 10000
+RELATION_BATCH_SIZE = 5000
+# 批量会话中每写入多少个批次提交一次事务，限制单个事务占用的内存
+BULK_COMMIT_EVERY = 4
+# 并行写入的会话数，建议与服务器的工作线程数（dbms.threads.worker_count）一致
+DEFAULT_WRITE_WORKERS = 1
+
+# 调用未安装的过程时服务器返回的错误码，只有此错误会让连接器停用APOC
+_PROCEDURE_NOT_FOUND = "Neo.ClientError.Procedure.ProcedureNotFound"
+
+# APOC合并节点/关系：标签和关系类型作为参数传入，所有类型共用一条查询（一个执行计划）
+_MERGE_ENTITIES_APOC_CYPHER = """
+UNWIND $rows AS r
+WITH r, apoc.map.merge(
+    r {.type, .description, .confidence, .created_at, .attributes, display_name: r.name},
+    r.literals
+) AS props
+CALL apoc.merge.node(['Entity', r.type], {name: r.name}, props, props) YIELD node
+RETURN count(*) AS merged
+"""
+
+_MERGE_RELATIONS_APOC_CYPHER = """
+UNWIND $rows AS r
+MATCH (s:Entity {name: r.subject})
+MATCH (o:Entity {name: r.object})
+WITH r, s, o, {type: r.predicate, confidence: r.confidence, source: r.source, created_at: datetime()} AS props
+CALL apoc.merge.relationship(s, r.rel_type, {}, props, o, props) YIELD rel
+RETURN count(*) AS created
+"""
+
+_BASIC_ENTITY_CYPHER = """
+UNWIND $rows AS r
+MERGE (e:Entity {name: r.name})
+SET e.type = r.type,
+    e.description = r.description,
+    e.confidence = r.confidence,
+    e.created_at = r.created_at,
+    e.attributes = r.attributes,
+    e.display_name = r.name,
+    e += r.literals
+"""
+
+_FALLBACK_RELATION_CYPHER = """
+UNWIND $rows AS r
+MATCH (s:Entity {name: r.subject})
+MATCH (o:Entity {name: r.object})
+MERGE (s)-[x:RELATED]->(o)
+SET x.type = r.predicate,
+    x.confidence = r.confidence,
+    x.source = r.source,
+    x.created_at = datetime()
+RETURN count(*) AS created
+"""
+
+_SET_LITERALS_CYPHER = """
+UNWIND $rows AS r
+MATCH (e:Entity {name: r.subject})
+CALL apoc.create.setProperties(e, r.keys, r.vals) YIELD node
+RETURN sum(size(r.keys)) AS updated
+"""
+
+_MISSING_ENTITIES_CYPHER = """
+UNWIND $rows AS name
+OPTIONAL MATCH (e:Entity {name: name})
+WITH name, e
+WHERE e IS NULL
+RETURN collect(name) AS missing
+"""
+
+def _typed_entity_cypher(entity_type: str) -> str:
+    """使用实体类型作为额外标签的MERGE语句（未安装APOC时使用）"""
+    return f"""
+    UNWIND $rows AS r
+    MERGE (e:Entity:`{entity_type}` {{name: r.name}})
+    SET e.type = r.type,
+        e.description = r.description,
+        e.confidence = r.confidence,
+        e.created_at = r.created_at,
+        e.attributes = r.attributes,
+        e.display_name = r.name,
+        e += r.literals
+    """
+
+
+def _typed_relation_cypher(neo4j_relation_type: str) -> str:
+    """使用具体关系类型的MERGE语句（未安装APOC时使用），端点不存在时MATCH不产生行，关系被跳过"""
+    return f"""
+    UNWIND $rows AS r
+    MATCH (s:Entity {{name: r.subject}})
+    MATCH (o:Entity {{name: r.object}})
+    MERGE (s)-[x:`{neo4j_relation_type}`]->(o)
+    SET x.type = r.predicate,
+        x.confidence = r.confidence,
+        x.source = r.source,
+        x.created_at = datetime()
+    RETURN count(*) AS created
+    """
+
+
+def _dump_attributes(attributes: Optional[Dict[str, Any]], cache: Dict[int, str]) -> str:
+    """序列化实体attributes，相同对象只序列化一次
+
+    cache按id(attributes)缓存，只能在attributes对象都存活且不被修改的范围内使用（如一次导入调用）。
+    """
+    if attributes is None:
+        return "null"
+    if not attributes:
+        return "{}"
+    key = id(attributes)
+    dumped = cache.get(key)
+    if dumped is None:
+        if ORJSON_AVAILABLE:
+            dumped = orjson.dumps(attributes, option=orjson.OPT_NON_STR_KEYS).decode()
+        else:
+            dumped = json.dumps(attributes)
+        cache[key] = dumped
+    return dumped
+
+
+def _write_json(file_path: Path, data: Any):
+    """写入JSON文件（安装了orjson时使用C实现序列化）"""
+    if ORJSON_AVAILABLE:
+        file_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _write_csv(file_path: Path, rows: List[Dict[str, Any]], fieldnames: tuple):
+    """用csv模块（C实现）写出字典记录，格式与pandas.DataFrame.to_csv(index=False)一致"""
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _iter_json_array(file_path: Path) -> Iterator[Any]:
+    """逐个读取JSON数组文件中的元素，安装了ijson时流式解析，内存占用与文件大小无关"""
+    with open(file_path, 'rb') as f:
+        if IJSON_AVAILABLE:
+            yield from ijson.items(f, 'item', use_float=True)
+        elif ORJSON_AVAILABLE:
+            yield from orjson.loads(f.read())
+        else:
+            yield from json.load(f)
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """把可迭代对象切分为长度不超过size的列表"""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _run_batch(tx, cypher: str, rows: List[Dict[str, Any]]):
+    """在事务中执行一条UNWIND批量语句，返回语句RETURN的单个值（没有RETURN时为None）"""
+    record = tx.run(cypher, rows=rows).single()
+    return record[0] if record else None
+
+
+class BulkTransaction:
+    """批量写事务
+
+    所有UNWIND批次在同一个显式事务中执行，每commit_every个批次提交一次并开启新事务。
+    某个批次失败时Neo4j会使整个事务失效，这里回滚后在新事务中重放此前未提交的批次，
+    再把异常抛给调用方处理（例如回退到基本语句）。
+    """
+
+    def __init__(self, session, commit_every: int = BULK_COMMIT_EVERY):
+        self.session = session
+        self.commit_every = commit_every
+        self._tx = session.begin_transaction()
+        self._pending = []
+
+    def run(self, cypher: str, **params):
+        """在当前事务中执行任意语句"""
+        return self._tx.run(cypher, **params)
+
+    def run_batch(self, cypher: str, rows: List[Dict[str, Any]]):
+        """执行一个UNWIND批次，累计满commit_every个批次后提交"""
+        try:
+            result = _run_batch(self._tx, cypher, rows)
+        except Exception:
+            self._tx.rollback()
+            self._tx = self.session.begin_transaction()
+            for pending_cypher, pending_rows in self._pending:
+                _run_batch(self._tx, pending_cypher, pending_rows)
+            raise
+        
+        self._pending.append((cypher, rows))
+        if len(self._pending) >= self.commit_every:
+            self.commit()
+        return result
+
+    def commit(self):
+        """提交当前事务并开启新事务"""
+        self._tx.commit()
+        self._tx = self.session.begin_transaction()
+        self._pending = []
+
+    def close(self, commit: bool = True):
+        """结束批量事务，commit为False时回滚未提交的批次"""
+        if commit:
+            self._tx.commit()
+        else:
+            self._tx.rollback()
+        self._pending = []
+
+
 class Neo4jConnector:
     """Neo4j数据库连接器"""
     
-    def __init__(self, uri: str = "bolt://localhost:7687", user: str = "neo4j", password: str = "yuanxi"):
+    def __init__(self, uri: str = "bolt://localhost:7687", user: str = "neo4j", password: str = "yuanxi",
+                 write_workers: int = DEFAULT_WRITE_WORKERS):
+        """
+        Args:
+            write_workers: 不使用bulk_session时并行写入的会话数，每个会话一个线程
+        """
         if not NEO4J_AVAILABLE:
             raise ImportError("请安装neo4j驱动: pip install neo4j")
         
         self.uri = uri
         self.user = user
         self.password = password
+        self.write_workers = max(1, write_workers)
         self.driver = None
+        # APOC过程不存在时不再尝试，改用按类型/谓词生成的Cypher
+        self._apoc_available = True
         
         # 设置日志
         logging.basicConfig(level=logging.INFO)
@@ -33,11 +292,13 @@ class Neo4jConnector:
     def connect(self):
         """连接到Neo4j数据库"""
         try:
-            self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+            self.driver = GraphDatabase.driver(
+                self.uri, auth=(self.user, self.password),
+                max_connection_pool_size=max(self.write_workers * 2, 2)
+            )
             # 测试连接
             with self.driver.session() as session:
-                result = session.run("RETURN 1 as test")
-                result.single()
+                session.run("RETURN 1").consume()
             self.logger.info("✅ 成功连接到Neo4j数据库")
             return True
         except Exception as e:
@@ -105,189 +366,399 @@ class Neo4jConnector:
         
         self.logger.info("📋 数据库约束和索引设置完成")
     
-    def import_entities(self, entities: Dict[str, Any]) -> int:
-        """导入实体到Neo4j"""
-        count = 0
+    @contextmanager
+    def bulk_session(self, commit_every: int = BULK_COMMIT_EVERY):
+        """批量导入会话，返回 (session, tx)
+
+        用法::
+
+            with connector.bulk_session() as (session, tx):
+                connector.import_entities(entities, tx=tx)
+                connector.import_relations(relations, tx=tx)
+
+        正常退出时提交剩余批次，出现异常时回滚未提交的批次。
+        """
         with self.driver.session() as session:
-            for entity_name, entity_data in entities.items():
-                # 如果entity_data是Entity对象，转换为字典
-                if hasattr(entity_data, '__dict__'):
-                    entity_dict = asdict(entity_data)
-                else:
-                    entity_dict = entity_data
-                
-                entity_type = entity_dict.get('entity_type', 'Unknown')
-                
-                # 创建实体节点，使用实体类型作为额外标签，name作为主显示属性
-                cypher = f"""
-                MERGE (e:Entity:`{entity_type}` {{name: $name}})
-                SET e.type = $type,
-                    e.description = $description,
-                    e.confidence = $confidence,
-                    e.created_at = $created_at,
-                    e.attributes = $attributes,
-                    e.display_name = $name
-                """
-                
-                try:
-                    session.run(cypher, 
-                        name=entity_name,
-                        type=entity_type,
-                        description=entity_dict.get('description', ''),
-                        confidence=float(entity_dict.get('confidence', 1.0)),
-                        created_at=entity_dict.get('created_at', ''),
-                        attributes=json.dumps(entity_dict.get('attributes', {}))
-                    )
-                    count += 1
-                except Exception as e:
-                    # 如果实体类型作为标签有问题，回退到基本创建
-                    self.logger.warning(f"使用类型标签创建实体失败，回退基本创建: {e}")
-                    basic_cypher = """
-                    MERGE (e:Entity {name: $name})
-                    SET e.type = $type,
-                        e.description = $description,
-                        e.confidence = $confidence,
-                        e.created_at = $created_at,
-                        e.attributes = $attributes,
-                        e.display_name = $name
-                    """
-                    session.run(basic_cypher, 
-                        name=entity_name,
-                        type=entity_type,
-                        description=entity_dict.get('description', ''),
-                        confidence=float(entity_dict.get('confidence', 1.0)),
-                        created_at=entity_dict.get('created_at', ''),
-                        attributes=json.dumps(entity_dict.get('attributes', {}))
-                    )
-                    count += 1
+            tx = BulkTransaction(session, commit_every)
+            try:
+                yield session, tx
+            except Exception:
+                tx.close(commit=False)
+                raise
+            tx.close()
+    
+    @contextmanager
+    def _import_transaction(self):
+        """导入用事务：并行写入时返回None（各会话每批独立提交），否则使用bulk_session的批量事务"""
+        if self.write_workers > 1:
+            yield None
+            return
+        
+        with self.bulk_session() as (_, tx):
+            yield tx
+    
+    def _run_chunks(self, tasks: List[tuple], tx: Optional[BulkTransaction] = None) -> List[Any]:
+        """执行批次任务列表，返回与tasks顺序一致的结果
+
+        每个任务为 (shard, handler, args)，执行 handler(write, *args)，其中write(cypher, rows)
+        写入一个UNWIND批次。有批量事务时全部写入该事务；否则按shard分配到write_workers个
+        线程并行执行，同一shard的任务由同一个线程顺序执行，每批通过_execute_batch独立提交。
+        """
+        if tx is not None:
+            return [handler(tx.run_batch, *args) for _, handler, args in tasks]
+        
+        results = [None] * len(tasks)
+        queues = [[] for _ in range(self.write_workers)]
+        for index, (shard, _, _) in enumerate(tasks):
+            queues[shard % self.write_workers].append(index)
+        
+        def run_queue(indices):
+            for index in indices:
+                _, handler, args = tasks[index]
+                results[index] = handler(self._execute_batch, *args)
+        
+        queues = [queue for queue in queues if queue]
+        if len(queues) <= 1:
+            for queue in queues:
+                run_queue(queue)
+            return results
+        
+        with ThreadPoolExecutor(max_workers=len(queues)) as executor:
+            for future in [executor.submit(run_queue, queue) for queue in queues]:
+                future.result()
+        return results
+    
+    def _execute_batch(self, cypher: str, rows: List[Dict[str, Any]]):
+        """用driver.execute_query写入一个UNWIND批次，返回语句RETURN的单个值（没有RETURN时为None）
+
+        驱动负责瞬时错误重试和连接复用，并通过默认的书签管理器在批次之间传递书签，
+        并行写入的批次之间也保持因果一致（例如关系批次一定能看到先前写入的实体）。
+        """
+        records, _, _ = self.driver.execute_query(cypher, {"rows": rows}, routing_=RoutingControl.WRITE)
+        return records[0][0] if records else None
+    
+    def _shard_of(self, name: str) -> int:
+        """实体名所属的分片（跨进程稳定的哈希，不受PYTHONHASHSEED影响）"""
+        return zlib.crc32(name.encode('utf-8')) % self.write_workers
+    
+    def _shard_rows(self, rows: List[Dict[str, Any]], key: str = "subject") -> List[List[Dict[str, Any]]]:
+        """按key的哈希把行分到write_workers个分片，同一主语的写入始终落在同一个会话，避免锁竞争
+
+        分片内按key稳定排序，同一主语的写入相邻，重复行仍保持原有先后顺序。
+        """
+        sort_key = itemgetter(key)
+        if self.write_workers <= 1:
+            return [sorted(rows, key=sort_key)]
+        
+        buckets = [[] for _ in range(self.write_workers)]
+        for row in rows:
+            buckets[self._shard_of(row[key])].append(row)
+        for bucket in buckets:
+            bucket.sort(key=sort_key)
+        return buckets
+    
+    def _shard_edge_rows(self, rows: List[Dict[str, Any]]) -> Tuple[List[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """按两个端点分片实体间关系，返回 (各分片的关系, 跨分片的关系)
+
+        合并关系会同时锁住主语和宾语节点。两端落在同一分片的关系可以并行写入：
+        各分片涉及的节点互不相交，会话之间不会互相等锁，也就不会死锁。
+        两端分属不同分片的关系由调用方在并行阶段之后用单个会话写入。
+        """
+        sort_key = itemgetter("subject")
+        if self.write_workers <= 1:
+            return [sorted(rows, key=sort_key)], []
+        
+        buckets = [[] for _ in range(self.write_workers)]
+        cross_shard = []
+        for row in rows:
+            shard = self._shard_of(row["subject"])
+            if shard == self._shard_of(row["object"]):
+                buckets[shard].append(row)
+            else:
+                cross_shard.append(row)
+        for bucket in buckets:
+            bucket.sort(key=sort_key)
+        cross_shard.sort(key=sort_key)
+        return buckets, cross_shard
+    
+    def import_entities(self, entities: Dict[str, Any], tx: Optional[BulkTransaction] = None,
+                        literals: Optional[Dict[str, Dict[str, str]]] = None) -> int:
+        """导入实体到Neo4j
+
+        用UNWIND批量MERGE（有APOC时所有类型共用一条语句，否则按实体类型分组），每批ENTITY_BATCH_SIZE行，
+        往返次数从N降到约 N / ENTITY_BATCH_SIZE。传入tx时写入bulk_session的批量事务。
+        literals为 {实体名: {谓词: 值}}，这些字面值属性在同一条MERGE中一并写入。
+        """
+        literals = literals or {}
+        # 实体在本次调用期间都被entities引用，attributes的id不会被复用
+        attributes_cache: Dict[int, str] = {}
+        rows = []
+        for entity_name, entity_data in entities.items():
+            # Entity对象直接读属性，不经过to_dict()构造中间字典
+            field = dict.get if isinstance(entity_data, dict) else getattr
+            
+            entity_type = field(entity_data, 'entity_type', 'Unknown')
+            rows.append({
+                "name": entity_name,
+                "type": entity_type,
+                "description": field(entity_data, 'description', ''),
+                "confidence": float(field(entity_data, 'confidence', 1.0)),
+                "created_at": field(entity_data, 'created_at', ''),
+                "attributes": _dump_attributes(field(entity_data, 'attributes', {}), attributes_cache),
+                "literals": literals.get(entity_name, {})
+            })
+        
+        # MERGE基于唯一的name，实体批次之间互不冲突，轮流分配给各个会话
+        tasks = [
+            (shard, self._write_entity_chunk, (rows[i:i + ENTITY_BATCH_SIZE],))
+            for shard, i in enumerate(range(0, len(rows), ENTITY_BATCH_SIZE))
+        ]
+        count = sum(self._run_chunks(tasks, tx))
         
         self.logger.info(f"📊 已导入 {count} 个实体")
         return count
     
-    def import_relations(self, relations: List[Any]) -> int:
-        """导入关系到Neo4j"""
-        count = 0
-        literal_count = 0
-        relation_count = 0
+    def _collect_literals(self, relations: Iterable[Any]) -> Dict[str, Dict[str, str]]:
+        """按主语收集字面值关系 {主语: {谓词: 值}}，同一谓词以最后出现的值为准"""
+        literals_by_subject: Dict[str, Dict[str, str]] = {}
+        for relation in relations:
+            field = dict.get if isinstance(relation, dict) else getattr
+            obj = field(relation, 'object')
+            if self._is_literal_value(obj):
+                literals_by_subject.setdefault(field(relation, 'subject'), {})[field(relation, 'predicate')] = obj
+        return literals_by_subject
+    
+    def _handle_apoc_error(self, error: Exception, fallback: str):
+        """处理APOC批次的异常：只有过程不存在时才停用APOC，其他错误（瞬时错误、约束冲突、超时）仅当前批次回退"""
+        if isinstance(error, ClientError) and error.code == _PROCEDURE_NOT_FOUND:
+            self._apoc_available = False
+            self.logger.warning(f"APOC不可用，{fallback}: {error}")
+        else:
+            self.logger.warning(f"APOC批次写入失败，本批次{fallback}: {error}")
+    
+    def _write_entity_chunk(self, write, chunk: List[Dict[str, Any]]) -> int:
+        """写入一个实体批次
+
+        优先用apoc.merge.node一条语句合并所有类型的实体；未安装APOC时按实体类型分组，
+        每个类型标签一条语句，类型标签出错时回退到基本创建。
+        """
+        if self._apoc_available:
+            try:
+                write(_MERGE_ENTITIES_APOC_CYPHER, chunk)
+                return len(chunk)
+            except Exception as e:
+                self._handle_apoc_error(e, "按实体类型分别创建实体")
         
-        with self.driver.session() as session:
-            for relation in relations:
-                # 如果relation是Relation对象，转换为字典
-                if hasattr(relation, '__dict__'):
-                    relation_dict = asdict(relation)
-                else:
-                    relation_dict = relation
-                
-                subject = relation_dict['subject']
-                predicate = relation_dict['predicate']
-                obj = relation_dict['object']
-                confidence = float(relation_dict.get('confidence', 1.0))
-                source = relation_dict.get('source', '')
-                
-                # 检查是否为字面值关系
-                if self._is_literal_value(obj):
-                    # 字面值作为实体属性
-                    cypher = f"""
-                    MATCH (e:Entity {{name: $subject}})
-                    SET e.`{predicate}` = $object
-                    """
-                    try:
-                        session.run(cypher,
-                            subject=subject,
-                            object=obj
-                        )
-                        literal_count += 1
-                    except Exception as e:
-                        self.logger.warning(f"设置字面值属性失败 {subject}.{predicate}={obj}: {e}")
-                else:
-                    # 创建实体间关系 - 先确保两个实体都存在
-                    # 检查subject是否存在
-                    subject_check = session.run("MATCH (s:Entity {name: $name}) RETURN count(s) as count", name=subject).single()
-                    if subject_check["count"] == 0:
-                        self.logger.warning(f"主语实体不存在，跳过关系: {subject} -[{predicate}]-> {obj}")
-                        continue
-                    
-                    # 检查object是否存在    
-                    object_check = session.run("MATCH (o:Entity {name: $name}) RETURN count(o) as count", name=obj).single()
-                    if object_check["count"] == 0:
-                        self.logger.warning(f"宾语实体不存在，跳过关系: {subject} -[{predicate}]-> {obj}")
-                        continue
-                    
-                    # 使用具体关系类型作为关系标签，转换为Neo4j兼容的标签格式
-                    neo4j_relation_type = self._normalize_relation_type_for_neo4j(predicate)
-                    
-                    # 创建关系 - 使用动态关系类型
-                    cypher = f"""
-                    MATCH (s:Entity {{name: $subject}})
-                    MATCH (o:Entity {{name: $object}})
-                    MERGE (s)-[r:`{neo4j_relation_type}`]->(o)
-                    SET r.type = $predicate,
-                        r.confidence = $confidence,
-                        r.source = $source,
-                        r.created_at = datetime()
-                    """
-                    try:
-                        session.run(cypher,
-                            subject=subject,
-                            object=obj,
-                            predicate=predicate,
-                            confidence=confidence,
-                            source=source
-                        )
-                        relation_count += 1
-                    except Exception as e:
-                        # 如果动态关系类型失败，回退到RELATED
-                        self.logger.warning(f"使用动态关系类型失败，回退到RELATED: {e}")
-                        fallback_cypher = """
-                        MATCH (s:Entity {name: $subject})
-                        MATCH (o:Entity {name: $object})
-                        MERGE (s)-[r:RELATED]->(o)
-                        SET r.type = $predicate,
-                            r.confidence = $confidence,
-                            r.source = $source,
-                            r.created_at = datetime()
-                        """
-                        session.run(fallback_cypher,
-                            subject=subject,
-                            object=obj,
-                            predicate=predicate,
-                            confidence=confidence,
-                            source=source
-                        )
-                        relation_count += 1
-                
-                count += 1
+        rows_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for row in chunk:
+            rows_by_type.setdefault(row["type"], []).append(row)
+        
+        for entity_type, rows in rows_by_type.items():
+            try:
+                write(_typed_entity_cypher(entity_type), rows)
+            except Exception as e:
+                # 如果实体类型作为标签有问题，回退到基本创建
+                self.logger.warning(f"使用类型标签创建实体失败，回退基本创建: {e}")
+                write(_BASIC_ENTITY_CYPHER, rows)
+        return len(chunk)
+    
+    def import_relations(self, relations: List[Any], tx: Optional[BulkTransaction] = None,
+                         log_skipped: bool = False, fused_literal_subjects: Iterable[str] = ()) -> int:
+        """导入关系到Neo4j
+
+        字面值按主语合并，实体间关系用UNWIND批量写入（有APOC时所有类型共用一条语句，否则按关系类型分组），
+        端点不存在的关系由MATCH自然跳过，跳过数量由每批返回的计数得出。
+        传入tx时写入bulk_session的批量事务；log_skipped为True且有批次出现跳过时，
+        对这些批次做一次批量存在性查询，逐条记录被跳过的关系。fused_literal_subjects中主语的字面值已随import_entities写入，这里跳过。
+        """
+        # 字面值按主语合并为 {谓词: 值}，同一主语的所有属性一次设置
+        literals_by_subject: Dict[str, Dict[str, str]] = {}
+        edge_rows: List[Dict[str, Any]] = []
+        
+        for relation in relations:
+            # Relation对象直接读属性，不经过to_dict()构造中间字典
+            field = dict.get if isinstance(relation, dict) else getattr
+            
+            subject = field(relation, 'subject')
+            predicate = field(relation, 'predicate')
+            obj = field(relation, 'object')
+            
+            # 检查是否为字面值关系
+            if self._is_literal_value(obj):
+                if subject in fused_literal_subjects:
+                    continue
+                # 字面值作为实体属性
+                literals_by_subject.setdefault(subject, {})[predicate] = obj
+            else:
+                # 使用具体关系类型作为关系标签，转换为Neo4j兼容的标签格式
+                neo4j_relation_type = self._normalize_relation_type_for_neo4j(predicate)
+                edge_rows.append({
+                    "rel_type": neo4j_relation_type,
+                    "subject": subject,
+                    "object": obj,
+                    "predicate": predicate,
+                    "confidence": float(field(relation, 'confidence', 1.0)),
+                    "source": field(relation, 'source', '')
+                })
+        
+        # 字面值按主语哈希分片，同一主语节点只由一个会话写入
+        literal_rows = [
+            {"subject": subject, "keys": list(properties), "vals": list(properties.values())}
+            for subject, properties in literals_by_subject.items()
+        ]
+        literal_tasks = []
+        for shard, bucket in enumerate(self._shard_rows(literal_rows)):
+            for i in range(0, len(bucket), RELATION_BATCH_SIZE):
+                literal_tasks.append((shard, self._write_literal_chunk, (bucket[i:i + RELATION_BATCH_SIZE],)))
+        
+        # 实体间关系按两个端点分片：同一分片内的关系与字面值一起并行写入，跨分片的关系之后由单个会话顺序写入
+        edge_buckets, cross_shard_rows = self._shard_edge_rows(edge_rows)
+        edge_tasks = []
+        for shard, bucket in enumerate(edge_buckets):
+            for i in range(0, len(bucket), RELATION_BATCH_SIZE):
+                edge_tasks.append((shard, self._write_edge_chunk, (bucket[i:i + RELATION_BATCH_SIZE],)))
+        cross_shard_tasks = [
+            (0, self._write_edge_chunk, (cross_shard_rows[i:i + RELATION_BATCH_SIZE],))
+            for i in range(0, len(cross_shard_rows), RELATION_BATCH_SIZE)
+        ]
         
+        # 每个批次返回 (写入数, 端点不存在而跳过数)
+        results = self._run_chunks(literal_tasks + edge_tasks, tx) + self._run_chunks(cross_shard_tasks, tx)
+        edge_tasks += cross_shard_tasks
+        literal_results = results[:len(literal_tasks)]
+        edge_results = results[len(literal_tasks):]
+        
+        literal_count = sum(written for written, _ in literal_results)
+        relation_count = sum(written for written, _ in edge_results)
+        skipped_count = sum(skipped for _, skipped in results)
+        
+        # 只有批次计数显示有跳过时才查询缺失的实体，正常导入不增加任何查询
+        if log_skipped and skipped_count:
+            self._log_skipped_relations(
+                [row for (_, _, args), (_, skipped) in zip(literal_tasks, literal_results) if skipped for row in args[-1]],
+                [row for (_, _, args), (_, skipped) in zip(edge_tasks, edge_results) if skipped for row in args[-1]],
+                tx
+            )
+        
+        count = literal_count + relation_count
         self.logger.info(f"🔗 已处理 {count} 个关系:")
         self.logger.info(f"   - 实体间关系: {relation_count} 个")
         self.logger.info(f"   - 字面值属性: {literal_count} 个")
+        if skipped_count:
+            self.logger.warning(f"   - 端点实体不存在而跳过: {skipped_count} 个")
         return count
     
-    def _is_literal_value(self, value: str) -> bool:
-        """判断值是否为字面值"""
-        literal_patterns = [
-            lambda v: '%' in v,
-            lambda v: v.lower() in ['true', 'false'],
-            lambda v: v.replace('.', '').replace('-', '').isdigit(),
-            lambda v: len(v.split()) > 3
+    def _write_literal_chunk(self, write, chunk: List[Dict[str, Any]]) -> tuple:
+        """写入一个字面值属性批次（每行一个主语及其全部属性），返回 (设置的属性数, 跳过数)
+
+        优先用apoc.create.setProperties一条语句设置所有属性；未安装APOC时按谓词逐条语句设置。
+        """
+        total = sum(len(row["keys"]) for row in chunk)
+        if self._apoc_available:
+            try:
+                updated = write(_SET_LITERALS_CYPHER, chunk)
+                return updated, total - updated
+            except Exception as e:
+                self._handle_apoc_error(e, "按谓词设置字面值属性")
+        
+        rows_by_predicate: Dict[str, List[Dict[str, Any]]] = {}
+        for row in chunk:
+            for predicate, value in zip(row["keys"], row["vals"]):
+                rows_by_predicate.setdefault(predicate, []).append({"subject": row["subject"], "object": value})
+        
+        updated = 0
+        skipped = 0
+        for predicate, rows in rows_by_predicate.items():
+            cypher = f"""
+            UNWIND $rows AS r
+            MATCH (e:Entity {{name: r.subject}})
+            SET e.`{predicate}` = r.object
+            RETURN count(*) AS updated
+            """
+            try:
+                predicate_updated = write(cypher, rows)
+            except Exception as e:
+                self.logger.warning(f"设置字面值属性失败 {predicate} ({len(rows)} 条): {e}")
+                continue
+            updated += predicate_updated
+            skipped += len(rows) - predicate_updated
+        return updated, skipped
+    
+    def _write_edge_chunk(self, write, chunk: List[Dict[str, Any]]) -> tuple:
+        """写入一个实体间关系批次，返回 (创建的关系数, 跳过数)
+
+        优先用apoc.merge.relationship一条语句合并所有类型的关系；未安装APOC时按关系类型分组，
+        每个类型一条语句，动态关系类型出错时回退到RELATED。
+        """
+        if self._apoc_available:
+            try:
+                created = write(_MERGE_RELATIONS_APOC_CYPHER, chunk)
+                return created, len(chunk) - created
+            except Exception as e:
+                self._handle_apoc_error(e, "按关系类型分别创建关系")
+        
+        rows_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for row in chunk:
+            rows_by_type.setdefault(row["rel_type"], []).append(row)
+        
+        created = 0
+        for neo4j_relation_type, rows in rows_by_type.items():
+            try:
+                created += write(_typed_relation_cypher(neo4j_relation_type), rows)
+            except Exception as e:
+                # 如果动态关系类型失败，回退到RELATED
+                self.logger.warning(f"使用动态关系类型失败，回退到RELATED: {e}")
+                created += write(_FALLBACK_RELATION_CYPHER, rows)
+        return created, len(chunk) - created
+    
+    def _log_skipped_relations(self, literal_rows: List[Dict[str, Any]], edge_rows: List[Dict[str, Any]],
+                               tx: Optional[BulkTransaction] = None):
+        """对出现跳过的批次，一次批量查询出不存在的实体名，逐条记录被跳过的关系"""
+        names = {row["subject"] for row in literal_rows}
+        for row in edge_rows:
+            names.add(row["subject"])
+            names.add(row["object"])
+        
+        names = list(names)
+        tasks = [
+            (0, lambda write, rows: write(_MISSING_ENTITIES_CYPHER, rows), (names[i:i + ENTITY_BATCH_SIZE],))
+            for i in range(0, len(names), ENTITY_BATCH_SIZE)
         ]
-        return any(pattern(value) for pattern in literal_patterns)
+        missing = set()
+        for found in self._run_chunks(tasks, tx):
+            missing.update(found)
+        if not missing:
+            return
+        
+        for row in literal_rows:
+            if row["subject"] in missing:
+                for predicate, value in zip(row["keys"], row["vals"]):
+                    self.logger.warning(f"主语实体不存在，跳过字面值属性: {row['subject']}.{predicate}={value}")
+        for row in edge_rows:
+            if row["subject"] in missing:
+                self.logger.warning(f"主语实体不存在，跳过关系: {row['subject']} -[{row['predicate']}]-> {row['object']}")
+            elif row["object"] in missing:
+                self.logger.warning(f"宾语实体不存在，跳过关系: {row['subject']} -[{row['predicate']}]-> {row['object']}")
+    
+    def _is_literal_value(self, value: str) -> bool:
+        """判断值是否为字面值：百分比、布尔值、数字/日期（仅含数字、'.'和'-'），或超过3个词的文本"""
+        return ('%' in value
+                or value.lower() in _BOOLEAN_LITERALS
+                or _NUMERIC_LITERAL(value) is not None
+                or _LONG_TEXT(value) is not None)
     
-    def _normalize_relation_type_for_neo4j(self, predicate: str) -> str:
-        """将谓词转换为Neo4j兼容的关系类型标签"""
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_relation_type_for_neo4j(predicate: str) -> str:
+        """将谓词转换为Neo4j兼容的关系类型标签（谓词种类很少，结果按谓词缓存）"""
         # Neo4j关系类型规则：
         # 1. 只能包含字母、数字、下划线
         # 2. 不能以数字开头
         # 3. 通常使用大写
         
-        # 转换为大写并替换特殊字符
-        neo4j_type = predicate.upper()
-        neo4j_type = neo4j_type.replace('-', '_')
-        neo4j_type = neo4j_type.replace(' ', '_')
-        
-        # 移除其他特殊字符
-        import re
-        neo4j_type = re.sub(r'[^A-Z0-9_]', '', neo4j_type)
+        # 转换为大写并替换特殊字符，再移除其他特殊字符
+        neo4j_type = predicate.upper().replace('-', '_').replace(' ', '_')
+        neo4j_type = _RELATION_TYPE_INVALID_CHARS.sub('', neo4j_type)
         
         # 确保不以数字开头
         if neo4j_type and neo4j_type[0].isdigit():
@@ -306,7 +777,7 @@ class Neo4jConnector:
                 "MATCH (e:Entity) WHERE e.type = $type RETURN e",
                 type=entity_type
             )
-            return [record["e"] for record in result]
+            return result.value("e")
     
     def query_entity_relations(self, entity_name: str) -> List[Dict]:
         """查询实体的所有关系"""
@@ -332,12 +803,10 @@ class Neo4jConnector:
         """获取图统计信息"""
         with self.driver.session() as session:
             # 节点统计
-            nodes_result = session.run("MATCH (n:Entity) RETURN count(n) as count")
-            nodes_count = nodes_result.single()["count"]
+            nodes_count = session.run("MATCH (n:Entity) RETURN count(n)").value()[0]
             
             # 关系统计 - 修复：统计所有关系，不仅仅是RELATED
-            edges_result = session.run("MATCH ()-[r]->() RETURN count(r) as count")
-            edges_count = edges_result.single()["count"]
+            edges_count = session.run("MATCH ()-[r]->() RETURN count(r)").value()[0]
             
             # 按类型统计实体
             type_result = session.run("""
@@ -370,32 +839,40 @@ class Neo4jConnector:
     def export_database_to_files(self, output_dir: str = "neo4j_export") -> bool:
         """导出Neo4j数据库内容到文件"""
         try:
-            from pathlib import Path
-            import json
-            
             output_path = Path(output_dir)
             output_path.mkdir(parents=True, exist_ok=True)
             
             with self.driver.session() as session:
-                # 导出实体
+                # 导出实体，同一次查询取出全部属性，非标准属性即字面值属性关系
                 entities_result = session.run("""
                     MATCH (e:Entity)
-                    RETURN e.name as name, e.type as type, e.description as description,
-                           e.confidence as confidence, e.created_at as created_at,
-                           e.attributes as attributes
+                    RETURN properties(e) as props
                 """)
                 
                 entities = []
+                literal_relations = []
                 for record in entities_result:
+                    props = record["props"]
                     entity = {
-                        "name": record["name"],
-                        "entity_type": record["type"],
-                        "description": record["description"] or "",
-                        "confidence": float(record["confidence"]) if record["confidence"] else 1.0,
-                        "created_at": record["created_at"] or "",
-                        "attributes": json.loads(record["attributes"]) if record["attributes"] else {}
+                        "name": props.get("name"),
+                        "entity_type": props.get("type"),
+                        "description": props.get("description") or "",
+                        "confidence": float(props["confidence"]) if props.get("confidence") else 1.0,
+                        "created_at": props.get("created_at") or "",
+                        "attributes": json.loads(props["attributes"]) if props.get("attributes") else {}
                     }
                     entities.append(entity)
+                    
+                    # 排除标准属性，只保留关系属性
+                    for key, value in props.items():
+                        if key not in _STANDARD_ENTITY_PROPS and value is not None:
+                            literal_relations.append({
+                                "subject": entity["name"],
+                                "predicate": key,
+                                "object": str(value),
+                                "confidence": 1.0,
+                                "source": "literal_property"
+                            })
                 
                 # 导出关系
                 relations_result = session.run("""
@@ -415,65 +892,19 @@ class Neo4jConnector:
                     }
                     relations.append(relation)
                 
-                # 导出字面值属性关系
-                literal_relations = []
-                for entity in entities:
-                    entity_name = entity["name"]
-                    # 查询该实体的所有属性
-                    props_result = session.run(f"""
-                        MATCH (e:Entity {{name: $name}})
-                        RETURN properties(e) as props
-                    """, name=entity_name)
-                    
-                    props_record = props_result.single()
-                    if props_record and props_record["props"]:
-                        props = props_record["props"]
-                        # 排除标准属性，只保留关系属性
-                        standard_props = {"name", "type", "description", "confidence", "created_at", "attributes"}
-                        for key, value in props.items():
-                            if key not in standard_props and value is not None:
-                                literal_relations.append({
-                                    "subject": entity_name,
-                                    "predicate": key,
-                                    "object": str(value),
-                                    "confidence": 1.0,
-                                    "source": "literal_property"
-                                })
-                
                 # 合并所有关系
                 all_relations = relations + literal_relations
                 
                 # 保存到文件
-                with open(output_path / "entities.json", 'w', encoding='utf-8') as f:
-                    json.dump(entities, f, ensure_ascii=False, indent=2)
-                
-                with open(output_path / "relations.json", 'w', encoding='utf-8') as f:
-                    json.dump(all_relations, f, ensure_ascii=False, indent=2)
-                
-                # 生成CSV格式
-                import pandas as pd
+                _write_json(output_path / "entities.json", entities)
+                _write_json(output_path / "relations.json", all_relations)
                 
-                # 实体CSV
-                entities_df = pd.DataFrame(entities)
-                entities_df.to_csv(output_path / "entities.csv", index=False, encoding='utf-8')
+                # 生成CSV格式，直接从记录列表流式写出，不经过DataFrame
+                _write_csv(output_path / "entities.csv", entities, _ENTITY_CSV_FIELDS)
+                _write_csv(output_path / "relations.csv", all_relations, _RELATION_CSV_FIELDS)
                 
-                # 关系CSV
-                relations_df = pd.DataFrame(all_relations)
-                relations_df.to_csv(output_path / "relations.csv", index=False, encoding='utf-8')
-                
-                # 生成三元组CSV（与dynamic_kg_storage格式兼容）
-                triples = []
-                for rel in all_relations:
-                    triples.append({
-                        "subject": rel["subject"],
-                        "predicate": rel["predicate"],
-                        "object": rel["object"],
-                        "confidence": rel["confidence"],
-                        "source": rel["source"]
-                    })
-                
-                triples_df = pd.DataFrame(triples)
-                triples_df.to_csv(output_path / "triples.csv", index=False, encoding='utf-8')
+                # 生成三元组CSV（与dynamic_kg_storage格式兼容，列与关系CSV相同）
+                _write_csv(output_path / "triples.csv", all_relations, _RELATION_CSV_FIELDS)
                 
                 self.logger.info(f"📤 数据库内容已导出到: {output_path}")
                 self.logger.info(f"   实体: {len(entities)} 个")
@@ -486,12 +917,17 @@ class Neo4jConnector:
             return False
 
     def import_from_storage_files(self, storage_path: str = "dynamic_kg_storage", 
-                                 clear_existing: bool = False) -> bool:
-        """从dynamic_kg_storage文件导入数据到Neo4j"""
+                                 clear_existing: bool = False,
+                                 use_admin_import: bool = False) -> bool:
+        """从dynamic_kg_storage文件导入数据到Neo4j
+
+        use_admin_import为True时改用离线的neo4j-admin批量导入（会覆盖整个数据库），
+        见 import_from_storage_files_admin。
+        """
+        if use_admin_import:
+            return self.import_from_storage_files_admin(storage_path)
+        
         try:
-            from pathlib import Path
-            import json
-            
             storage_dir = Path(storage_path)
             if not storage_dir.exists():
                 self.logger.error(f"❌ 存储目录不存在: {storage_path}")
@@ -502,32 +938,40 @@ class Neo4jConnector:
             
             self.create_constraints()
             
-            # 导入实体
             entities_file = storage_dir / "entities.json"
-            if entities_file.exists():
-                with open(entities_file, 'r', encoding='utf-8') as f:
-                    entities_data = json.load(f)
-                
-                # 转换为字典格式
-                entities_dict = {}
-                for entity in entities_data:
-                    entities_dict[entity["name"]] = entity
-                
-                entity_count = self.import_entities(entities_dict)
-            else:
-                self.logger.warning("⚠️  未找到entities.json文件")
-                entity_count = 0
-            
-            # 导入关系
             relations_file = storage_dir / "relations.json"
-            if relations_file.exists():
-                with open(relations_file, 'r', encoding='utf-8') as f:
-                    relations_data = json.load(f)
-                
-                relation_count = self.import_relations(relations_data)
-            else:
-                self.logger.warning("⚠️  未找到relations.json文件")
-                relation_count = 0
+            
+            # 先扫描一遍关系文件收集字面值，随实体MERGE一并写入，每个实体节点只写一次
+            literals = self._collect_literals(_iter_json_array(relations_file)) if relations_file.exists() else {}
+            fused_literal_subjects = set()
+            fused_literal_count = 0
+            
+            # 实体和关系在同一个批量事务中导入（并行写入时每批独立提交）
+            with self._import_transaction() as tx:
+                # 导入实体
+                if entities_file.exists():
+                    # 流式读取，每ENTITY_BATCH_SIZE个实体导入一次，内存占用与文件大小无关
+                    entity_count = 0
+                    for entities_data in _batched(_iter_json_array(entities_file), ENTITY_BATCH_SIZE):
+                        entities_dict = {entity["name"]: entity for entity in entities_data}
+                        batch_literals = {name: literals.pop(name) for name in entities_dict if name in literals}
+                        entity_count += self.import_entities(entities_dict, tx=tx, literals=batch_literals)
+                        fused_literal_subjects.update(batch_literals)
+                        fused_literal_count += sum(len(properties) for properties in batch_literals.values())
+                else:
+                    self.logger.warning("⚠️  未找到entities.json文件")
+                    entity_count = 0
+            
+                # 导入关系（已随实体写入的字面值跳过）
+                if relations_file.exists():
+                    relation_count = fused_literal_count
+                    for relations_data in _batched(_iter_json_array(relations_file), ENTITY_BATCH_SIZE):
+                        relation_count += self.import_relations(
+                            relations_data, tx=tx, fused_literal_subjects=fused_literal_subjects
+                        )
+                else:
+                    self.logger.warning("⚠️  未找到relations.json文件")
+                    relation_count = 0
             
             self.logger.info(f"🎉 成功从存储文件导入:")
             self.logger.info(f"   实体: {entity_count} 个")
@@ -545,11 +989,156 @@ class Neo4jConnector:
             self.logger.error(f"❌ 从存储文件导入失败: {e}")
             return False
 
+    def import_from_storage_files_admin(self, storage_path: str = "dynamic_kg_storage",
+                                        database: str = "neo4j",
+                                        neo4j_admin: str = "neo4j-admin",
+                                        csv_dir: Optional[str] = None) -> bool:
+        """用neo4j-admin离线导入dynamic_kg_storage文件（适用于首次全量导入）
+
+        将实体和关系写成neo4j-admin的CSV头文件+数据文件格式，再调用
+        ``neo4j-admin database import full`` 覆盖目标数据库。导入前必须停止目标数据库，
+        导入完成后需启动数据库并调用create_constraints()建立约束和索引。
+
+        Args:
+            storage_path: 存储路径
+            database: 目标数据库名
+            neo4j_admin: neo4j-admin可执行文件路径
+            csv_dir: CSV输出目录，默认为 <storage_path>/neo4j_admin_import
+        """
+        try:
+            storage_dir = Path(storage_path)
+            if not storage_dir.exists():
+                self.logger.error(f"❌ 存储目录不存在: {storage_path}")
+                return False
+            
+            output_dir = Path(csv_dir) if csv_dir else storage_dir / "neo4j_admin_import"
+            output_dir.mkdir(parents=True, exist_ok=True)
+            
+            entities_data = []
+            entities_file = storage_dir / "entities.json"
+            if entities_file.exists():
+                entities_data = list(_iter_json_array(entities_file))
+            else:
+                self.logger.warning("⚠️  未找到entities.json文件")
+            
+            relations_data = []
+            relations_file = storage_dir / "relations.json"
+            if relations_file.exists():
+                relations_data = list(_iter_json_array(relations_file))
+            else:
+                self.logger.warning("⚠️  未找到relations.json文件")
+            
+            command, entity_count, relation_count = self._write_admin_import_csv(
+                entities_data, relations_data, output_dir
+            )
+            command = [neo4j_admin, "database", "import", "full", *command,
+                       "--multiline-fields=true", "--high-parallel-io=on",
+                       "--overwrite-destination=true", database]
+            
+            self.logger.info(f"🚚 运行neo4j-admin离线导入: {' '.join(command)}")
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                self.logger.error(f"❌ neo4j-admin导入失败: {completed.stderr.strip() or completed.stdout.strip()}")
+                return False
+            
+            self.logger.info(f"🎉 neo4j-admin导入完成:")
+            self.logger.info(f"   实体: {entity_count} 个")
+            self.logger.info(f"   关系: {relation_count} 个")
+            self.logger.info("💡 启动数据库后请调用 create_constraints() 创建约束和索引")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ neo4j-admin导入失败: {e}")
+            return False
+    
+    def _write_admin_import_csv(self, entities_data: List[Dict], relations_data: List[Dict],
+                                output_dir: Path):
+        """写出neo4j-admin导入所需的CSV文件，返回 (命令行参数, 实体数, 关系数)"""
+        entities = {entity["name"]: entity for entity in entities_data}
+        
+        # 字面值关系成为节点属性列，实体间关系按Neo4j关系类型分文件，同一端点对只保留最后一条（同MERGE语义）
+        literals: Dict[str, Dict[str, str]] = {}
+        literal_keys: Dict[str, None] = {}
+        conflicting_keys: Dict[str, None] = {}
+        edges_by_type: Dict[str, Dict[tuple, Dict]] = {}
+        skipped = 0
+        for relation in relations_data:
+            subject = relation['subject']
+            predicate = relation['predicate']
+            obj = relation['object']
+            if subject not in entities:
+                skipped += 1
+                continue
+            if self._is_literal_value(obj):
+                # 列头用":"分隔属性名和类型，属性名中的":"替换为"_"；与固定列同名的属性会产生重复列，跳过
+                column = predicate.replace(':', '_')
+                if column in _ADMIN_ENTITY_COLUMNS:
+                    conflicting_keys[predicate] = None
+                    continue
+                literals.setdefault(subject, {})[column] = obj
+                literal_keys[column] = None
+            elif obj in entities:
+                neo4j_relation_type = self._normalize_relation_type_for_neo4j(predicate)
+                edges_by_type.setdefault(neo4j_relation_type, {})[(subject, obj)] = relation
+            else:
+                skipped += 1
+        if skipped:
+            self.logger.warning(f"⚠️  端点实体不存在，跳过 {skipped} 个关系")
+        if conflicting_keys:
+            self.logger.warning(f"⚠️  字面值属性与实体固定属性同名，跳过: {', '.join(conflicting_keys)}")
+        
+        literal_keys = list(literal_keys)
+        nodes_header = output_dir / "entities_header.csv"
+        nodes_file = output_dir / "entities.csv"
+        with open(nodes_header, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerow([
+                "name:ID", "type", "description", "confidence:float", "created_at",
+                "attributes", "display_name", *literal_keys, ":LABEL"
+            ])
+        with open(nodes_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            for name, entity in entities.items():
+                entity_type = entity.get('entity_type', 'Unknown')
+                entity_literals = literals.get(name, {})
+                writer.writerow([
+                    name, entity_type, entity.get('description', ''),
+                    float(entity.get('confidence', 1.0)), entity.get('created_at', ''),
+                    json.dumps(entity.get('attributes', {})), name,
+                    *(entity_literals.get(key, '') for key in literal_keys),
+                    f"Entity;{entity_type}"
+                ])
+        
+        command = [f"--nodes={nodes_header},{nodes_file}"]
+        created_at = datetime.now().isoformat()
+        relation_count = 0
+        for neo4j_relation_type, edges in edges_by_type.items():
+            rels_header = output_dir / f"rels_{neo4j_relation_type}_header.csv"
+            rels_file = output_dir / f"rels_{neo4j_relation_type}.csv"
+            with open(rels_header, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f).writerow([
+                    ":START_ID", ":END_ID", "type", "confidence:float", "source",
+                    "created_at:datetime", ":TYPE"
+                ])
+            with open(rels_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                for (subject, obj), relation in edges.items():
+                    writer.writerow([
+                        subject, obj, relation['predicate'],
+                        float(relation.get('confidence', 1.0)), relation.get('source', ''),
+                        created_at, neo4j_relation_type
+                    ])
+            command.append(f"--relationships={rels_header},{rels_file}")
+            relation_count += len(edges)
+        
+        relation_count += sum(len(values) for values in literals.values())
+        return command, len(entities), relation_count
+
 def import_kg_to_neo4j(entities: Dict, relations: List, 
                        uri: str = "bolt://localhost:7687", 
                        user: str = "neo4j", 
                        password: str = "yuanxi",
-                       clear_existing: bool = False) -> bool:
+                       clear_existing: bool = False,
+                       write_workers: int = DEFAULT_WRITE_WORKERS) -> bool:
     """
     便捷函数：将知识图谱导入到Neo4j
     
@@ -560,11 +1149,12 @@ def import_kg_to_neo4j(entities: Dict, relations: List,
         user: 用户名
         password: 密码
         clear_existing: 是否清空现有数据
+        write_workers: 并行写入的会话数
     
     Returns:
         bool: 导入是否成功
     """
-    connector = Neo4jConnector(uri, user, password)
+    connector = Neo4jConnector(uri, user, password, write_workers)
     
     try:
         if not connector.connect():
@@ -575,8 +1165,9 @@ def import_kg_to_neo4j(entities: Dict, relations: List,
         
         connector.create_constraints()
         
-        entity_count = connector.import_entities(entities)
-        relation_count = connector.import_relations(relations)
+        with connector._import_transaction() as tx:
+            entity_count = connector.import_entities(entities, tx=tx)
+            relation_count = connector.import_relations(relations, tx=tx)
         
         print(f"🎉 成功导入到Neo4j:")
         print(f"   实体: {entity_count} 个")
@@ -638,7 +1229,9 @@ def import_storage_to_neo4j(storage_path: str = "dynamic_kg_storage",
                            uri: str = "bolt://localhost:7687", 
                            user: str = "neo4j", 
                            password: str = "yuanxi",
-                           clear_existing: bool = False) -> bool:
+                           clear_existing: bool = False,
+                           use_admin_import: bool = False,
+                           write_workers: int = DEFAULT_WRITE_WORKERS) -> bool:
     """
     便捷函数：从dynamic_kg_storage导入数据到Neo4j
     
@@ -648,17 +1241,20 @@ def import_storage_to_neo4j(storage_path: str = "dynamic_kg_storage",
         user: 用户名
         password: 密码
         clear_existing: 是否清空现有数据
+        use_admin_import: 使用neo4j-admin离线导入（覆盖整个数据库，需先停止数据库）
+        write_workers: 并行写入的会话数
     
     Returns:
         bool: 导入是否成功
     """
-    connector = Neo4jConnector(uri, user, password)
+    connector = Neo4jConnector(uri, user, password, write_workers)
     
     try:
-        if not connector.connect():
+        # 离线导入时数据库处于停止状态，不需要Bolt连接
+        if not use_admin_import and not connector.connect():
             return False
         
-        success = connector.import_from_storage_files(storage_path, clear_existing)
+        success = connector.import_from_storage_files(storage_path, clear_existing, use_admin_import)
         
         if success:
             print(f"📥 存储文件已导入到Neo4j数据库")
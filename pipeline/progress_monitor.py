@@ -26,13 +26,23 @@ class StageResult:
 class ProgressMonitor:
     """进度监控器"""
     
-    def __init__(self):
+    def __init__(self, verbose: bool = True, min_interval: float = 0.25):
+        """
+        Args:
+            verbose: 是否逐项输出处理日志（失败项始终输出）
+            min_interval: 两次进度更新输出之间的最小间隔（秒）
+        """
         self.stages: List[StageResult] = []
         self.current_stage: Optional[StageResult] = None
         self.session_start_time = time.time()
         self.total_documents = 0
         self.total_chunks = 0
         self.total_triples = 0
+        self.verbose = verbose
+        
+        # 进度输出节流，避免高频更新时同步写stdout拖慢流水线
+        self._min_interval = min_interval
+        self._last_print = 0.0
         
     def start_stage(self, stage_name: str, input_count: int = 0, details: Dict[str, Any] = None) -> None:
         """开始一个新阶段"""
@@ -77,10 +87,15 @@ class ProgressMonitor:
             self.current_stage.errors.append(error)
             print(f"❌ 阶段错误: {error}")
         
-        # 实时输出进度
+        # 实时输出进度（节流；阶段全部完成时总是输出）
         if output_count is not None:
+            now = time.time()
+            if now - self._last_print < self._min_interval and output_count != self.current_stage.input_count:
+                return
+            self._last_print = now
+            
             success_rate = (output_count / self.current_stage.input_count * 100) if self.current_stage.input_count > 0 else 0
-            elapsed = time.time() - self.current_stage.start_time
+            elapsed = now - self.current_stage.start_time
             print(f"📈 进度更新: {output_count}/{self.current_stage.input_count} ({success_rate:.1f}%) - 耗时: {elapsed:.1f}s")
     
     def end_stage(self, status: str = "completed", final_output_count: int = None) -> StageResult:
@@ -126,6 +141,9 @@ class ProgressMonitor:
     
     def log_item_processing(self, item_name: str, status: str, details: str = "") -> None:
         """记录单个项目的处理"""
+        if not self.verbose and status != "failed":
+            return
+        
         status_emoji = "✅" if status == "success" else "❌" if status == "failed" else "⚠️"
         print(f"   {status_emoji} {item_name}: {details}")
     
@@ -4,7 +4,9 @@
 """
 
 import re
+import sys
 import time
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
@@ -24,10 +26,19 @@ class TripleExtractionResult:
 class RuleBasedTripleExtractor:
     """基于规则的三元组抽取器"""
     
+    # 共现推断的上下文关键词
+    TIME_KEYWORDS = ('开始', '发生', 'start', 'begin')
+    LOCATION_KEYWORDS = ('位于', '在', 'located', 'at')
+    _DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+    
     def __init__(self, ontology_manager: DynamicOntologyManager):
         self.ontology_manager = ontology_manager
         self.entity_inferer = EnhancedEntityTypeInferer()
         self.entity_inferer.ontology_manager = ontology_manager
+
+        # 实例关系抽取时同一文档/批次中的实体名大量重复，按实体名缓存类型推断结果；
+        # 本体变更后需调用on_ontology_update()失效
+        self._infer_cached = lru_cache(maxsize=4096)(self.entity_inferer.infer_entity_type)
         
         # 预编译的模式
         self._compile_patterns()
@@ -79,13 +90,109 @@ class RuleBasedTripleExtractor:
                 r'(\w+)\s+supports\s+(\w+)',
                 r'(\w+)\s+implements\s+(\w+)',
                 r'(\w+)\s+uses\s+(\w+)',
-            ]
+            ],
+
+            # 开始时间模式
+            'start_time': [
+                r'(\w+)[^0-9]*开始时间[^0-9]*([0-9\-:\s]+)',
+                r'(\w+)[^0-9]*发生在[^0-9]*([0-9\-:\s]+)',
+            ],
+
+            # 持续时间模式
+            'duration': [
+                r'(\w+)[^0-9]*持续时间[^0-9]*([0-9]+[小时天分钟])',
+                r'(\w+)[^0-9]*持续[^0-9]*([0-9]+[小时天分钟])',
+            ],
+
+            # 位置关系模式
+            'location': [
+                r'(\w+)[^a-zA-Z]*位于[^a-zA-Z]*(\w+)',
+                r'(\w+)[^a-zA-Z]*在[^a-zA-Z]*(\w+)',
+            ],
+
+            # 条件关系模式
+            'condition': [
+                r'(\w+)[^>]*条件[^>]*[:：]\s*([^,，。.]+)',
+                r'(\w+)[^>]*when[^>]*([^,，。.]+)',
+            ],
+
+            # 结果关系模式
+            'result': [
+                r'(\w+)[^a-zA-Z]*结果[^a-zA-Z]*[:：]\s*([^,，。.]+)',
+                r'(\w+)[^a-zA-Z]*导致[^a-zA-Z]*(\w+)',
+                r'(\w+)[^a-zA-Z]*results\s+in[^a-zA-Z]*(\w+)',
+            ],
+
+            # 包含关系模式
+            'contains': [
+                r'(\w+)[^a-zA-Z]*包含[^a-zA-Z]*(\w+)',
+                r'(\w+)[^a-zA-Z]*contains[^a-zA-Z]*(\w+)',
+            ],
         }
         
         # 编译正则表达式
         self.compiled_patterns = {}
         for category, patterns in self.patterns.items():
             self.compiled_patterns[category] = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+        # 每个模式的证据字符串只构造一次，所有匹配产生的三元组共享同一个字符串对象
+        evidence_prefixes = {
+            'instance_patterns': "Pattern match: ",
+            'start_time': "Time pattern: ",
+            'duration': "Duration pattern: ",
+            'location': "Location pattern: ",
+            'condition': "Condition pattern: ",
+            'result': "Result pattern: ",
+            'contains': "Contains pattern: ",
+        }
+        self.pattern_evidence = {
+            category: [sys.intern(prefix + pattern) for pattern in self.patterns[category]]
+            for category, prefix in evidence_prefixes.items()
+        }
+
+        # 各模式匹配时必然出现的关键词（与compiled_patterns逐项对齐）。
+        # 先用一个合并的关键词正则扫描一遍文本，只对关键词出现过的模式执行findall；
+        # 各模式仍单独匹配，避免合并成一个大正则后重叠匹配互相吞掉
+        self.pattern_keywords = {
+            'instance_patterns': ['是', '属于', 'is', 'is', 'is'],
+            'start_time': ['开始时间', '发生在'],
+            'duration': ['持续', '持续'],
+            'location': ['位于', '在'],
+            'condition': ['条件', 'when'],
+            'result': ['结果', '导致', 'results'],
+            'contains': ['包含', 'contains'],
+        }
+        keywords = sorted({keyword for keywords in self.pattern_keywords.values() for keyword in keywords})
+        self._keyword_groups = {f'k{i}': keyword for i, keyword in enumerate(keywords)}
+        # 零宽前瞻保证相互重叠的关键词（如"发生在"与"在"）都能被找到
+        self._keyword_scanner = re.compile(
+            '(?=' + '|'.join(f'(?P<{name}>{re.escape(keyword)})' for name, keyword in self._keyword_groups.items()) + ')',
+            re.IGNORECASE
+        )
+
+        # 共现推断使用的分句与实体识别模式。实体模式之间有重叠（如"iPhone"中驼峰命名与
+        # 大写开头的"Phone"都算实体），合并为一个交替正则会丢失重叠匹配，因此逐个findall
+        self._sentence_splitter = re.compile(r'[。.!！?？]')
+        self._entity_patterns = (
+            re.compile(r'[A-Z][a-zA-Z]+'),  # 大写开头的词
+            re.compile(r'\d{4}-\d{2}-\d{2}[\s\d:]*'),  # 时间格式
+            re.compile(r'\d+[小时天分钟]'),  # 时间长度
+            re.compile(r'[a-zA-Z]+[A-Z][a-zA-Z]*'),  # 驼峰命名
+        )
+    
+    def _scan_keywords(self, text: str) -> set:
+        """单次扫描文本，返回其中出现的模式关键词集合"""
+        return {self._keyword_groups[m.lastgroup] for m in self._keyword_scanner.finditer(text)}
+    
+    def _active_patterns(self, category: str, keywords: Optional[set]) -> List[Tuple[re.Pattern, str]]:
+        """按关键词预筛选后的(模式, 证据字符串)列表，keywords为None时不过滤"""
+        entries = zip(self.compiled_patterns[category], self.pattern_evidence[category], self.pattern_keywords[category])
+        return [(pattern, evidence) for pattern, evidence, keyword in entries
+                if keywords is None or keyword in keywords]
+    
+    def on_ontology_update(self):
+        """本体（实体类型、关键词、模式）变更后调用，清空类型推断缓存"""
+        self._infer_cached.cache_clear()
     
     def extract_triples(self, text: str) -> List[TripleExtractionResult]:
         """
@@ -100,25 +207,26 @@ class RuleBasedTripleExtractor:
         print(f"🔧 规则抽取器开始处理文本，长度: {len(text)}")
         
         triples = []
+        keywords = self._scan_keywords(text)
         
         # 1. 实例关系抽取
-        instance_triples = self._extract_instance_relations(text)
+        instance_triples = self._extract_instance_relations(text, keywords)
         triples.extend(instance_triples)
         
         # 2. 时间关系抽取
-        temporal_triples = self._extract_temporal_relations(text)
+        temporal_triples = self._extract_temporal_relations(text, keywords)
         triples.extend(temporal_triples)
         
         # 3. 空间关系抽取
-        spatial_triples = self._extract_spatial_relations(text)
+        spatial_triples = self._extract_spatial_relations(text, keywords)
         triples.extend(spatial_triples)
         
         # 4. DO-DA-F关系抽取
-        dodaf_triples = self._extract_dodaf_relations(text)
+        dodaf_triples = self._extract_dodaf_relations(text, keywords)
         triples.extend(dodaf_triples)
         
         # 5. 架构关系抽取
-        arch_triples = self._extract_architecture_relations(text)
+        arch_triples = self._extract_architecture_relations(text, keywords)
         triples.extend(arch_triples)
         
         # 6. 基于实体推断的关系发现
@@ -129,18 +237,18 @@ class RuleBasedTripleExtractor:
         
         return triples
     
-    def _extract_instance_relations(self, text: str) -> List[TripleExtractionResult]:
+    def _extract_instance_relations(self, text: str, keywords: Optional[set] = None) -> List[TripleExtractionResult]:
         """抽取实例关系"""
         triples = []
         
-        for pattern in self.compiled_patterns['instance_patterns']:
+        for pattern, evidence in self._active_patterns('instance_patterns', keywords):
             matches = pattern.findall(text)
             for match in matches:
                 subject, obj = match
                 
                 # 验证实体类型
-                subject_type = self.entity_inferer.infer_entity_type(subject)
-                object_type = self.entity_inferer.infer_entity_type(obj)
+                subject_type = self._infer_cached(subject)
+                object_type = self._infer_cached(obj)
                 
                 if subject_type.confidence > 0.5 and object_type.confidence > 0.5:
                     triple = TripleExtractionResult(
@@ -149,24 +257,17 @@ class RuleBasedTripleExtractor:
                         object=obj,
                         confidence=min(subject_type.confidence, object_type.confidence),
                         method="rule_pattern",
-                        evidence=f"Pattern match: {pattern.pattern}"
+                        evidence=evidence
                     )
                     triples.append(triple)
         
         return triples
     
-    def _extract_temporal_relations(self, text: str) -> List[TripleExtractionResult]:
+    def _extract_temporal_relations(self, text: str, keywords: Optional[set] = None) -> List[TripleExtractionResult]:
         """抽取时间关系"""
         triples = []
         
-        # 开始时间模式
-        start_time_patterns = [
-            r'(\w+)[^0-9]*开始时间[^0-9]*([0-9\-:\s]+)',
-            r'(\w+)[^0-9]*发生在[^0-9]*([0-9\-:\s]+)',
-        ]
-        
-        for pattern_str in start_time_patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
+        for pattern, evidence in self._active_patterns('start_time', keywords):
             matches = pattern.findall(text)
             for match in matches:
                 subject, time_str = match
@@ -177,18 +278,11 @@ class RuleBasedTripleExtractor:
                     object=time_str.strip(),
                     confidence=0.8,
                     method="temporal_pattern",
-                    evidence=f"Time pattern: {pattern_str}"
+                    evidence=evidence
                 )
                 triples.append(triple)
         
-        # 持续时间模式
-        duration_patterns = [
-            r'(\w+)[^0-9]*持续时间[^0-9]*([0-9]+[小时天分钟])',
-            r'(\w+)[^0-9]*持续[^0-9]*([0-9]+[小时天分钟])',
-        ]
-        
-        for pattern_str in duration_patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
+        for pattern, evidence in self._active_patterns('duration', keywords):
             matches = pattern.findall(text)
             for match in matches:
                 subject, duration = match
@@ -199,24 +293,17 @@ class RuleBasedTripleExtractor:
                     object=duration.strip(),
                     confidence=0.8,
                     method="temporal_pattern",
-                    evidence=f"Duration pattern: {pattern_str}"
+                    evidence=evidence
                 )
                 triples.append(triple)
         
         return triples
     
-    def _extract_spatial_relations(self, text: str) -> List[TripleExtractionResult]:
+    def _extract_spatial_relations(self, text: str, keywords: Optional[set] = None) -> List[TripleExtractionResult]:
         """抽取空间关系"""
         triples = []
         
-        # 位置关系模式
-        location_patterns = [
-            r'(\w+)[^a-zA-Z]*位于[^a-zA-Z]*(\w+)',
-            r'(\w+)[^a-zA-Z]*在[^a-zA-Z]*(\w+)',
-        ]
-        
-        for pattern_str in location_patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
+        for pattern, evidence in self._active_patterns('location', keywords):
             matches = pattern.findall(text)
             for match in matches:
                 subject, location = match
@@ -227,24 +314,17 @@ class RuleBasedTripleExtractor:
                     object=location.strip(),
                     confidence=0.8,
                     method="spatial_pattern",
-                    evidence=f"Location pattern: {pattern_str}"
+                    evidence=evidence
                 )
                 triples.append(triple)
         
         return triples
     
-    def _extract_dodaf_relations(self, text: str) -> List[TripleExtractionResult]:
+    def _extract_dodaf_relations(self, text: str, keywords: Optional[set] = None) -> List[TripleExtractionResult]:
         """抽取DO-DA-F关系"""
         triples = []
         
-        # 条件关系模式
-        condition_patterns = [
-            r'(\w+)[^>]*条件[^>]*[:：]\s*([^,，。.]+)',
-            r'(\w+)[^>]*when[^>]*([^,，。.]+)',
-        ]
-        
-        for pattern_str in condition_patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
+        for pattern, evidence in self._active_patterns('condition', keywords):
             matches = pattern.findall(text)
             for match in matches:
                 action, condition = match
@@ -255,19 +335,11 @@ class RuleBasedTripleExtractor:
                     object=condition.strip(),
                     confidence=0.7,
                     method="dodaf_pattern",
-                    evidence=f"Condition pattern: {pattern_str}"
+                    evidence=evidence
                 )
                 triples.append(triple)
         
-        # 结果关系模式
-        result_patterns = [
-            r'(\w+)[^a-zA-Z]*结果[^a-zA-Z]*[:：]\s*([^,，。.]+)',
-            r'(\w+)[^a-zA-Z]*导致[^a-zA-Z]*(\w+)',
-            r'(\w+)[^a-zA-Z]*results\s+in[^a-zA-Z]*(\w+)',
-        ]
-        
-        for pattern_str in result_patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
+        for pattern, evidence in self._active_patterns('result', keywords):
             matches = pattern.findall(text)
             for match in matches:
                 action, result = match
@@ -278,24 +350,17 @@ class RuleBasedTripleExtractor:
                     object=result.strip(),
                     confidence=0.7,
                     method="dodaf_pattern",
-                    evidence=f"Result pattern: {pattern_str}"
+                    evidence=evidence
                 )
                 triples.append(triple)
         
         return triples
     
-    def _extract_architecture_relations(self, text: str) -> List[TripleExtractionResult]:
+    def _extract_architecture_relations(self, text: str, keywords: Optional[set] = None) -> List[TripleExtractionResult]:
         """抽取架构关系"""
         triples = []
         
-        # 包含关系模式
-        contains_patterns = [
-            r'(\w+)[^a-zA-Z]*包含[^a-zA-Z]*(\w+)',
-            r'(\w+)[^a-zA-Z]*contains[^a-zA-Z]*(\w+)',
-        ]
-        
-        for pattern_str in contains_patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
+        for pattern, evidence in self._active_patterns('contains', keywords):
             matches = pattern.findall(text)
             for match in matches:
                 container, contained = match
@@ -306,7 +371,7 @@ class RuleBasedTripleExtractor:
                     object=contained.strip(),
                     confidence=0.7,
                     method="architecture_pattern",
-                    evidence=f"Contains pattern: {pattern_str}"
+                    evidence=evidence
                 )
                 triples.append(triple)
         
@@ -317,69 +382,50 @@ class RuleBasedTripleExtractor:
         triples = []
         
         # 简单的共现关系推断
-        sentences = re.split(r'[。.!！?？]', text)
+        sentences = self._sentence_splitter.split(text)
         
         for sentence in sentences:
             if len(sentence.strip()) < 10:
                 continue
             
+            # 上下文关键词按句子判断一次；两类关键词都没有时不会产生任何关系
+            context_lower = sentence.lower()
+            has_time = any(keyword in context_lower for keyword in self.TIME_KEYWORDS)
+            has_location = any(keyword in context_lower for keyword in self.LOCATION_KEYWORDS)
+            if not (has_time or has_location):
+                continue
+            
             # 提取句子中的实体
             entities = self._extract_entities_from_sentence(sentence)
             
             if len(entities) >= 2:
-                # 为每对实体推断可能的关系
-                for i, entity1 in enumerate(entities):
-                    for entity2 in entities[i+1:]:
-                        relation = self._infer_relation_between_entities(entity1, entity2, sentence)
-                        if relation:
-                            triples.append(relation)
+                # 为每对实体推断可能的关系（entity1在前、entity2在后）
+                date_indices = [j for j, entity in enumerate(entities) if self._DATE_RE.match(entity)] if has_time else []
+                dates = set(date_indices)
+                if has_location:
+                    pairs = ((i, j) for i in range(len(entities)) for j in range(i + 1, len(entities)))
+                else:
+                    # 只有时间关键词时，仅与后面的日期实体配对
+                    pairs = ((i, j) for i in range(len(entities)) for j in date_indices if j > i)
+                
+                evidence = f"Context: {sentence[:50]}..."
+                for i, j in pairs:
+                    triples.append(TripleExtractionResult(
+                        subject=entities[i],
+                        predicate="hasStartTime" if j in dates else "locatedAt",
+                        object=entities[j],
+                        confidence=0.6,
+                        method="context_inference",
+                        evidence=evidence
+                    ))
         
         return triples
     
     def _extract_entities_from_sentence(self, sentence: str) -> List[str]:
         """从句子中提取实体"""
         # 简单的实体识别：大写字母开头的词、数字时间、特殊模式
-        entity_patterns = [
-            r'[A-Z][a-zA-Z]+',  # 大写开头的词
-            r'\d{4}-\d{2}-\d{2}[\s\d:]*',  # 时间格式
-            r'\d+[小时天分钟]',  # 时间长度
-            r'[a-zA-Z]+[A-Z][a-zA-Z]*',  # 驼峰命名
-        ]
-        
-        entities = []
-        for pattern_str in entity_patterns:
-            pattern = re.compile(pattern_str)
-            matches = pattern.findall(sentence)
-            entities.extend(matches)
-        
-        return list(set(entities))  # 去重
-    
-    def _infer_relation_between_entities(self, entity1: str, entity2: str, context: str) -> Optional[TripleExtractionResult]:
-        """推断两个实体之间的关系"""
-        # 基于上下文关键词推断关系
-        context_lower = context.lower()
-        
-        # 时间关系推断
-        if any(keyword in context_lower for keyword in ['开始', '发生', 'start', 'begin']):
-            if re.match(r'\d{4}-\d{2}-\d{2}', entity2):
-                return TripleExtractionResult(
-                    subject=entity1,
-                    predicate="hasStartTime",
-                    object=entity2,
-                    confidence=0.6,
-                    method="context_inference",
-                    evidence=f"Context: {context[:50]}..."
-                )
-        
-        # 位置关系推断
-        if any(keyword in context_lower for keyword in ['位于', '在', 'located', 'at']):
-            return TripleExtractionResult(
-                subject=entity1,
-                predicate="locatedAt",
-                object=entity2,
-                confidence=0.6,
-                method="context_inference",
-                evidence=f"Context: {context[:50]}..."
-            )
+        entities = set()  # 去重
+        for pattern in self._entity_patterns:
+            entities.update(pattern.findall(sentence))
         
-        return None
+        return list(entities)
@@ -8,6 +8,7 @@ import time
 import uuid
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 
@@ -185,12 +186,10 @@ class SchemaBasedKGBuilder:
         print(f"   🔗 生成关系: {len(relations)} 个")
 
         # 显示实体类型分布
-        entity_type_counts = {}
-        for entity in entities:
-            entity_type_counts[entity.type] = entity_type_counts.get(entity.type, 0) + 1
+        entity_type_counts = Counter(entity.type for entity in entities)
 
         print(f"   📊 实体类型分布:")
-        for entity_type, count in sorted(entity_type_counts.items(), key=lambda x: x[1], reverse=True):
+        for entity_type, count in entity_type_counts.most_common():
             print(f"      {entity_type}: {count} 个")
 
         # 保存实体推断阶段
@@ -521,14 +520,8 @@ class SchemaBasedKGBuilder:
         processing_time = time.time() - start_time
         
         # 统计信息
-        entity_type_counts = {}
-        relation_type_counts = {}
-        
-        for entity in entities:
-            entity_type_counts[entity.type] = entity_type_counts.get(entity.type, 0) + 1
-        
-        for relation in relations:
-            relation_type_counts[relation.predicate] = relation_type_counts.get(relation.predicate, 0) + 1
+        entity_type_counts = dict(Counter(entity.type for entity in entities))
+        relation_type_counts = dict(Counter(relation.predicate for relation in relations))
         
         # 元数据
         metadata = {
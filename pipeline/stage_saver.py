@@ -11,6 +11,18 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_default(obj: Any) -> Any:
+    """JSON序列化兜底：numpy标量/数组转为Python数值/列表，其他无法序列化的对象转为字符串"""
+    if type(obj).__module__ == "numpy":
+        return obj.tolist()
+    return str(obj)
+
 @dataclass
 class StageData:
     """阶段数据"""
@@ -62,8 +74,7 @@ class StageSaver:
         }
         
         # 保存到文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(stage_data, f, indent=2, ensure_ascii=False, default=str)
+        self._write_json(file_path, stage_data)
         
         # 记录日志
         stage_desc = self.stages.get(safe_stage_name, stage_name)
@@ -72,6 +83,18 @@ class StageSaver:
         
         return str(file_path)
     
+    @staticmethod
+    def _write_json(file_path: Path, data: Any):
+        """写入JSON文件（安装了orjson时使用C实现序列化），numpy数值保持为数字，其他无法序列化的对象转为字符串"""
+        if ORJSON_AVAILABLE:
+            file_path.write_bytes(orjson.dumps(
+                data, default=_json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ))
+            return
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=_json_default)
+    
     def load_stage(self, stage_name: str, session_id: str = None) -> Optional[StageData]:
         """加载阶段数据"""
         target_session = session_id or self.session_id
@@ -168,8 +191,7 @@ class StageSaver:
             }
             review_data["items"].append(review_item)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(review_data, f, indent=2, ensure_ascii=False, default=str)
+        self._write_json(Path(output_path), review_data)
         
         print(f"📋 创建审核文件: {output_path} ({len(data)} 项待审核)")
         return str(output_path)
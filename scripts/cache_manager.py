@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
 import argparse
+from collections import OrderedDict
 from datetime import datetime
 from pipeline.enhanced_entity_inferer import EnhancedEntityTypeInferer
 from pipeline.stage_saver import StageSaver
@@ -36,14 +37,14 @@ class CacheManager:
         if stats['total_cached_entities'] > 0:
             print("📋 缓存详情:")
             for entity, info in list(self.inferer.entity_cache.verified_entities.items())[:10]:
-                print(f"  {entity:<20} | {info['type']:<12} | 使用{info['count']}次 | {info['source']}")
+                print(f"  {entity:<20} | {info.type:<12} | 使用{info.count}次 | {info.source}")
             
             if stats['total_cached_entities'] > 10:
                 print(f"  ... 还有 {stats['total_cached_entities'] - 10} 个实体")
     
-    def export_for_review(self, output_file: str = None):
+    def export_for_review(self, output_file: str = None, top_k: int = None):
         """导出高频实体供人工审核"""
-        high_freq_entities = self.inferer.entity_cache.export_for_review()
+        high_freq_entities = self.inferer.entity_cache.export_for_review(top_k=top_k)
         
         if not high_freq_entities:
             print("📭 没有高频实体需要审核")
@@ -93,9 +94,9 @@ class CacheManager:
         original_count = len(self.inferer.entity_cache.verified_entities)
         
         # 过滤低质量项
-        filtered_entities = {}
+        filtered_entities = OrderedDict()
         for entity, info in self.inferer.entity_cache.verified_entities.items():
-            if info['confidence'] >= min_confidence and info['count'] >= min_usage:
+            if info.confidence >= min_confidence and info.count >= min_usage:
                 filtered_entities[entity] = info
         
         self.inferer.entity_cache.verified_entities = filtered_entities
@@ -113,7 +114,7 @@ class CacheManager:
         backup_data = {
             "backup_time": datetime.now().isoformat(),
             "total_entities": len(self.inferer.entity_cache.verified_entities),
-            "entities": self.inferer.entity_cache.verified_entities
+            "entities": self.inferer.entity_cache.to_dict()
         }
         
         with open(backup_file, 'w', encoding='utf-8') as f:
@@ -128,7 +129,7 @@ class CacheManager:
             with open(backup_file, 'r', encoding='utf-8') as f:
                 backup_data = json.load(f)
             
-            self.inferer.entity_cache.verified_entities = backup_data["entities"]
+            self.inferer.entity_cache.load_dict(backup_data["entities"])
             
             print(f"🔄 缓存已恢复: {backup_data['total_entities']} 个实体")
             print(f"📅 备份时间: {backup_data['backup_time']}")
@@ -150,10 +151,10 @@ class CacheManager:
         usage_stats = []
         
         for info in entities.values():
-            source = info['source']
+            source = info.source
             source_stats[source] = source_stats.get(source, 0) + 1
-            confidence_stats.append(info['confidence'])
-            usage_stats.append(info['count'])
+            confidence_stats.append(info.confidence)
+            usage_stats.append(info.count)
         
         print("📈 缓存性能分析")
         print("=" * 50)
@@ -185,6 +186,7 @@ def main():
     # 导出审核文件
     export_parser = subparsers.add_parser('export', help='导出高频实体供审核')
     export_parser.add_argument('--output', help='输出文件路径')
+    export_parser.add_argument('--top-k', type=int, help='只导出频次最高的前K个实体')
     
     # 导入审核结果
     import_parser = subparsers.add_parser('import', help='导入审核后的实体类型')
@@ -217,7 +219,7 @@ def main():
     if args.command == 'stats':
         manager.show_cache_stats()
     elif args.command == 'export':
-        manager.export_for_review(args.output)
+        manager.export_for_review(args.output, args.top_k)
     elif args.command == 'import':
         manager.import_reviewed_entities(args.review_file)
     elif args.command == 'clean':
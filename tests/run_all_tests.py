@@ -24,6 +24,9 @@ def run_all_tests():
         ("integration/test_multi_schema_kg.py", "多Schema集成测试"),
         ("unit/test_schema_system.py", "Schema系统单元测试"),
         ("unit/test_session_system.py", "会话系统单元测试"),
+        ("unit/test_entity_type_inferer.py", "实体类型推断单元测试"),
+        ("unit/test_kg_updater.py", "知识图谱更新器单元测试"),
+        ("unit/test_neo4j_connector.py", "Neo4j连接器单元测试"),
     ]
     
     results = []
@@ -190,7 +190,7 @@ def test_file_structure():
     # 备份文件
     backups_path = results_path / "backups"
     if backups_path.exists():
-        backup_files = list(backups_path.glob("*.pkl"))
+        backup_files = list(backups_path.glob("kg_backup_*"))
         total_backup_size = sum(f.stat().st_size for f in backup_files) / 1024  # KB
         print(f"   💾 备份文件: {len(backup_files)} 个, {total_backup_size:.1f} KB")
     
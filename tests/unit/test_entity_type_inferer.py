@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+测试基于三元组的实体类型推断
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pipeline.entity_type_inferer import EntityTypeInferer
+
+def test_vote_order_tie():
+    """测试票数相同时的类型选择：实例声明 → 名称 → 谓词模式的计票顺序"""
+    print("🔍 测试票数相同时的类型选择")
+
+    inferer = EntityTypeInferer()
+    triples = [
+        {"subject": "QuantizationAlgorithm", "predicate": "implements", "object": "X"},
+        {"subject": "QuantizationAlgorithm", "predicate": "reduces_computation_by", "object": "50%"},
+    ]
+
+    # 名称投票 Algorithm +5，谓词投票 Technique +3+2，平票时取先计入的名称投票
+    types = inferer.infer_entity_types_from_triples(triples)
+    print(f"   推断结果: {types}")
+    assert types["QuantizationAlgorithm"] == "Algorithm"
+    assert types["X"] == "Algorithm"
+
+    # 实例声明优先于其他投票
+    types = inferer.infer_entity_types_from_triples(
+        triples + [{"subject": "QuantizationAlgorithm", "predicate": "is_instance_of", "object": "Technique"}]
+    )
+    assert types["QuantizationAlgorithm"] == "Technique"
+
+    print("✅ 票数相同时的类型选择正确")
+
+def main():
+    """主测试函数"""
+    print("🧪 实体类型推断测试")
+    print("=" * 60)
+
+    test_vote_order_tie()
+
+if __name__ == "__main__":
+    main()
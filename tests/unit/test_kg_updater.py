@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+测试知识图谱更新器的持久化存储
+"""
+
+import sys
+import os
+import json
+import subprocess
+import tempfile
+import textwrap
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from ontology.managers.dynamic_schema import DynamicOntologyManager
+from pipeline.kg_updater import KnowledgeGraphUpdater
+
+SCHEMA_PATH = os.path.join(PROJECT_ROOT, "ontology", "schemas", "general", "schema_config.yaml")
+
+def _new_updater(storage_path: str, **kwargs) -> KnowledgeGraphUpdater:
+    return KnowledgeGraphUpdater(DynamicOntologyManager(SCHEMA_PATH), storage_path=storage_path, **kwargs)
+
+def _kg_state(updater: KnowledgeGraphUpdater):
+    """实体和关系的可比较表示"""
+    entities = {name: (entity.entity_type, entity.attributes) for name, entity in updater.schema.entities.items()}
+    relations = [
+        (relation.subject, relation.predicate, relation.object, relation.confidence, relation.source)
+        for relation in updater.schema.relations
+    ]
+    return entities, relations
+
+def test_backup_restore_round_trip():
+    """测试完整快照 + 增量备份恢复出与原状态一致的实体、关系和图结构"""
+    print("🔍 测试快照/增量备份恢复")
+
+    storage_path = tempfile.mkdtemp()
+    updater = _new_updater(storage_path)
+    batches = [
+        [{"subject": "Dijkstra", "predicate": "uses", "object": "PriorityQueue", "confidence": 0.6,
+          "subject_type": "Algorithm", "source": "doc1"}],
+        [{"subject": "BFS", "predicate": "uses", "object": "Queue", "confidence": 0.8},
+         {"subject": "Dijkstra", "predicate": "complexity", "object": "2.5"}],
+        # 已有关系的置信度更新
+        [{"subject": "Dijkstra", "predicate": "uses", "object": "PriorityQueue", "confidence": 0.9, "source": "doc2"}],
+    ]
+    for triples in batches:
+        assert updater.update_kg_from_triples(triples).success
+
+    # 备份在每次更新前执行，再备份一次以记录最后一次更新的变化
+    updater._backup_current_state()
+    backups = sorted(path.name for path in (updater.storage_path / "backups").iterdir())
+    print(f"   备份文件: {backups}")
+    assert sum(name.startswith("kg_backup_") for name in backups) == 1
+    assert sum(name.startswith("deltas_") for name in backups) == 1
+
+    restored = _new_updater(storage_path)
+    assert restored.restore_from_backups()
+    assert _kg_state(restored) == _kg_state(updater)
+    assert ("Dijkstra", "uses", "PriorityQueue", 0.9, "doc1, doc2") in _kg_state(restored)[1]
+
+    # 图结构与ID映射同样被重建
+    assert restored.graph.number_of_nodes() == updater.graph.number_of_nodes()
+    assert restored.graph.number_of_edges() == updater.graph.number_of_edges()
+    dijkstra = restored._name2id["Dijkstra"]
+    assert restored.graph.nodes[dijkstra]["literals"] == {"complexity": "2.5"}
+    assert restored.graph.edges[dijkstra, restored._name2id["PriorityQueue"]]["confidence"] == 0.9
+
+    # 恢复后的更新继续去重
+    restored.update_kg_from_triples([{"subject": "BFS", "predicate": "uses", "object": "Queue"}])
+    assert len(restored.schema.relations) == len(updater.schema.relations)
+
+    print("✅ 快照/增量备份恢复正确")
+
+def test_batch_commit():
+    """测试批量模式只在开始时备份一次，图结构和存储文件在end_batch时统一更新"""
+    print("🔍 测试批量提交")
+
+    updater = _new_updater(tempfile.mkdtemp())
+    entities_file = updater.storage_path / "entities.json"
+
+    updater.begin_batch()
+    for i in range(3):
+        result = updater.update_kg_from_triples([{"subject": f"A{i}", "predicate": "uses", "object": f"B{i}"}])
+        assert result.success
+        assert result.new_entities == 2
+    # 批量期间只合并三元组
+    assert len(updater.schema.entities) == 6
+    assert updater.graph.number_of_nodes() == 0
+    assert not entities_file.exists()
+    assert len(list((updater.storage_path / "backups").iterdir())) == 1
+
+    updater.end_batch()
+    assert updater.graph.number_of_nodes() == 6
+    assert updater.graph.number_of_edges() == 3
+    with open(entities_file, 'r', encoding='utf-8') as f:
+        assert sorted(json.load(f)) == ["A0", "A1", "A2", "B0", "B1", "B2"]
+    # 重复调用end_batch不会再次写入
+    entities_file.unlink()
+    updater.end_batch()
+    assert not entities_file.exists()
+
+    # put_batch等价于begin_batch + update + end_batch
+    result = updater.put_batch([{"subject": "A0", "predicate": "extends", "object": "C0"}])
+    assert result.success and result.new_entities == 1 and result.new_relations == 1
+    assert not updater._in_batch
+    assert updater.graph.number_of_nodes() == 7
+    assert entities_file.exists()
+
+    print("✅ 批量提交正确")
+
+def test_node_id_mapping():
+    """测试图节点使用整数ID，实体名与ID双向映射一致，查询和统计结果使用实体名"""
+    print("🔍 测试节点ID映射")
+
+    updater = _new_updater(tempfile.mkdtemp())
+    updater.update_kg_from_triples([
+        {"subject": "A", "predicate": "uses", "object": "B"},
+        {"subject": "B", "predicate": "uses", "object": "C"},
+        {"subject": "A", "predicate": "version", "object": "3"},
+    ])
+
+    assert all(isinstance(node, int) for node in updater.graph.nodes)
+    assert set(updater._id2name) == {"A", "B", "C"}
+    assert all(updater._id2name[node_id] == name for name, node_id in updater._name2id.items())
+    assert set(updater.graph.nodes) == set(updater._name2id.values())
+
+    path = updater.query_kg("shortest_path", start="A", end="C")
+    assert path == [{"path": ["A", "B", "C"], "length": 2}]
+    top_nodes = dict(updater.get_kg_statistics()["top_central_nodes"])
+    assert set(top_nodes) == {"A", "B", "C"}
+    assert top_nodes["B"] == max(top_nodes.values())
+
+    with open(updater.storage_path / "edges.txt", 'r', encoding='utf-8') as f:
+        assert sorted(line.split("\t")[:3] for line in f) == [["A", "uses", "B"], ["B", "uses", "C"]]
+
+    # 图结构完整重建后映射保持一致
+    updater._rebuild_graph_structure()
+    assert updater.query_kg("shortest_path", start="A", end="C") == path
+
+    print("✅ 节点ID映射正确")
+
+def test_graphml_export_with_dict_attributes():
+    """测试GraphML导出失败（节点属性为字典）时返回错误结果而不是使解释器崩溃"""
+    print("🔍 测试GraphML导出失败的处理")
+
+    # 崩溃发生在垃圾回收/解释器退出阶段，放到子进程中执行才能检测到
+    script = textwrap.dedent(f"""
+        import gc, io, contextlib, tempfile
+        with contextlib.redirect_stdout(io.StringIO()):
+            from ontology.managers.dynamic_schema import DynamicOntologyManager
+            from pipeline.kg_updater import KnowledgeGraphUpdater
+            ontology = DynamicOntologyManager({SCHEMA_PATH!r})
+        updater = KnowledgeGraphUpdater(ontology, storage_path=tempfile.mkdtemp(), export_graphml=True)
+        for i in range(3):
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = updater.update_kg_from_triples(
+                    [{{"subject": f"A{{i}}", "predicate": "uses", "object": f"B{{i}}", "confidence": 0.9}}]
+                )
+            assert not result.success
+            assert any("GraphML" in error for error in result.errors), result.errors
+        gc.collect()
+        print("OK")
+    """)
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    print(f"   返回码: {completed.returncode}")
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip().endswith("OK")
+
+    print("✅ GraphML导出失败时返回错误结果")
+
+def main():
+    """主测试函数"""
+    print("🧪 知识图谱更新器测试")
+    print("=" * 60)
+
+    test_backup_restore_round_trip()
+    test_batch_commit()
+    test_node_id_mapping()
+    test_graphml_export_with_dict_attributes()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+测试Neo4j连接器（不需要运行中的Neo4j服务）
+"""
+
+import sys
+import os
+import csv
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from neo4j.exceptions import Neo4jError
+
+from pipeline.neo4j_connector import Neo4jConnector
+
+class FakeDriver:
+    """模拟neo4j驱动：记录execute_query收到的语句和参数，按已存在的实体计算MATCH的结果"""
+
+    def __init__(self, existing_entities=(), apoc_installed=True):
+        self.existing = set(existing_entities)
+        self.apoc_installed = apoc_installed
+        self.queries = []
+
+    def execute_query(self, cypher, parameters=None, **kwargs):
+        rows = (parameters or {})["rows"]
+        self.queries.append((cypher, rows))
+        if "apoc." in cypher and not self.apoc_installed:
+            raise Neo4jError._hydrate_neo4j(
+                code="Neo.ClientError.Procedure.ProcedureNotFound", message="There is no procedure with the name"
+            )
+
+        if "collect(name) AS missing" in cypher:
+            return [[[name for name in rows if name not in self.existing]]], None, None
+        if "MATCH (o:Entity" in cypher:
+            return [[sum(1 for r in rows if r["subject"] in self.existing and r["object"] in self.existing)]], None, None
+        if "sum(size(r.keys))" in cypher:
+            return [[sum(len(r["keys"]) for r in rows if r["subject"] in self.existing)]], None, None
+        if "RETURN count(*) AS updated" in cypher:
+            return [[sum(1 for r in rows if r["subject"] in self.existing)]], None, None
+        if "RETURN" in cypher:
+            return [[len(rows)]], None, None
+        return [], None, None
+
+    def close(self):
+        pass
+
+class ListHandler(logging.Handler):
+    """收集日志消息"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+def _connector(driver: FakeDriver) -> Neo4jConnector:
+    connector = Neo4jConnector()
+    connector.driver = driver
+    return connector
+
+def _read_csv(path: Path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return list(csv.reader(f))
+
+ENTITIES = {
+    "Dijkstra": {"entity_type": "Algorithm", "description": "最短路径", "confidence": 0.9,
+                 "created_at": "2024-01-01", "attributes": {"year": 1959}},
+    "BFS": {"entity_type": "Algorithm"},
+    "Graph": {"entity_type": "DataStructure"},
+}
+
+def test_import_entities_with_apoc():
+    """测试安装APOC时所有类型的实体用一条apoc.merge.node语句写入"""
+    print("🔍 测试APOC实体导入")
+
+    driver = FakeDriver()
+    connector = _connector(driver)
+    count = connector.import_entities(ENTITIES, literals={"Dijkstra": {"complexity": "2.5"}})
+
+    assert count == 3
+    assert len(driver.queries) == 1
+    cypher, rows = driver.queries[0]
+    assert "apoc.merge.node(['Entity', r.type]" in cypher
+    rows = {row["name"]: row for row in rows}
+    assert json.loads(rows["Dijkstra"].pop("attributes")) == {"year": 1959}
+    assert rows["Dijkstra"] == {
+        "name": "Dijkstra", "type": "Algorithm", "description": "最短路径", "confidence": 0.9,
+        "created_at": "2024-01-01", "literals": {"complexity": "2.5"}
+    }
+    assert rows["Graph"]["type"] == "DataStructure"
+    assert rows["Graph"]["confidence"] == 1.0
+    assert rows["Graph"]["literals"] == {}
+
+    print("✅ APOC实体导入正确")
+
+def test_import_entities_without_apoc():
+    """测试未安装APOC时按实体类型标签分别生成MERGE语句，并停用APOC"""
+    print("🔍 测试无APOC实体导入")
+
+    driver = FakeDriver(apoc_installed=False)
+    connector = _connector(driver)
+    count = connector.import_entities(ENTITIES)
+
+    assert count == 3
+    assert not connector._apoc_available
+    typed_queries = [(cypher, rows) for cypher, rows in driver.queries if "apoc." not in cypher]
+    labels = {}
+    for cypher, rows in typed_queries:
+        assert "UNWIND $rows AS r" in cypher
+        label = cypher.split("MERGE (e:Entity:`")[1].split("`")[0]
+        labels[label] = sorted(row["name"] for row in rows)
+    print(f"   按标签写入: {labels}")
+    assert labels == {"Algorithm": ["BFS", "Dijkstra"], "DataStructure": ["Graph"]}
+
+    # 之后的批次不再尝试APOC
+    driver.queries.clear()
+    connector.import_entities({"Prim": {"entity_type": "Algorithm"}})
+    assert len(driver.queries) == 1
+    assert "MERGE (e:Entity:`Algorithm`" in driver.queries[0][0]
+
+    print("✅ 无APOC实体导入正确")
+
+def test_import_relations_without_apoc():
+    """测试未安装APOC时实体间关系按关系类型、字面值按谓词分别生成语句"""
+    print("🔍 测试无APOC关系导入")
+
+    driver = FakeDriver(existing_entities=ENTITIES, apoc_installed=False)
+    connector = _connector(driver)
+    relations = [
+        {"subject": "Dijkstra", "predicate": "uses", "object": "Graph", "confidence": 0.8, "source": "doc1"},
+        {"subject": "BFS", "predicate": "uses", "object": "Graph"},
+        {"subject": "BFS", "predicate": "is part of", "object": "Dijkstra"},
+        {"subject": "Dijkstra", "predicate": "complexity", "object": "2.5"},
+        {"subject": "Dijkstra", "predicate": "optimal", "object": "true"},
+    ]
+    count = connector.import_relations(relations)
+
+    assert count == 5
+    edges = {}
+    literals = {}
+    for cypher, rows in driver.queries:
+        if "apoc." in cypher:
+            continue
+        if "MERGE (s)-[x:`" in cypher:
+            rel_type = cypher.split("MERGE (s)-[x:`")[1].split("`")[0]
+            edges[rel_type] = sorted((row["subject"], row["predicate"], row["object"]) for row in rows)
+        elif "SET e.`" in cypher:
+            predicate = cypher.split("SET e.`")[1].split("`")[0]
+            literals[predicate] = rows
+    print(f"   关系类型: {edges}")
+    print(f"   字面值属性: {literals}")
+    assert edges == {
+        "USES": [("BFS", "uses", "Graph"), ("Dijkstra", "uses", "Graph")],
+        "IS_PART_OF": [("BFS", "is part of", "Dijkstra")],
+    }
+    assert literals == {
+        "complexity": [{"subject": "Dijkstra", "object": "2.5"}],
+        "optimal": [{"subject": "Dijkstra", "object": "true"}],
+    }
+
+    uses_rows = next(rows for cypher, rows in driver.queries if "[x:`USES`]" in cypher)
+    dijkstra_row = next(row for row in uses_rows if row["subject"] == "Dijkstra")
+    assert dijkstra_row == {"rel_type": "USES", "subject": "Dijkstra", "object": "Graph",
+                            "predicate": "uses", "confidence": 0.8, "source": "doc1"}
+
+    print("✅ 无APOC关系导入正确")
+
+def test_skipped_endpoint_reporting():
+    """测试端点实体不存在的关系被跳过、计数，并逐条记录"""
+    print("🔍 测试缺失端点的关系报告")
+
+    driver = FakeDriver(existing_entities=["Dijkstra", "Graph"])
+    connector = _connector(driver)
+    handler = ListHandler()
+    connector.logger.addHandler(handler)
+    try:
+        relations = [
+            {"subject": "Dijkstra", "predicate": "uses", "object": "Graph"},
+            {"subject": "Missing", "predicate": "uses", "object": "Graph"},
+            {"subject": "Dijkstra", "predicate": "extends", "object": "Ghost"},
+            {"subject": "Missing", "predicate": "complexity", "object": "3"},
+        ]
+        count = connector.import_relations(relations, log_skipped=True)
+    finally:
+        connector.logger.removeHandler(handler)
+
+    assert count == 1
+    missing_queries = [rows for cypher, rows in driver.queries if "collect(name) AS missing" in cypher]
+    assert len(missing_queries) == 1
+    assert sorted(missing_queries[0]) == ["Dijkstra", "Ghost", "Graph", "Missing"]
+
+    for message in handler.messages:
+        print(f"   {message}")
+    assert "主语实体不存在，跳过关系: Missing -[uses]-> Graph" in handler.messages
+    assert "宾语实体不存在，跳过关系: Dijkstra -[extends]-> Ghost" in handler.messages
+    assert "主语实体不存在，跳过字面值属性: Missing.complexity=3" in handler.messages
+    assert "   - 端点实体不存在而跳过: 3 个" in handler.messages
+
+    # 没有跳过时不做存在性查询
+    driver.queries.clear()
+    connector.import_relations(relations[:1], log_skipped=True)
+    assert not any("collect(name) AS missing" in cypher for cypher, _ in driver.queries)
+
+    print("✅ 缺失端点的关系报告正确")
+
+def test_parallel_relation_writes():
+    """测试并行写入时每个关系只写入一次，并行阶段各分片涉及的节点互不相交"""
+    print("🔍 测试并行关系写入")
+
+    names = [f"E{i}" for i in range(40)]
+    driver = FakeDriver(existing_entities=names)
+    connector = Neo4jConnector(write_workers=4)
+    connector.driver = driver
+    relations = [
+        {"subject": names[i], "predicate": "uses", "object": names[(i * 7 + 3) % len(names)]}
+        for i in range(len(names))
+    ]
+    count = connector.import_relations(relations)
+
+    assert count == len(relations)
+    written = sorted((row["subject"], row["object"]) for _, rows in driver.queries for row in rows)
+    assert written == sorted((r["subject"], r["object"]) for r in relations)
+
+    buckets, cross_shard = connector._shard_edge_rows(
+        [{"subject": r["subject"], "object": r["object"]} for r in relations]
+    )
+    nodes = [{name for row in bucket for name in (row["subject"], row["object"])} for bucket in buckets]
+    for i in range(len(nodes)):
+        for j in range(i + 1, len(nodes)):
+            assert not nodes[i] & nodes[j]
+    assert sum(len(bucket) for bucket in buckets) + len(cross_shard) == len(relations)
+
+    print("✅ 并行关系写入正确")
+
+def test_admin_import_csv():
+    """测试neo4j-admin导入CSV：字面值属性与固定列同名时跳过，属性名中的':'被替换"""
+    print("🔍 测试neo4j-admin导入CSV")
+
+    connector = Neo4jConnector()
+    entities = [
+        {"name": "Dijkstra", "entity_type": "Algorithm", "description": "最短路径", "confidence": 0.9},
+        {"name": "Graph", "entity_type": "DataStructure"},
+    ]
+    relations = [
+        {"subject": "Dijkstra", "predicate": "uses", "object": "Graph", "confidence": 0.8},
+        {"subject": "Dijkstra", "predicate": "has-part", "object": "Graph"},
+        {"subject": "Dijkstra", "predicate": "complexity", "object": "2.5"},
+        {"subject": "Dijkstra", "predicate": "time:worst", "object": "10"},
+        {"subject": "Dijkstra", "predicate": "type", "object": "42"},
+        {"subject": "Graph", "predicate": "confidence", "object": "0.1"},
+        {"subject": "Missing", "predicate": "uses", "object": "Graph"},
+        {"subject": "Dijkstra", "predicate": "uses", "object": "Missing"},
+    ]
+
+    output_dir = Path(tempfile.mkdtemp())
+    command, entity_count, relation_count = connector._write_admin_import_csv(entities, relations, output_dir)
+    print(f"   命令行参数: {command}")
+
+    header = _read_csv(output_dir / "entities_header.csv")[0]
+    print(f"   实体列头: {header}")
+    assert header == [
+        "name:ID", "type", "description", "confidence:float", "created_at",
+        "attributes", "display_name", "complexity", "time_worst", ":LABEL"
+    ]
+    # 每个属性名只出现一次
+    property_names = [column.split(':')[0] for column in header if not column.startswith(':')]
+    assert len(property_names) == len(set(property_names))
+
+    rows = {row[0]: dict(zip(header, row)) for row in _read_csv(output_dir / "entities.csv")}
+    assert rows["Dijkstra"]["type"] == "Algorithm"
+    assert rows["Dijkstra"]["complexity"] == "2.5"
+    assert rows["Dijkstra"]["time_worst"] == "10"
+    assert rows["Graph"]["confidence:float"] == "1.0"
+    assert rows["Graph"][":LABEL"] == "Entity;DataStructure"
+
+    assert sorted(command[1:]) == sorted([
+        f"--relationships={output_dir / 'rels_USES_header.csv'},{output_dir / 'rels_USES.csv'}",
+        f"--relationships={output_dir / 'rels_HAS_PART_header.csv'},{output_dir / 'rels_HAS_PART.csv'}",
+    ])
+    uses_rows = _read_csv(output_dir / "rels_USES.csv")
+    assert [row[:4] for row in uses_rows] == [["Dijkstra", "Graph", "uses", "0.8"]]
+    assert uses_rows[0][-1] == "USES"
+
+    assert entity_count == 2
+    # 2条实体间关系 + 2个字面值属性；与固定列同名的字面值和缺少端点的关系不计入
+    assert relation_count == 4
+
+    print("✅ neo4j-admin导入CSV正确")
+
+def main():
+    """主测试函数"""
+    print("🧪 Neo4j连接器测试")
+    print("=" * 60)
+
+    test_import_entities_with_apoc()
+    test_import_entities_without_apoc()
+    test_import_relations_without_apoc()
+    test_skipped_endpoint_reporting()
+    test_parallel_relation_writes()
+    test_admin_import_csv()
+
+if __name__ == "__main__":
+    main()
@@ -76,7 +76,7 @@ def reorganize_results():
         if backups_src.exists():
             if backups_dst.exists():
                 # 合并备份文件
-                for backup_file in backups_src.glob("*.pkl"):
+                for backup_file in backups_src.glob("*.*"):  # 完整快照(.msgpack/.pkl)和增量文件(.jsonl)
                     dst_file = backups_dst / backup_file.name
                     if not dst_file.exists():
                         shutil.move(str(backup_file), str(dst_file))
@@ -166,7 +166,8 @@ results/
 │   ├── entities/       # 实体推断缓存
 │   └── schemas/        # Schema检测缓存
 └── backups/            # 历史备份文件
-    └── *.pkl           # 序列化备份
+    ├── kg_backup_*.msgpack  # 完整快照（未安装msgpack时为*.pkl）
+    └── deltas_*.jsonl  # 增量备份
 ```
 
 ## 📋 文件说明